@@ -1,68 +1,209 @@
 import sys
 import os
+import functools
+import itertools
+import json
+import math
+import time
 
-import os
+try:
+    import msgpack  # Необязательная зависимость: без нее компактный ответ отдается в JSON
+except ImportError:
+    msgpack = None
+
+from flask import (Blueprint, Flask, Response, current_app, g, jsonify, request, render_template,
+                   send_from_directory, stream_with_context)
+from flask.json.provider import DefaultJSONProvider
+from fpv_logic import sweep
+from fpv_logic import profiling
+from fpv_logic.compute_pool import Saturated
+from fpv_logic.result_cache import RESULT_CACHE
+from fpv_logic.services import Services
+from fpv_logic.api_handlers import (analyze_group_batch, find_channel, harmonic_report, optimize_channel_set,
+                                    power_model_report, score_catalog, spectral_imd_report)
+from backend.config import Config  # Импортируем настройки
 
-print("FLASK_ENV:", os.getenv("FLASK_ENV"))
-print("SECRET_KEY:", os.getenv("SECRET_KEY"))
 
+class TimedJSONProvider(DefaultJSONProvider):
+    """ ⏱️ Обычный JSON Flask, но сериализация попадает в Server-Timing как этап serialize """
 
-# Чиним кодировку вывода, чтобы сервер не плевался от кириллических символов
-sys.stdout.reconfigure(encoding='utf-8')  
+    def dumps(self, obj, **kwargs):
+        with profiling.span("serialize"):
+            return super().dumps(obj, **kwargs)
 
-from flask import Flask, jsonify, request, render_template, send_from_directory
-from fpv_logic.data_loader import DataLoader
-from fpv_logic.interference import InterferenceAnalyzer
-from backend.config import Config  # Импортируем настройки
+
+# 🧩 Все маршруты API; подключаются к приложению в create_app
+api = Blueprint("api", __name__)
+
+
+def create_app(config_object=Config) -> Flask:
+    """
+    🏗️ Создает Flask-приложение.
+
+    Каталог, анализатор и остальные тяжелые объекты здесь не загружаются:
+    они строятся при первом запросе, которому нужны (или сразу, если EAGER_STARTUP).
+    Некорректный или отсутствующий каталог - исключение, а не пустой ответ.
+    """
+    started = time.perf_counter()
+
+    # static_folder и template_folder вынесены на уровень выше, чтобы не путаться
+    app = Flask(__name__, static_folder="../static", template_folder="../templates")
+    app.config.from_object(config_object)  # Применяем настройки
+    app.json = TimedJSONProvider(app)
+
+    services = Services(app.config, app.json.dumps)
+    app.extensions["fpv"] = services
+    app.extensions["fpv_profiler"] = profiling.RequestProfiler(app.config["PROFILE_SAMPLE_RATE"], app.config["PROFILE_DIR"])
+
+    # 🧮 Общий кэш результатов расчета помех (анализатор, обработчики API, оптимизатор)
+    RESULT_CACHE.configure(app.config["RESULT_CACHE_SIZE"], app.config["RESULT_CACHE_TTL"])
+
+    app.register_blueprint(api)
+    services.startup_seconds["create_app"] = time.perf_counter() - started
+
+    if app.config["EAGER_STARTUP"]:
+        services.warm_up()
+    return app
+
+
+def services() -> Services:
+    """ Компоненты текущего приложения (строятся при первом обращении) """
+    return current_app.extensions["fpv"]
 
 
-# 🏗️ Создаем Flask-приложение
-# static_folder и template_folder вынесены на уровень выше, чтобы не путаться
-app = Flask(__name__, static_folder="../static", template_folder="../templates")
-app.config.from_object(Config)  # Применяем настройки
+def coalesced(route: str, key_data, compute):
+    """
+    🚦 Тяжелый расчет в ограниченном пуле: одинаковые одновременные запросы
+    (по нормализованным параметрам key_data) ждут один расчет.
+    Пул занят - Saturated, ответ 503 с Retry-After.
+    """
+    key = (route, json.dumps(key_data, sort_keys=True, ensure_ascii=False, default=str))
+    return services().compute_pool.run(key, compute)
 
 
-# 📥 Загружаем данные ОДИН раз за запуск сервера (иначе будет боль)
-loader = DataLoader()
-data = loader.get_data()
-print("🔄 Данные загружены один раз и готовы к использованию.")
+def uses_noise_floor(view):
+    """
+    📻 Маршрут считает помехи с измеренным фоном: перед ним дочитываем новые свипы сканера
+    (не чаще раза в SCAN_REFRESH секунд). Страницы, статика и метрики лог сканера не трогают.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        services().refresh_noise_floor()
+        return view(*args, **kwargs)
+    return wrapper
 
-# ⚡ Создаем обработчик интерференции (проверяет, не будет ли помех на частотах)
-interference_handler = InterferenceAnalyzer(data)
 
-@app.route("/")
+@api.before_app_request
+def start_request_timings():
+    """ ⏱️ Начинаем замер этапов запроса (и cProfile, если запрос попал в выборку) """
+    profiling.start_request()
+    requested = current_app.config["PROFILE_ON_REQUEST"] and request.args.get("profile") == "1"
+    g.profiler = current_app.extensions["fpv_profiler"].start(requested)
+
+@api.before_app_request
+def refresh_catalog():
+    """ 🔄 Файл каталога поменяли - все маршруты (а не только /api/data) работают уже с новым """
+    services().refresh_catalog()
+
+@api.after_app_request
+def finish_request_timings(response):
+    """ ⏱️ Отдаем этапы в Server-Timing и складываем их в метрики """
+    if g.get("profiler") is not None:
+        path = current_app.extensions["fpv_profiler"].stop(g.profiler, request.endpoint or "unmatched")
+        g.profiler = None
+        if path:
+            response.headers["X-Profile-File"] = os.path.basename(path)
+            print(f"🔬 Профиль запроса {request.path} сохранен: {path}")
+
+    timings = profiling.finish_request()
+    if timings is None:
+        return response
+
+    total = time.perf_counter() - timings.started
+    response.headers["Server-Timing"] = timings.server_timing(total)
+    profiling.METRICS.observe_request(
+        request.endpoint or "unmatched", request.method, response.status_code, total, timings
+    )
+    return response
+
+@api.app_errorhandler(Saturated)
+def compute_saturated(error):
+    """ 🚦 Пул расчетов занят - быстро отказываем, клиент повторит через Retry-After """
+    response = jsonify({"error": str(error)})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+@api.route("/")
 def index():
     """ Отдает клиенту главную HTML-страницу """
     return render_template("index.html")
 
-@app.route("/api/data", methods=["GET"])
+@api.route("/api/data", methods=["GET"])
 def get_full_data():
-    """ ⚡ Отдает клиенту ВСЕ данные о частотах """
-    return jsonify(data)
+    """ ⚡ Отдает клиенту ВСЕ данные о частотах (в исходной форме JSON) """
+    # Если файл каталога поменяли, ответ уже пересобран (refresh_catalog перед запросом)
+    payload = services().data_payload
+
+    headers = {
+        "Cache-Control": f"public, max-age={current_app.config['DATA_MAX_AGE']}, must-revalidate",
+        "Vary": "Accept-Encoding"
+    }
 
-@app.route("/api/frequency", methods=["GET"])
+    # 🔁 Клиент уже получил эту версию - отдаем 304 без тела
+    if request.if_none_match.contains_weak(payload.etag):
+        response = Response(status=304, headers=headers)
+        response.set_etag(payload.etag, weak=True)
+        return response
+
+    encoding, body = payload.select({
+        name: request.accept_encodings.quality(name) for name in ("br", "gzip")
+    })
+    response = Response(body, mimetype="application/json", headers=headers)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.set_etag(payload.etag, weak=True)
+    return response
+
+@api.route("/api/frequency", methods=["GET"])
 def get_frequency():
-    """ 🔍 Получает частоту по диапазону, группе и номеру канала """
+    """ 🔍 Получает частоту по диапазону, группе и номеру канала (или каналы по частоте) """
+
+    # 🔁 Обратный поиск: по частоте отдаем все каналы на ней и соседей в окне within
+    if request.args.get("frequency"):
+        frequency = request.args.get("frequency", type=float)
+        if frequency is None:
+            return jsonify({"error": "Некорректная частота"}), 400
+
+        within = request.args.get("within", type=float)
+        result = {"frequency": frequency, "unit": "MHz", "channels": services().catalog_index.lookup_frequency(frequency)}
+        if within is not None:
+            result["neighbours"] = [
+                {key: ch[key] for key in ("modulation", "range", "band", "channel", "frequency")}
+                for ch in services().catalog_index.neighbours(frequency, within)
+            ]
+        return jsonify(result)
 
     band = request.args.get("band")  # Группа (например, A, B, R)
     channel = request.args.get("channel")  # Номер канала (например, 1, 2, 3)
     range_name = request.args.get("range", "5.8GHz")  # Частотный диапазон, по умолчанию 5.8GHz
+    modulation = request.args.get("modulation", "analog")  # Аналог или цифра
 
     # 🤦‍♂️ Если что-то не указали — выбрасываем ошибку
     if not band or not channel:
         return jsonify({"error": "Необходимо указать band и channel"}), 400
 
-    try:
-        # 📡 Достаём частоту из данных
-        frequency = data["analog"][range_name][band]["channels"].get(channel)
-    except KeyError:
+    # 📡 Достаём частоту из индекса каталога
+    frequency = services().catalog_index.get_frequency(modulation, range_name, band, channel)
+    if frequency is None:
         # ❌ Если частота не найдена — 404 и страдание
         return jsonify({"error": "Частота не найдена"}), 404
 
     # 🔥 Если всё ок — отправляем клиенту частоту и единицы измерения
     return jsonify({"frequency": frequency, "unit": "MHz"})
 
-@app.route("/api/interference", methods=["GET"])
+@api.route("/api/interference", methods=["GET"])
+@uses_noise_floor
 def analyze_interference():
     """ 📡 Анализирует перекрытие частот между каналами """
 
@@ -76,14 +217,461 @@ def analyze_interference():
         return jsonify({"error": "Необходимо указать modulation, range, band и channel"}), 400
 
     # 🔥 Отдаём клиенту результат анализа помех
-    result = interference_handler.analyze_interference(modulation, range_name, band, selected_channel)
+    result = services().analyzer.analyze_interference(modulation, range_name, band, selected_channel)
+    return jsonify(result)
+
+@api.route("/api/interference/analyze", methods=["POST"])
+@uses_noise_floor
+def analyze_group():
+    """ 📡 Полный анализ взаимных помех для группы каналов """
+
+    payload = request.get_json(silent=True) or {}
+    group = payload.get("channels")
+    if not group:
+        return jsonify({"error": "Необходимо указать channels"}), 400
+
+    analyzer = services().analyzer
+    modulation = payload.get("modulation", "analog")
+
+    # format=compact: только верхний треугольник матрицы плоскими массивами,
+    # отладка и IMD продукты - по запросу (debug, imd)
+    if payload.get("format", request.args.get("format")) == "compact":
+        include_debug = bool(payload.get("debug", False))
+        include_imd = bool(payload.get("imd", False))
+        try:
+            result = coalesced(
+                "analyze_compact",
+                {"channels": group, "modulation": modulation, "debug": include_debug, "imd": include_imd},
+                lambda: analyzer.analyze_group_compact(group, modulation, include_debug=include_debug,
+                                                       include_imd=include_imd)
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if "error" in result:
+            return jsonify(result), 404
+        if msgpack is not None and request.accept_mimetypes.best_match(
+                ["application/json", "application/msgpack"]) == "application/msgpack":
+            response = Response(msgpack.packb(result, use_single_float=True), mimetype="application/msgpack")
+        else:
+            response = jsonify(result)
+        response.vary.add("Accept")
+        return response
+
+    try:
+        result = coalesced(
+            "analyze", {"channels": group, "modulation": modulation},
+            lambda: analyzer.analyze_group_interference(group, modulation)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if "error" in result:
+        return jsonify(result), 404
+    return jsonify(result)
+
+@api.route("/api/interference/analyze/batch", methods=["POST"])
+@uses_noise_floor
+def analyze_group_batch_route():
+    """ 🧺 Сводки для множества групп каналов (все заезды сетки) одним запросом """
+
+    payload = request.get_json(silent=True) or {}
+    groups = payload.get("groups")
+    if not isinstance(groups, list) or not groups:
+        return jsonify({"error": "Необходимо указать groups - список групп каналов"}), 400
+    if len(groups) > current_app.config["BATCH_MAX_GROUPS"]:
+        return jsonify({"error": f"Не больше {current_app.config['BATCH_MAX_GROUPS']} групп за запрос"}), 400
+
+    analyzer, executor = services().analyzer, services().process_pool
+    modulation = payload.get("modulation", "analog")
+    result = coalesced(
+        "analyze_batch", {"groups": groups, "modulation": modulation},
+        lambda: analyze_group_batch(analyzer, groups, modulation, executor=executor)
+    )
+    return jsonify(result)
+
+@api.route("/api/interference/bulk", methods=["POST"])
+@uses_noise_floor
+def bulk_interference():
+    """ 🎨 Оценивает все каналы каталога (или список candidates) относительно выбранных за один проход """
+
+    payload = request.get_json(silent=True) or {}
+    index, analyzer = services().catalog_index, services().analyzer
+    selected = payload.get("selected", [])
+    candidates = payload.get("candidates")
+    include_imd = bool(payload.get("details", False))
+    try:
+        result = coalesced(
+            "bulk", {"selected": selected, "candidates": candidates, "details": include_imd},
+            lambda: score_catalog(index, selected, candidates, include_imd=include_imd, analyzer=analyzer)
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(result)
+
+@api.route("/api/interference/spectrum", methods=["POST"])
+def spectrum_interference():
+    """ 🌈 Плотность IMD продуктов 3-7 порядка для группы каналов (спектральная модель) """
+
+    payload = request.get_json(silent=True) or {}
+    if not payload.get("channels"):
+        return jsonify({"error": "Необходимо указать channels"}), 400
+
+    engine, index = services().spectral_engine, services().catalog_index
+    try:
+        max_order = int(payload.get("maxOrder", 7))
+        include_density = bool(payload.get("density", False))
+        result = coalesced(
+            "spectrum", {"channels": payload["channels"], "maxOrder": max_order, "density": include_density},
+            lambda: spectral_imd_report(engine, index, payload["channels"], max_order=max_order,
+                                        include_density=include_density)
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(result)
+
+@api.route("/api/interference/harmonics", methods=["POST"])
+def harmonic_interference():
+    """ 🎼 Гармоники каналов группы, попадающие в другие каналы (между диапазонами и системами) """
+
+    payload = request.get_json(silent=True) or {}
+    if not payload.get("channels"):
+        return jsonify({"error": "Необходимо указать channels"}), 400
+
+    try:
+        max_order = payload.get("maxOrder")
+        result = harmonic_report(
+            services().harmonics, services().catalog_index, payload["channels"],
+            max_order=int(max_order) if max_order is not None else None,
+            include_catalog=bool(payload.get("catalog", False))
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(result)
+
+@api.route("/api/interference/power", methods=["POST"])
+def power_interference():
+    """ 📶 Вероятность непригодного видео по каналам с учетом мощностей и расстояний (Монте-Карло) """
+
+    payload = request.get_json(silent=True) or {}
+    if not payload.get("channels"):
+        return jsonify({"error": "Необходимо указать channels"}), 400
+
+    config = current_app.config
+    if len(payload["channels"]) > config["POWER_MAX_CHANNELS"]:
+        return jsonify({"error": f"Не больше {config['POWER_MAX_CHANNELS']} каналов"}), 400
+
+    model, index = services().power_model, services().catalog_index
+    try:
+        # Не даем занять пул надолго: число испытаний ограничено POWER_MAX_TRIALS,
+        # а работа испытания * каналы^3 - POWER_MAX_WORK
+        n = len(payload["channels"])
+        trials = min(int(payload.get("trials", 2000)), config["POWER_MAX_TRIALS"],
+                     max(1, config["POWER_MAX_WORK"] // n ** 3))
+        area_radius = float(payload.get("areaRadius", 100.0))
+        min_sinr_db = float(payload.get("minSinrDb", 10.0))
+        seed = int(payload.get("seed", 0))
+        result = coalesced(
+            "power",
+            {"channels": payload["channels"], "trials": trials, "areaRadius": area_radius,
+             "minSinrDb": min_sinr_db, "seed": seed},
+            lambda: power_model_report(model, index, payload["channels"], trials=trials,
+                                       area_radius=area_radius, min_sinr_db=min_sinr_db, seed=seed)
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(result)
+
+@api.route("/api/noise-floor", methods=["GET"])
+@uses_noise_floor
+def get_noise_floor():
+    """ 📻 Измеренный сканером спектр: средний и пиковый уровень по ячейкам 1 МГц """
+    ingestor = services().scan_ingestor
+    result = services().noise_floor.to_dict()
+    result["scan"] = None if ingestor is None else {
+        "path": ingestor.path, "bytes_read": ingestor.offset, "samples": ingestor.samples
+    }
     return jsonify(result)
 
-@app.route("/favicon.ico")
+@api.route("/api/noise-floor", methods=["POST"])
+def upload_noise_floor():
+    """ 📻 Дописывает свипы из тела запроса (CSV timestamp,frequency,rssi) в лог сканера, читая его потоком """
+    if not current_app.config["NOISE_UPLOAD_ENABLED"]:
+        return jsonify({"error": "Загрузка спектра выключена (NOISE_UPLOAD_ENABLED)"}), 403
+    # Спектр в памяти у каждого воркера свой: загрузка идет в общий лог, откуда ее дочитают все
+    ingestor = services().scan_ingestor
+    if ingestor is None:
+        return jsonify({"error": "Для загрузки спектра нужен лог сканера SCAN_PATH"}), 409
+    try:
+        written, consumed = ingestor.append(request.stream)
+    except OSError as e:
+        return jsonify({"error": f"Не удалось дописать лог сканера: {e}"}), 500
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    if written == 0:
+        return jsonify({"error": "В CSV нет измерений в диапазонах каталога"}), 400
+    # Этот воркер видит загрузку сразу, остальные - при следующем чтении лога (SCAN_REFRESH)
+    ingestor.update()
+    return jsonify({"added": written, "bytes_read": consumed, "version": services().noise_floor.version})
+
+@api.route("/api/interference/sweep", methods=["POST"])
+@uses_noise_floor
+def sweep_interference():
+    """ 🌊 Потоковый перебор (NDJSON): каналы каталога или все наборы из k каналов против выбранных """
+
+    payload = request.get_json(silent=True) or {}
+
+    selected = []
+    for spec in payload.get("selected", []):
+        record = find_channel(services().catalog_index, spec)
+        if record is None:
+            return jsonify({"error": f"Канал не найден: band={spec.get('band')}, channel={spec.get('channel')}"}), 404
+        if record["frequency"] <= 0:
+            return jsonify({"error": f"У канала нет частоты: band={spec.get('band')}, channel={spec.get('channel')}"}), 400
+        selected.append(record)
+    selected_ids = {record["id"] for record in selected}
+    selected_freqs = [float(record["frequency"]) for record in selected]
+
+    # Кандидаты: весь каталог без выбранных и без заглушек с нулевой частотой, с фильтрами modulation/range/bands
+    bands = set(payload["bands"]) if payload.get("bands") else None
+    pool = [
+        record for record in services().catalog_index.channels
+        if record["id"] not in selected_ids and record["frequency"] > 0 and
+        payload.get("modulation") in (None, record["modulation"]) and
+        payload.get("range") in (None, record["range"]) and
+        (bands is None or record["band"] in bands)
+    ]
+
+    try:
+        size = payload.get("subsetSize")
+        top = int(payload["top"]) if payload.get("top") is not None else None
+        limit = int(payload["limit"]) if payload.get("limit") is not None else None
+        if size is None:
+            results, total = sweep.channel_sweep(services().analyzer, pool, selected_freqs), len(pool)
+        else:
+            size = int(size)
+            if not 1 <= size <= len(pool):
+                raise ValueError(f"subsetSize должен быть от 1 до {len(pool)}")
+            results = sweep.subset_sweep(services().analyzer, pool, size, selected_freqs)
+            total = math.comb(len(pool), size)
+        if top is not None and top < 1:
+            raise ValueError("top должен быть положительным")
+        total = min(total, limit) if limit else total
+        if total > current_app.config["SWEEP_MAX_VARIANTS"]:
+            raise ValueError(f"Слишком много вариантов ({total}): уменьшите subsetSize, сузьте фильтры "
+                             f"или задайте limit не больше {current_app.config['SWEEP_MAX_VARIANTS']}")
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Варианты считаются частями в пуле расчетов: поток запроса только пишет строки ответа
+    compute_pool, parts = services().compute_pool, itertools.count()
+    if limit:
+        results = itertools.islice(results, limit)
+
+    def run(compute):
+        return compute_pool.run(("sweep", id(parts), next(parts)), compute)
+
+    def generate():
+        yield current_app.json.dumps({"type": "start", "total": total}) + "\n"
+        try:
+            for event in sweep.stream(sweep.pooled(results, run), top=top):
+                yield current_app.json.dumps(event) + "\n"
+        except Saturated as e:
+            # Заголовки уже отправлены - сообщаем о перегрузке последней строкой
+            yield current_app.json.dumps({"type": "error", "error": str(e), "retry_after": e.retry_after}) + "\n"
+
+    # Строки уходят клиенту по мере расчета; при отключении клиента генератор закрывается
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson",
+                    headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"})
+
+@api.route("/api/interference/sessions", methods=["POST"])
+@uses_noise_floor
+def create_group_session():
+    """ 🗂️ Создает сессию группы; дальше каналы добавляются и удаляются по одному """
+
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict) or not isinstance(payload.get("channels", []), list):
+        return jsonify({"error": "channels - список каналов (объектов с band, channel и range)"}), 400
+    session_id, session = services().sessions.create(payload.get("modulation", "analog"))
+
+    with session.lock:
+        try:
+            for spec in payload.get("channels", []):
+                session.add_channel(spec)
+        except KeyError as e:
+            services().sessions.delete(session_id)
+            return jsonify({"error": e.args[0]}), 404
+        except ValueError as e:
+            services().sessions.delete(session_id)
+            return jsonify({"error": str(e)}), 400
+        result = session.snapshot()
+
+    return jsonify({"session_id": session_id, "version": session.version, "state": session.state(), **result}), 201
+
+def _group_session(session_id: str):
+    """
+    Сессия группы из памяти воркера. Если клиент прислал свое состояние
+    в заголовке X-Session-State, а у воркера сессии нет или она другой версии
+    (запрос попал в другой воркер gunicorn), сессия восстанавливается из него.
+
+    Raises:
+        KeyError: если канал из состояния не найден
+        ValueError: если заголовок некорректен
+    """
+    header = request.headers.get("X-Session-State")
+    if not header:
+        return services().sessions.get(session_id)
+    return services().sessions.restore(session_id, json.loads(header))
+
+@api.route("/api/interference/sessions/<session_id>", methods=["GET"])
+@uses_noise_floor
+def get_group_session(session_id):
+    """ 🗂️ Полное состояние сессии (например, после перезагрузки страницы) """
+
+    try:
+        session = _group_session(session_id)
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify({"error": e.args[0]}), 400
+    if session is None:
+        return jsonify({"error": "Сессия не найдена"}), 404
+
+    with session.lock:
+        return jsonify({"session_id": session_id, "version": session.version, "state": session.state(),
+                        **session.snapshot()})
+
+@api.route("/api/interference/sessions/<session_id>", methods=["DELETE"])
+def delete_group_session(session_id):
+    """ 🗑️ Закрывает сессию """
+
+    if not services().sessions.delete(session_id):
+        return jsonify({"error": "Сессия не найдена"}), 404
+    return "", 204
+
+@api.route("/api/interference/sessions/<session_id>/channels", methods=["POST"])
+@uses_noise_floor
+def add_session_channel(session_id):
+    """ ➕ Добавляет канал в сессию и отдает только изменения """
+
+    spec = request.get_json(silent=True) or {}
+    if not isinstance(spec, dict) or not spec.get("band") or not spec.get("channel"):
+        return jsonify({"error": "Необходимо указать band и channel"}), 400
+
+    try:
+        session = _group_session(session_id)
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify({"error": e.args[0]}), 400
+    if session is None:
+        return jsonify({"error": "Сессия не найдена"}), 404
+
+    with session.lock:
+        try:
+            return jsonify({**session.add_channel(spec), "state": session.state()})
+        except KeyError as e:
+            return jsonify({"error": e.args[0]}), 404
+
+@api.route("/api/interference/sessions/<session_id>/channels", methods=["DELETE"])
+@uses_noise_floor
+def remove_session_channel(session_id):
+    """ ➖ Удаляет канал из сессии (по index или band/channel/range) и отдает только изменения """
+
+    try:
+        session = _group_session(session_id)
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify({"error": e.args[0]}), 400
+    if session is None:
+        return jsonify({"error": "Сессия не найдена"}), 404
+
+    with session.lock:
+        index = request.args.get("index", type=int)
+        if index is None:
+            index = session.find_channel(request.args)
+        try:
+            return jsonify({**session.remove_channel(index), "state": session.state()})
+        except IndexError as e:
+            return jsonify({"error": e.args[0]}), 404
+
+@api.route("/api/optimize-channels", methods=["POST"])
+@uses_noise_floor
+def optimize_channels():
+    """ 🧠 Подбирает набор каналов с минимальной худшей интерференцией """
+
+    payload = request.get_json(silent=True) or {}
+
+    # Текущий канал из интерфейса тоже считаем закрепленным
+    pinned = list(payload.get("pinned", []))
+    if payload.get("currentChannel"):
+        pinned.insert(0, payload["currentChannel"])
+
+    try:
+        count = int(payload.get("count", 4))
+        time_budget = min(float(payload.get("timeBudget", 0.5)), 5.0)  # Не даем занять воркер надолго
+        optimizer, index = services().optimizer, services().catalog_index
+        modulation, range_name = payload.get("modulation"), payload.get("range")
+        result = coalesced(
+            "optimize",
+            {"pinned": pinned, "count": count, "modulation": modulation, "range": range_name,
+             "timeBudget": time_budget},
+            lambda: optimize_channel_set(optimizer, index, pinned, count, modulation=modulation,
+                                         range_name=range_name, time_budget=time_budget)
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(result)
+
+@api.route("/api/plan-heats", methods=["POST"])
+def plan_heats():
+    """ 🏁 Распределяет пилотов события по заездам и каналам (минимум помех в худшем заезде) """
+
+    payload = request.get_json(silent=True) or {}
+    pilots = payload.get("pilots")
+    if not pilots:
+        return jsonify({"error": "Необходимо указать pilots"}), 400
+
+    try:
+        # Бюджет не больше PLANNER_MAX_BUDGET и половины COMPUTE_TIMEOUT:
+        # раунд, начатый до конца бюджета, должен успеть завершиться, пока запрос ждет пул
+        config = current_app.config
+        time_budget = min(float(payload.get("timeBudget", 5.0)), config["PLANNER_MAX_BUDGET"],
+                          config["COMPUTE_TIMEOUT"] / 2)
+        options = {
+            "heat_size": int(payload.get("heatSize", 4)),
+            "seed": int(payload.get("seed", 0)),
+            "time_budget": time_budget,
+            "chains": min(int(payload["chains"]), config["PLANNER_MAX_CHAINS"]) if payload.get("chains") else None,
+            "rounds": int(payload["rounds"]) if payload.get("rounds") else None
+        }
+        planner, executor = services().planner, services().process_pool
+        result = coalesced(
+            "plan-heats",
+            {"pilots": pilots, **options},
+            lambda: planner.plan(pilots, workers=config["PLANNER_WORKERS"], executor=executor, **options)
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(result)
+
+@api.route("/metrics", methods=["GET"])
+def metrics():
+    """ 📈 Метрики процесса в текстовом формате Prometheus """
+    body = (profiling.METRICS.render() + RESULT_CACHE.render_metrics() + services().render_metrics() +
+            services().compute_pool.render_metrics())
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+@api.route("/favicon.ico")
 def favicon():
     """ 🖼️ Заглушка для favicon.ico, чтобы браузер не бесил 404-ошибками """
     return send_from_directory("../static/img", "favicon.ico", mimetype="image/x-icon")
 
+# 🌐 Приложение для gunicorn (backend.app:app) и flask run: создается быстро, данные - лениво
+app = create_app()
+
 # 🚀 Запуск сервера в режиме отладки
 if __name__ == "__main__":
+    # Чиним кодировку вывода, чтобы сервер не плевался от кириллических символов
+    sys.stdout.reconfigure(encoding='utf-8')
     app.run(debug=True)
@@ -6,4 +6,57 @@ class Config:
     # Можно добавить другие настройки, например:
     DEBUG = os.getenv("FLASK_ENV") == "development"
 
+    # JSON каталога каналов (пусто - backend/data/channels.json относительно пакета)
+    CATALOG_PATH = os.getenv("CATALOG_PATH")
+    # Строить каталог, анализатор и таблицы сразу в create_app, а не при первом запросе
+    EAGER_STARTUP = os.getenv("EAGER_STARTUP", "0") == "1"
+
+    # Сколько секунд браузер может не перепроверять /api/data (потом - запрос с If-None-Match)
+    DATA_MAX_AGE = int(os.getenv("DATA_MAX_AGE", 300))
+
+    # Профилирование: доля запросов под cProfile (0 - выключено), разрешен ли ?profile=1 и куда писать .prof
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+    PROFILE_ON_REQUEST = os.getenv("PROFILE_ON_REQUEST", "0") == "1"
+    PROFILE_DIR = os.getenv("PROFILE_DIR")
+
+    # Планировщик заездов: число процессов общего пула воркера (пусто - все ядра),
+    # максимальный бюджет запроса, с (не больше половины COMPUTE_TIMEOUT) и максимум цепочек отжига
+    PLANNER_WORKERS = int(os.getenv("PLANNER_WORKERS", 0)) or None
+    PLANNER_MAX_BUDGET = float(os.getenv("PLANNER_MAX_BUDGET", 5))
+    PLANNER_MAX_CHAINS = int(os.getenv("PLANNER_MAX_CHAINS", 32))
+
+    # Пул тяжелых расчетов: потоки, глубина очереди сверх них, сколько ждать ответа, с,
+    # и Retry-After для ответа 503, когда пул занят
+    COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", 2))
+    COMPUTE_QUEUE = int(os.getenv("COMPUTE_QUEUE", 8))
+    COMPUTE_TIMEOUT = float(os.getenv("COMPUTE_TIMEOUT", 10))
+    COMPUTE_RETRY_AFTER = int(os.getenv("COMPUTE_RETRY_AFTER", 1))
+
+    # Потоковый перебор /api/interference/sweep: максимум вариантов в одном запросе
+    SWEEP_MAX_VARIANTS = int(os.getenv("SWEEP_MAX_VARIANTS", 200000))
+
+    # Пакетный анализ групп: максимум групп в одном запросе
+    BATCH_MAX_GROUPS = int(os.getenv("BATCH_MAX_GROUPS", 1000))
+
+    # Индекс гармоник каталога: высшая гармоника, попадания которой ищутся во всех диапазонах
+    HARMONIC_MAX_ORDER = int(os.getenv("HARMONIC_MAX_ORDER", 5))
+
+    # Модель с мощностями и расстояниями: максимум испытаний Монте-Карло в одном запросе, каналов в группе
+    # и работы испытания * каналы^3 (IMD считается по тройкам каналов): 48 каналов - ~1800 испытаний
+    POWER_MAX_TRIALS = int(os.getenv("POWER_MAX_TRIALS", 20000))
+    POWER_MAX_CHANNELS = int(os.getenv("POWER_MAX_CHANNELS", 64))
+    POWER_MAX_WORK = int(os.getenv("POWER_MAX_WORK", 200_000_000))
+
+    # Лог сканера спектра (CSV timestamp,frequency,rssi; пусто - не читаем), как часто дочитывать его, с,
+    # и уровень, дБм, который считается равным передатчику на той же частоте
+    SCAN_PATH = os.getenv("SCAN_PATH")
+    SCAN_REFRESH = float(os.getenv("SCAN_REFRESH", 5))
+    NOISE_REFERENCE_DBM = float(os.getenv("NOISE_REFERENCE_DBM", -50))
+    # Разрешен ли POST /api/noise-floor: загрузка дописывается в SCAN_PATH и меняет помехи для всех клиентов
+    NOISE_UPLOAD_ENABLED = os.getenv("NOISE_UPLOAD_ENABLED", "0") == "1"
+
+    # Кэш результатов расчета помех: максимум записей (0 - выключен) и время жизни записи, с
+    RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", 4096))
+    RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", 600))
+
 # Flask будет использовать эти настройки
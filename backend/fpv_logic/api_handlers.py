@@ -1,5 +1,29 @@
-from typing import Dict, List
+import json
+import math
+from concurrent.futures import Executor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from . import heat_planner
 from .interference import InterferenceAnalyzer
+from .optimizer import ChannelOptimizer
+from .pairwise_table import PairwiseTable
+from .catalog import DEFAULT_BANDWIDTH
+from .catalog_index import CatalogIndex
+from .harmonic_index import HarmonicIndex
+from .power_model import PowerModel
+from .profiling import span
+from .spectral_imd import SpectralIMDEngine
+
+LEVEL_MAP = {
+    'none': 'none',
+    'low': 'low',
+    'medium': 'medium',
+    'medium-high': 'medium',
+    'high': 'medium',
+    'critical': 'high'
+}
 
 def calculate_interference(selected_channels: List[Dict], unselected_channel: Dict) -> Dict:
     """
@@ -22,38 +46,464 @@ def calculate_interference(selected_channels: List[Dict], unselected_channel: Di
     # Рассчитываем интерференцию
     interference_result = analyzer.calculate_total_interference(target_frequency, selected_frequencies)
     
-    # Определяем уровень на основе risk_level
-    level_map = {
-        'none': 'none',
-        'low': 'low',
-        'medium': 'medium',
-        'medium-high': 'medium',
-        'critical': 'high'
+    return _format_interference(interference_result)
+
+def _format_interference(interference_result: Dict) -> Dict:
+    """Приводит результат анализатора к формату ответа для фронтенда."""
+    details = {
+        'totalInterference': interference_result['total_percent'],
+        'directInterference': interference_result['direct_interference'],
+        'imdInterference': interference_result['imd_interference'],
+        'debug': interference_result['debug']
     }
-    
+    if 'imd_frequencies' in interference_result:
+        details['imdFrequencies'] = interference_result['imd_frequencies']
+
+    # Определяем уровень на основе risk_level
     return {
-        'level': level_map[interference_result['risk_level']],
-        'details': {
-            'totalInterference': interference_result['total_percent'],
-            'directInterference': interference_result['direct_interference'],
-            'imdInterference': interference_result['imd_interference'],
-            'imdFrequencies': interference_result['imd_frequencies'],
-            'debug': interference_result['debug']
-        }
+        'level': LEVEL_MAP[interference_result['risk_level']],
+        'details': details
     }
 
-def calculate_bulk_interference(selected_channels: List[Dict], unselected_channels: List[Dict]) -> List[Dict]:
+def calculate_bulk_interference(selected_channels: List[Dict], unselected_channels: List[Dict],
+                                include_imd: bool = True, analyzer: InterferenceAnalyzer = None) -> List[Dict]:
     """
     Рассчитывает интерференцию для множества каналов.
+
+    IMD продукты выбранных каналов считаются один раз для всех кандидатов
+    (InterferenceAnalyzer.score_candidates), а не заново для каждого.
     
     Args:
         selected_channels: Список выбранных каналов
         unselected_channels: Список каналов для проверки
+        include_imd: Возвращать ли списки IMD частот (для раскраски всей доски не нужны)
+        analyzer: Анализатор сервера (с измеренным спектром); по умолчанию - новый
     
     Returns:
         Список результатов для каждого канала
     """
-    return [
-        calculate_interference(selected_channels, channel)
-        for channel in unselected_channels
-    ] 
\ No newline at end of file
+    analyzer = analyzer or InterferenceAnalyzer({})
+    results = analyzer.score_candidates(
+        [float(ch['frequency']) for ch in unselected_channels],
+        [float(ch['frequency']) for ch in selected_channels],
+        include_imd=include_imd
+    )
+    return [_format_interference(result) for result in results]
+
+def score_catalog(index: CatalogIndex, selected_specs: List[Dict], candidate_specs: List[Dict] = None,
+                  include_imd: bool = False, analyzer: InterferenceAnalyzer = None) -> List[Dict]:
+    """
+    Оценивает интерференцию кандидатов относительно выбранных каналов одним проходом.
+
+    Args:
+        index: Индексы каталога (DataLoader.get_index)
+        selected_specs: Выбранные каналы (frequency или band/channel/range)
+        candidate_specs: Проверяемые каналы; по умолчанию - весь каталог без выбранных
+        include_imd: Возвращать ли списки IMD частот
+        analyzer: Анализатор сервера (с измеренным спектром); по умолчанию - новый
+
+    Raises:
+        ValueError: если канал не найден в каталоге или каналы переданы не списком объектов
+    """
+    # Кандидаты могут не передаваться (весь каталог), выбранные - всегда список
+    for name, specs in (("selected", selected_specs), ("candidates", candidate_specs or [])):
+        if not isinstance(specs, list) or not all(isinstance(spec, dict) for spec in specs):
+            raise ValueError(f"{name} - список каналов (объектов с band/channel/range или frequency)")
+
+    with span("catalog"):
+        selected = [_resolve_channel(index, spec) for spec in selected_specs]
+
+        if candidate_specs is None:
+            selected_ids = {ch.get("id") for ch in selected}
+            candidates = [ch for ch in index.channels if ch["id"] not in selected_ids]
+        else:
+            candidates = [_resolve_channel(index, spec) for spec in candidate_specs]
+
+    results = calculate_bulk_interference(selected, candidates, include_imd=include_imd, analyzer=analyzer)
+    return [{**candidate, **result} for candidate, result in zip(candidates, results)]
+
+def _resolve_channel(index: CatalogIndex, spec: Dict) -> Dict:
+    """Канал каталога по описанию или само описание, если в нем уже есть частота."""
+    if spec.get("band") is not None:
+        record = find_channel(index, spec)
+        if record is not None:
+            return record
+    if spec.get("frequency") is not None:
+        return spec
+    raise ValueError(f"Канал не найден: band={spec.get('band')}, channel={spec.get('channel')}")
+
+def find_channel(index: CatalogIndex, spec: Dict) -> Dict:
+    """
+    Ищет канал каталога по описанию из запроса.
+
+    Args:
+        index: Индексы каталога (DataLoader.get_index)
+        spec: band/channel и, при необходимости, range/modulation или frequency
+
+    Returns:
+        Запись канала каталога или None
+    """
+    record = index.find(spec.get("band"), spec.get("channel"), spec.get("range"), spec.get("modulation"))
+    if record is not None:
+        return record
+
+    # Если группа не совпала по названию - ищем по частоте
+    if spec.get("frequency") is not None:
+        return index.first_on_frequency(float(spec["frequency"]))
+    return None
+
+def optimize_channel_set(optimizer: ChannelOptimizer, index: CatalogIndex, pinned_specs: List[Dict],
+                         count: int, modulation: str = None, range_name: str = None,
+                         time_budget: float = 0.5) -> Dict:
+    """
+    Подбирает набор из count каналов с закрепленными каналами pinned_specs.
+
+    Кандидаты берутся из указанных modulation/range, а если они не заданы -
+    из диапазона первого закрепленного канала.
+
+    Raises:
+        ValueError: если канал не найден, count меньше 1 или кандидатов не хватает
+    """
+    if count < 1:
+        raise ValueError("count должен быть не меньше 1")
+
+    pinned = []
+    for spec in pinned_specs:
+        record = find_channel(index, spec)
+        if record is None:
+            raise ValueError(f"Канал не найден: band={spec.get('band')}, channel={spec.get('channel')}")
+        if record["frequency"] <= 0:
+            raise ValueError(f"У канала нет частоты: band={spec.get('band')}, channel={spec.get('channel')}")
+        pinned.append(record)
+
+    if modulation is None and range_name is None:
+        if not pinned:
+            raise ValueError("Необходимо указать range или хотя бы один закрепленный канал")
+        modulation, range_name = pinned[0]["modulation"], pinned[0]["range"]
+
+    # Каналы с нулевой частотой - заглушки каталога (например, DJI_25_CE), их не предлагаем
+    pool = [
+        record for record in index.channels
+        if (modulation is None or record["modulation"] == modulation) and
+        (range_name is None or record["range"] == range_name) and record["frequency"] > 0
+    ]
+    if not pool:
+        raise ValueError(f"Нет каналов для modulation={modulation}, range={range_name}")
+    available = len({float(record["frequency"]) for record in pool + pinned})
+    if count > available:
+        raise ValueError(f"count больше числа доступных частот ({available})")
+
+    with span("search"):
+        result = optimizer.optimize(
+            count,
+            pinned=[record["frequency"] for record in pinned],
+            candidates=[record["frequency"] for record in pool],
+            time_budget=time_budget
+        )
+
+    # Частоты обратно в каналы: закрепленные - как есть, остальные - первый канал пула с этой частотой
+    by_frequency = {}
+    for record in pinned + pool:
+        by_frequency.setdefault(float(record["frequency"]), record)
+    pinned_frequencies = {float(record["frequency"]) for record in pinned}
+
+    frequencies = result["frequencies"]
+    selected = []
+    for frequency in frequencies:
+        others = [f for f in frequencies if f != frequency]
+        interference = optimizer.analyzer.calculate_total_interference(frequency, others)
+        selected.append({
+            **by_frequency[frequency],
+            "pinned": frequency in pinned_frequencies,
+            "interference_level": interference["risk_level"],
+            "total_interference": interference["total_percent"]
+        })
+
+    return {
+        "channels": selected,
+        "recommended": [ch for ch in selected if not ch["pinned"]],
+        "worst_interference": max((ch["total_interference"] for ch in selected), default=0),
+        "worst_raw_interference": result["worst_raw_interference"],
+        "complete": result["complete"],
+        "nodes": result["nodes"],
+        "elapsed_ms": result["elapsed_ms"]
+    }
+
+def spectral_imd_report(engine: SpectralIMDEngine, index: CatalogIndex, specs: List[Dict],
+                        max_order: int = 7, include_density: bool = False) -> Dict:
+    """
+    IMD продукты до max_order порядка на сетке спектра (SpectralIMDEngine)
+    для группы каналов: плотность продуктов в полосе каждого канала.
+
+    Raises:
+        ValueError: если канал не найден или порядок некорректен
+    """
+    if max_order < 3 or max_order % 2 == 0:
+        raise ValueError("maxOrder должен быть нечетным и не меньше 3")
+
+    with span("catalog"):
+        records = [_resolve_channel(index, spec) for spec in specs]
+    transmitters = [(float(r["frequency"]), float(r.get("bandwidth") or 20.0)) for r in records]
+
+    with span("imd"):
+        density = engine.density(transmitters, max_order)
+
+    channels = []
+    for record, (frequency, bandwidth) in zip(records, transmitters):
+        channels.append({
+            "band": record.get("band"),
+            "channel": record.get("channel"),
+            "frequency": frequency,
+            "bandwidth": bandwidth,
+            "imd_density": round(density.at(frequency, bandwidth), 4),
+            "imd_density_by_order": {
+                str(order): round(density.at(frequency, bandwidth, order=order), 4) for order in density.by_order
+            }
+        })
+
+    result = {"max_order": max_order, "grid_step_mhz": 1.0, "channels": channels}
+    if include_density:
+        # Только ячейки с продуктами, иначе ответ - тысячи нулей
+        total = density.total()
+        nonzero = np.flatnonzero(total > 1e-6)
+        result["density"] = {
+            "frequencies": density.frequencies[nonzero].tolist(),
+            "values": np.round(total[nonzero], 6).tolist()
+        }
+    return result
+
+def power_model_report(model: PowerModel, index: CatalogIndex, specs: List[Dict], trials: int = 2000,
+                       area_radius: float = 100.0, min_sinr_db: float = 10.0, seed: int = None) -> Dict:
+    """
+    Монте-Карло модель с мощностями и расстояниями (PowerModel) для группы каналов.
+    В описании канала кроме band/channel можно передать power (мВт),
+    pilot [x, y] - место пилота и drone [x, y] - фиксированное положение дрона.
+
+    Raises:
+        ValueError: если канал не найден или параметры некорректны (с именем поля)
+    """
+    if not isinstance(specs, list) or not all(isinstance(spec, dict) for spec in specs):
+        raise ValueError("channels - список каналов (объектов с band/channel/range или frequency)")
+
+    with span("catalog"):
+        records = [_resolve_channel(index, spec) for spec in specs]
+
+    transmitters = []
+    for position, (spec, record) in enumerate(zip(specs, records)):
+        power = spec.get("power")
+        if power is not None and (isinstance(power, bool) or not isinstance(power, (int, float))
+                                  or not math.isfinite(power)):
+            raise ValueError(f"channels[{position}].power должно быть числом (мВт)")
+        transmitters.append({
+            "frequency": float(record["frequency"]),
+            "power_mw": power,
+            "pilot": _point(spec, "pilot", position),
+            "drone": _point(spec, "drone", position)
+        })
+
+    with span("scoring"):
+        result = model.simulate(transmitters, trials=trials, area_radius=area_radius,
+                                min_sinr_db=min_sinr_db, seed=seed)
+
+    for record, channel in zip(records, result["channels"]):
+        channel["band"] = record.get("band")
+        channel["channel"] = record.get("channel")
+    return result
+
+def _point(spec: Dict, field: str, position: int) -> Optional[List[float]]:
+    """
+    Координаты [x, y] из описания канала или None, если поле не задано.
+
+    Raises:
+        ValueError: если поле не пара конечных чисел (в тексте - имя поля, а не ошибка NumPy)
+    """
+    value = spec.get(field)
+    if value is None:
+        return None
+    if (not isinstance(value, list) or len(value) != 2 or
+            not all(isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v) for v in value)):
+        raise ValueError(f"channels[{position}].{field} должно быть парой чисел [x, y] в метрах")
+    return [float(v) for v in value]
+
+def harmonic_report(harmonics: HarmonicIndex, index: CatalogIndex, specs: List[Dict], max_order: int = None,
+                    include_catalog: bool = False) -> Dict:
+    """
+    Попадания гармоник каналов группы в другие каналы группы (любых диапазонов и модуляций).
+    Пары каналов каталога проверяются поиском в HarmonicIndex, частоты вне каталога - перебором порядков.
+
+    Args:
+        harmonics: Индекс гармоник каталога
+        index: Индексы каталога (DataLoader.get_index)
+        specs: Каналы группы (band/channel/range/modulation или frequency и bandwidth)
+        max_order: Высшая гармоника (по умолчанию - порядок индекса)
+        include_catalog: Добавить для каждого канала все задетые им каналы каталога
+
+    Raises:
+        ValueError: если канал не найден или порядок некорректен
+    """
+    max_order = max_order or harmonics.max_order
+    if not 2 <= max_order <= harmonics.max_order:
+        raise ValueError(f"maxOrder должен быть от 2 до {harmonics.max_order}")
+
+    with span("catalog"):
+        records = [_resolve_channel(index, spec) for spec in specs]
+    frequencies = [float(record["frequency"]) for record in records]
+    bandwidths = [float(record.get("bandwidth") or DEFAULT_BANDWIDTH) for record in records]
+
+    conflicts = []
+    with span("scoring"):
+        for source, source_record in enumerate(records):
+            for victim, victim_record in enumerate(records):
+                if source == victim:
+                    continue
+                if source_record.get("id") is not None and victim_record.get("id") is not None:
+                    order = harmonics.order_of(source_record["id"], victim_record["id"])
+                else:
+                    order = harmonics.harmonic_order(frequencies[source], bandwidths[source],
+                                                     frequencies[victim], bandwidths[victim], max_order)
+                if order is None or order > max_order:
+                    continue
+                conflicts.append({
+                    "source": source,
+                    "victim": victim,
+                    "order": order,
+                    "harmonic_mhz": order * frequencies[source],
+                    "offset_mhz": round(order * frequencies[source] - frequencies[victim], 2),
+                    "cross_range": source_record.get("range") != victim_record.get("range")
+                })
+
+    channels = []
+    for record, frequency, bandwidth in zip(records, frequencies, bandwidths):
+        channel = {key: record.get(key) for key in ("modulation", "range", "band", "channel")}
+        channel.update({"frequency": frequency, "bandwidth": bandwidth})
+        if include_catalog and record.get("id") is not None:
+            channel["catalog_victims"] = [
+                {**{key: index.channels[hit["id"]][key] for key in ("modulation", "range", "band", "channel",
+                                                                     "frequency")},
+                 "order": hit["order"], "offset_mhz": hit["offset_mhz"]}
+                for hit in harmonics.victims_of(record["id"], max_order)
+            ]
+        channels.append(channel)
+
+    return {"max_order": max_order, "channels": channels, "conflicts": conflicts}
+
+# Групп в одной задаче пула процессов: мельче - передача задач дороже самого расчета
+BATCH_CHUNK_GROUPS = 32
+
+# Анализатор процесса пула для пакетов (свой, чтобы фон пакета не попал в расчеты планировщика)
+_batch_analyzer = None
+
+
+def _resolve_batch_group(analyzer: InterferenceAnalyzer, group, modulation: str) -> Dict:
+    """Каналы группы пакета ({"channels": [...]}) или {"error": ...} - ошибка не прерывает весь пакет."""
+    if not isinstance(group, list) or not group or not all(isinstance(ch, dict) for ch in group):
+        return {"error": "Группа должна быть непустым списком каналов"}
+    try:
+        return analyzer._resolve_group(group, modulation)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e)}
+
+
+def _group_summary(analyzer: InterferenceAnalyzer, channel_info: List[Dict]) -> Dict:
+    """Сводка группы пакета по найденным каналам."""
+    result = analyzer.compact_analysis(channel_info)
+    pairs = result["pairs"]
+    # Номера пар - верхний треугольник построчно; каналы пары нужны только для критичных
+    first, second = np.triu_indices(len(channel_info), k=1) if result["critical_pairs"] else ((), ())
+    return {
+        "frequencies": result["channels"]["frequency"],
+        "total_interference": result["channels"]["total_interference"],
+        **result["analysis"],
+        "critical_pairs": [
+            {"channels": [int(first[k]), int(second[k])], "interference": pairs["interference"][k],
+             "separation": pairs["separation"][k]}
+            for k in result["critical_pairs"]
+        ]
+    }
+
+
+def _summarize_chunk(task: Dict) -> List[Dict]:
+    """
+    Сводки части групп пакета в процессе пула. Анализатор собирается из параметров модели,
+    попарная таблица открывается через mmap по пути, фон - снимок NoiseSample на частотах групп.
+    """
+    global _batch_analyzer
+    model = task["model"]
+    analyzer = _batch_analyzer
+    if analyzer is None or any(getattr(analyzer, field) != value for field, value in model.items()):
+        analyzer = _batch_analyzer = InterferenceAnalyzer({})
+        for field, value in model.items():
+            setattr(analyzer, field, value)
+
+    table_path = task["table_path"]
+    if table_path is None:
+        analyzer.attach_pairwise_table(None)
+    elif analyzer.pairwise_table is None or analyzer.pairwise_table.path != table_path:
+        analyzer.attach_pairwise_table(PairwiseTable.open(analyzer, task["table_frequencies"], table_path))
+    analyzer.attach_noise_floor(task["noise"])
+    return [_group_summary(analyzer, channel_info) for channel_info in task["groups"]]
+
+
+def _summarize_in_pool(analyzer: InterferenceAnalyzer, groups: List[List[Dict]], executor) -> List[Dict]:
+    """Сводки групп частями по BATCH_CHUNK_GROUPS в процессах executor (порядок сохраняется)."""
+    table = analyzer.pairwise_table
+    table_path = table.path if table is not None else None
+    noise = None
+    if analyzer.noise_floor is not None:
+        noise = analyzer.noise_floor.sample(
+            (ch["frequency"] for channel_info in groups for ch in channel_info), analyzer.CHANNEL_WIDTH
+        )
+    tasks = [
+        {
+            "model": {field: getattr(analyzer, field) for field in heat_planner.MODEL_FIELDS},
+            "table_path": table_path,
+            "table_frequencies": table.frequencies if table_path is not None else None,
+            "noise": noise,
+            "groups": groups[start:start + BATCH_CHUNK_GROUPS]
+        }
+        for start in range(0, len(groups), BATCH_CHUNK_GROUPS)
+    ]
+    return [summary for chunk in executor.map(_summarize_chunk, tasks) for summary in chunk]
+
+
+def analyze_group_batch(analyzer: InterferenceAnalyzer, groups: List[List[Dict]], modulation: str = "analog",
+                        executor: Optional[Executor] = None) -> Dict:
+    """
+    Сводки для множества групп каналов (например, всех заездов сетки) одним запросом.
+
+    Одинаковые группы считаются один раз. Каналы всех групп ищутся в каталоге здесь же,
+    а расчет уникальных групп при executor (пул процессов) идет частями по BATCH_CHUNK_GROUPS
+    в его процессах; если групп меньше одной части, пул не используется. Группа с ошибкой
+    получает {"error": ...}, остальные считаются.
+
+    Args:
+        groups: Группы в формате analyze_group_interference (списки band/channel/range)
+        executor: Пул процессов (services.process_pool) или None - считать в текущем потоке
+
+    Returns:
+        Dict со сводками групп в исходном порядке, числом уникальных групп и ошибок
+    """
+    # Ключ группы - ее JSON: одинаковые описания дают одну сводку
+    unique: Dict[str, int] = {}
+    slots = []
+    for group in groups:
+        key = json.dumps(group, sort_keys=True, ensure_ascii=False, default=str)
+        slots.append(unique.setdefault(key, len(unique)))
+    summaries = [_resolve_batch_group(analyzer, json.loads(key), modulation) for key in unique]
+
+    valid = [i for i, summary in enumerate(summaries) if "error" not in summary]
+    channel_infos = [summaries[i]["channels"] for i in valid]
+    with span("scoring"):
+        if executor is not None and len(valid) > BATCH_CHUNK_GROUPS:
+            computed = _summarize_in_pool(analyzer, channel_infos, executor)
+        else:
+            computed = [_group_summary(analyzer, channel_info) for channel_info in channel_infos]
+    for i, summary in zip(valid, computed):
+        summaries[i] = summary
+
+    results = [{"index": i, **summaries[slot]} for i, slot in enumerate(slots)]
+    return {
+        "groups": results,
+        "unique_groups": len(unique),
+        "errors": sum(1 for result in results if "error" in result)
+    }
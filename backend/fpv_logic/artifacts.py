@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+
+def artifact_path(json_path: str, kind: str, fingerprint_data: Dict, extension: str = "npy") -> str:
+    """
+    Путь к файлу предрасчитанных данных рядом с JSON каталога.
+    Имя содержит отпечаток входных данных: их изменение дает новый файл.
+    """
+    fingerprint = hashlib.sha1(
+        json.dumps(fingerprint_data, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:12]
+    return f"{os.path.splitext(json_path)[0]}.{kind}.{fingerprint}.{extension}"
+
+
+def remove_stale(path: str) -> int:
+    """
+    Удаляет файлы того же вида рядом с каталогом, кроме path
+    (например, снимки по старым версиям JSON).
+
+    Returns:
+        Сколько файлов удалено
+    """
+    base, kind, _, extension = path.rsplit(".", 3)
+    prefix, suffix = f"{os.path.basename(base)}.{kind}.", f".{extension}"
+    folder = os.path.dirname(path) or "."
+    removed = 0
+    for name in os.listdir(folder):
+        if name.startswith(prefix) and name.endswith(suffix) and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(folder, name))
+                removed += 1
+            except OSError as e:
+                print(f"❌ Не удалось удалить {name}: {e}")
+    return removed
+
+
+def load_array(path: str, shape: Tuple[int, ...]) -> Optional[np.ndarray]:
+    """
+    Открывает сохраненный массив через mmap только для чтения.
+    Страницы файла общие для всех процессов (воркеры gunicorn не копируют данные).
+
+    Returns:
+        Массив или None, если файла нет, он поврежден или другой формы
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        values = np.load(path, mmap_mode="r")
+    except (OSError, ValueError) as e:
+        print(f"❌ Ошибка чтения {path}: {e}")
+        return None
+    return values if values.shape == shape else None
+
+
+def _write_atomic(path: str, write: Callable) -> bool:
+    """Пишет файл через временный и os.replace (воркеры могут стартовать одновременно)."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as file:
+            write(file)
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        # Нет прав на запись - просто работаем с данными в памяти
+        print(f"❌ Не удалось сохранить {path}: {e}")
+        return False
+
+
+def save_array(path: str, values: np.ndarray) -> bool:
+    """Сохраняет массив атомарно."""
+    return _write_atomic(path, lambda file: np.save(file, np.ascontiguousarray(values)))
+
+
+def save_object(path: str, value: Any) -> bool:
+    """Сохраняет объект (pickle) атомарно."""
+    return _write_atomic(path, lambda file: pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def load_object(path: str) -> Optional[Any]:
+    """
+    Читает объект, сохраненный save_object.
+    Файлы пишет только сам сервер рядом со своим каталогом.
+
+    Returns:
+        Объект или None, если файла нет или он поврежден
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as file:
+            return pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        print(f"❌ Ошибка чтения {path}: {e}")
+        return None
+
+
+def load_or_build(path: str, shape: Tuple[int, ...], build: Callable[[], np.ndarray]) -> np.ndarray:
+    """
+    Открывает массив с диска через mmap или строит, сохраняет и открывает его заново.
+
+    После сохранения массив тоже читается через mmap: построенная копия
+    освобождается, и процесс (или мастер gunicorn с preload) держит
+    только общие страницы файла. Файлы того же вида с другим отпечатком
+    после сохранения удаляются (remove_stale).
+    """
+    values = load_array(path, shape)
+    if values is not None:
+        print(f"📂 Загружено с диска: {path}")
+        return values
+
+    values = build()
+    if save_array(path, values):
+        print(f"💾 Сохранено: {path}")
+        remove_stale(path)
+        mapped = load_array(path, shape)
+        if mapped is not None:
+            return mapped
+    return values
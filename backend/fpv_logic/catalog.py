@@ -0,0 +1,209 @@
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Ширина канала по умолчанию, если в JSON она не указана или пустая
+DEFAULT_BANDWIDTH = 20.0
+
+
+class CatalogError(ValueError):
+    """Каталог каналов не найден, не читается или не прошел проверку."""
+
+
+class BandInfo:
+    """Группа каналов: общие поля и порядок каналов для восстановления JSON."""
+
+    __slots__ = ("id", "modulation", "range", "name", "parent", "fields", "channel_keys", "placeholders")
+
+    def __init__(self, band_id: int, modulation: str, range_name: str, name: str, parent: Optional[int]):
+        self.id = band_id
+        self.modulation = modulation
+        self.range = range_name
+        self.name = name
+        self.parent = parent        # ID внешней группы, если группа вложена в другую
+        self.fields = {}            # Поля группы кроме каналов (bandname, region, bandwidth...)
+        self.channel_keys = ()      # Номера каналов в исходном порядке
+        self.placeholders = {}      # Незаполненные каналы (пустые строки в JSON)
+
+
+class ChannelRecord:
+    """
+    Канал каталога. Поддерживает доступ как к словарю (record["frequency"]),
+    поэтому может использоваться везде, где раньше были словари каналов.
+    """
+
+    __slots__ = ("id", "band_info", "channel", "frequency", "bandwidth", "region")
+
+    KEYS = ("id", "modulation", "range", "band", "channel", "frequency", "bandwidth", "region")
+
+    def __init__(self, channel_id: int, band_info: BandInfo, channel: str, frequency, bandwidth: float, region):
+        self.id = channel_id
+        self.band_info = band_info
+        self.channel = channel
+        self.frequency = frequency
+        self.bandwidth = bandwidth
+        self.region = region
+
+    @property
+    def modulation(self) -> str:
+        return self.band_info.modulation
+
+    @property
+    def range(self) -> str:
+        return self.band_info.range
+
+    @property
+    def band(self) -> str:
+        return self.band_info.name
+
+    def keys(self):
+        return self.KEYS
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.KEYS else default
+
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, key) for key in self.KEYS}
+
+
+class ChannelCatalog:
+    """
+    Компактное представление каталога вместо вложенного JSON-словаря.
+
+    Строки (модуляции, диапазоны, группы, регионы) интернированы и хранятся
+    один раз, каналы - записи со __slots__, а частоты, ширины каналов,
+    группы и регионы дополнительно лежат в параллельных NumPy-колонках
+    для векторных расчетов. to_dict() восстанавливает исходную форму JSON.
+    """
+
+    def __init__(self):
+        self.bands: List[BandInfo] = []
+        self.records: List[ChannelRecord] = []
+        self.regions: List[Optional[str]] = []
+
+        # Параллельные колонки по ID канала (заполняются в _finalize)
+        self.frequency = np.empty(0, dtype=np.float64)
+        self.bandwidth = np.empty(0, dtype=np.float32)
+        self.band_id = np.empty(0, dtype=np.int16)
+        self.region_id = np.empty(0, dtype=np.int8)
+
+        self._modulations = []
+        self._ranges = {}
+
+    @classmethod
+    def from_data(cls, data: Dict) -> "ChannelCatalog":
+        """Строит каталог из вложенного JSON (modulation -> range -> band -> channels)."""
+        catalog = cls()
+        for modulation, ranges in data.items():
+            modulation = sys.intern(modulation)
+            catalog._modulations.append(modulation)
+            catalog._ranges[modulation] = []
+            for range_name, bands in ranges.items():
+                range_name = sys.intern(range_name)
+                catalog._ranges[modulation].append(range_name)
+                for band_name, band in bands.items():
+                    catalog._add_band(modulation, range_name, band_name, band, None)
+        catalog._finalize()
+        return catalog
+
+    def _add_band(self, modulation: str, range_name: str, band_name: str, band: Dict, parent: Optional[int]):
+        """Добавляет группу и ее каналы (включая вложенные группы)."""
+        info = BandInfo(len(self.bands), modulation, range_name, sys.intern(band_name), parent)
+        self.bands.append(info)
+
+        # Ширина канала называется по-разному в разных версиях JSON и бывает пустой
+        bandwidth = band.get("bandwidth", band.get("channelWidth"))
+        bandwidth = float(bandwidth) if bandwidth not in (None, "") else DEFAULT_BANDWIDTH
+        region = band.get("region")
+        region = sys.intern(region) if isinstance(region, str) else region
+
+        nested = []
+        for key, value in band.items():
+            if key == "channels":
+                continue
+            if isinstance(value, dict) and "channels" in value:
+                # В некоторых группах внутрь вложены другие группы (например, режимы DJI)
+                nested.append((key, value))
+            else:
+                info.fields[sys.intern(key)] = value
+
+        channels = band.get("channels", {})
+        info.channel_keys = tuple(sys.intern(str(key)) for key in channels)
+        for channel, frequency in channels.items():
+            # Незаполненные каналы храним отдельно - в расчетах они не участвуют
+            if not isinstance(frequency, (int, float)):
+                info.placeholders[channel] = frequency
+                continue
+            self.records.append(ChannelRecord(
+                len(self.records), info, sys.intern(str(channel)), frequency, bandwidth, region
+            ))
+
+        for key, value in nested:
+            self._add_band(modulation, range_name, key, value, info.id)
+
+    def _finalize(self):
+        """Заполняет колонки по ID канала."""
+        n = len(self.records)
+        self.frequency = np.fromiter((r.frequency for r in self.records), dtype=np.float64, count=n)
+        self.bandwidth = np.fromiter((r.bandwidth for r in self.records), dtype=np.float32, count=n)
+        self.band_id = np.fromiter((r.band_info.id for r in self.records), dtype=np.int16, count=n)
+
+        region_codes = {}
+        for record in self.records:
+            region_codes.setdefault(record.region, len(region_codes))
+        self.regions = list(region_codes)
+        self.region_id = np.fromiter((region_codes[r.region] for r in self.records), dtype=np.int8, count=n)
+
+    def validate(self, source: str = "каталог"):
+        """
+        Проверяет, что в каталоге есть каналы с корректными частотами и ширинами.
+
+        Raises:
+            CatalogError: если каталог пустой или в нем некорректные значения
+        """
+        if not self.records:
+            raise CatalogError(f"{source}: в каталоге нет ни одного канала")
+        if not np.all(np.isfinite(self.frequency)) or np.any(self.frequency < 0):
+            bad = self.records[int(np.argmax(~np.isfinite(self.frequency) | (self.frequency < 0)))]
+            raise CatalogError(f"{source}: некорректная частота {bad.frequency} ({bad.band} {bad.channel})")
+        if not np.any(self.frequency > 0):
+            raise CatalogError(f"{source}: в каталоге нет ни одной ненулевой частоты")
+        if not np.all(self.bandwidth > 0):
+            bad = self.records[int(np.argmax(~(self.bandwidth > 0)))]
+            raise CatalogError(f"{source}: некорректная ширина канала {bad.bandwidth} ({bad.band})")
+
+    def __len__(self):
+        return len(self.records)
+
+    def to_dict(self) -> Dict:
+        """Восстанавливает исходную форму JSON (для /api/data)."""
+        by_band = {}
+        for record in self.records:
+            by_band.setdefault(record.band_info.id, {})[record.channel] = record.frequency
+
+        built = {}
+        result = {modulation: {range_name: {} for range_name in self._ranges[modulation]}
+                  for modulation in self._modulations}
+
+        for info in self.bands:
+            channels = by_band.get(info.id, {})
+            # Поля группы, затем каналы, затем вложенные группы - как в исходном JSON
+            band = dict(info.fields)
+            band["channels"] = {
+                key: channels[key] if key in channels else info.placeholders[key]
+                for key in info.channel_keys
+            }
+            built[info.id] = band
+
+            if info.parent is None:
+                result[info.modulation][info.range][info.name] = band
+            else:
+                built[info.parent][info.name] = band
+
+        return result
@@ -0,0 +1,116 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from itertools import count
+from typing import Dict, Iterable, List, Optional
+
+
+class FrequencyIndex:
+    """
+    Отсортированный массив частот с запросами соседей через bisect.
+    Поиск соседей в окне стоит O(log n + k), где k - число найденных.
+    """
+
+    def __init__(self, frequencies: Iterable[float], ids: Optional[Iterable[int]] = None):
+        pairs = sorted(zip(
+            (float(f) for f in frequencies),
+            ids if ids is not None else count()
+        ))
+        self.frequencies = [f for f, _ in pairs]
+        self.ids = [i for _, i in pairs]
+
+    def __len__(self):
+        return len(self.frequencies)
+
+    def _window(self, frequency: float, within: float):
+        """Границы среза частот в окне [frequency - within, frequency + within]."""
+        return (bisect_left(self.frequencies, frequency - within),
+                bisect_right(self.frequencies, frequency + within))
+
+    def ids_within(self, frequency: float, within: float) -> List[int]:
+        """ID каналов не дальше within МГц от frequency."""
+        lo, hi = self._window(frequency, within)
+        return self.ids[lo:hi]
+
+    def count_within(self, frequency: float, within: float) -> int:
+        """Число частот не дальше within МГц от frequency."""
+        lo, hi = self._window(frequency, within)
+        return hi - lo
+
+    def nearest_distance(self, frequency: float, exclude_self: bool = False) -> float:
+        """
+        Расстояние до ближайшей частоты индекса.
+
+        Args:
+            exclude_self: Не учитывать одно вхождение самой frequency
+                (когда индекс построен по группе, в которую входит цель)
+        """
+        values = self.frequencies
+        pos = bisect_left(values, frequency)
+        right = pos
+        if exclude_self and right < len(values) and values[right] == frequency:
+            right += 1
+
+        best = float('inf')
+        if pos > 0:
+            best = frequency - values[pos - 1]
+        if right < len(values):
+            best = min(best, values[right] - frequency)
+        return best
+
+
+class CatalogIndex:
+    """
+    Индексы каталога каналов:
+    - ID канала -> частота и запись канала;
+    - (modulation, range, band, channel) -> ID за один поиск в словаре;
+    - частота -> все (modulation, range, band, channel) на этой частоте;
+    - отсортированный FrequencyIndex для поиска соседей.
+    """
+
+    def __init__(self, channels: List[Dict]):
+        self.channels = channels
+        self.id_to_frequency = [float(ch["frequency"]) for ch in channels]
+
+        self._by_key = {}
+        self._by_band_channel = defaultdict(list)
+        self._by_frequency = defaultdict(list)
+        for ch in channels:
+            key = (ch["modulation"], ch["range"], ch["band"], str(ch["channel"]))
+            self._by_key.setdefault(key, ch["id"])
+            self._by_band_channel[(ch["band"], str(ch["channel"]))].append(ch["id"])
+            self._by_frequency[float(ch["frequency"])].append(ch["id"])
+
+        self.sorted = FrequencyIndex(self.id_to_frequency, [ch["id"] for ch in channels])
+
+    def get_frequency(self, modulation: str, range_name: str, band: str, channel: str) -> Optional[float]:
+        """Частота канала или None (аналог вложенных .get в анализаторе)."""
+        channel_id = self._by_key.get((modulation, range_name, band, str(channel)))
+        return self.channels[channel_id]["frequency"] if channel_id is not None else None
+
+    def find(self, band: str, channel: str, range_name: str = None, modulation: str = None) -> Optional[Dict]:
+        """Первый канал каталога с band/channel; range и modulation проверяются, если заданы."""
+        if range_name is not None and modulation is not None:
+            channel_id = self._by_key.get((modulation, range_name, band, str(channel)))
+            return self.channels[channel_id] if channel_id is not None else None
+
+        for channel_id in self._by_band_channel.get((band, str(channel)), []):
+            record = self.channels[channel_id]
+            if range_name in (None, record["range"]) and modulation in (None, record["modulation"]):
+                return record
+        return None
+
+    def lookup_frequency(self, frequency: float) -> List[Dict]:
+        """Обратный поиск: все каналы каталога на этой частоте."""
+        return [
+            {key: self.channels[channel_id][key] for key in ("modulation", "range", "band", "channel")}
+            for channel_id in self._by_frequency.get(float(frequency), [])
+        ]
+
+    def first_on_frequency(self, frequency: float) -> Optional[Dict]:
+        """Первый канал каталога на этой частоте."""
+        ids = self._by_frequency.get(float(frequency))
+        return self.channels[ids[0]] if ids else None
+
+    def neighbours(self, frequency: float, within: float) -> List[Dict]:
+        """Каналы каталога не дальше within МГц от frequency."""
+        return [self.channels[channel_id] for channel_id in self.sorted.ids_within(frequency, within)]
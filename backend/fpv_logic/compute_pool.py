@@ -0,0 +1,104 @@
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Hashable
+
+from .profiling import profiled
+
+
+class Saturated(Exception):
+    """Пул расчетов занят: очередь заполнена или ответ не дождались за отведенное время."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ComputePool:
+    """
+    Ограниченный пул потоков для тяжелых расчетов с объединением одинаковых запросов.
+
+    Одновременные запросы с одним ключом ждут один и тот же расчет (single-flight).
+    Если все потоки заняты и очередь заполнена, новый расчет сразу отклоняется
+    исключением Saturated - сервер отвечает 503 с Retry-After вместо того,
+    чтобы копить ожидающие запросы в воркерах.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 8, timeout: float = 10.0, retry_after: int = 1):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fpv-compute")
+        # RLock: done-callback уже завершенного расчета вызывается сразу, под этой же блокировкой
+        self._lock = threading.RLock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self.pending = 0      # Расчеты в работе и в очереди
+        self.computed = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def run(self, key: Hashable, compute: Callable[[], object]):
+        """
+        Выполняет compute в пуле или присоединяется к уже идущему расчету с тем же ключом.
+        Исключения расчета пробрасываются всем ожидающим.
+
+        Raises:
+            Saturated: если очередь заполнена или расчет не завершился за timeout
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                if self.pending >= self.workers + self.max_queue:
+                    self.rejected += 1
+                    raise Saturated("Сервер перегружен, повторите запрос позже", self.retry_after)
+                self.pending += 1
+                self.computed += 1
+                # Контекст запроса (замеры этапов для Server-Timing и профилировщик) переносим в поток пула
+                future = self._executor.submit(contextvars.copy_context().run, profiled(compute))
+                self._in_flight[key] = future
+                future.add_done_callback(lambda done, key=key: self._finish(key, done))
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            raise Saturated("Расчет не завершился вовремя, повторите запрос позже", self.retry_after)
+
+    def _finish(self, key: Hashable, future: Future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            self.pending -= 1
+
+    def stats(self) -> Dict:
+        """Счетчики пула."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "pending": self.pending,
+                "computed": self.computed,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out
+            }
+
+    def render_metrics(self) -> str:
+        """Счетчики в формате Prometheus (дополняют /metrics)."""
+        stats = self.stats()
+        lines = [
+            "# HELP fpv_compute_pending Расчеты в работе и в очереди пула",
+            "# TYPE fpv_compute_pending gauge",
+            f"fpv_compute_pending {stats['pending']}",
+            "# HELP fpv_compute_requests_total Запросы к пулу расчетов по исходу",
+            "# TYPE fpv_compute_requests_total counter"
+        ]
+        for outcome in ("computed", "coalesced", "rejected", "timed_out"):
+            lines.append(f'fpv_compute_requests_total{{outcome="{outcome}"}} {stats[outcome]}')
+        return "\n".join(lines) + "\n"
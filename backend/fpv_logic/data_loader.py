@@ -1,26 +1,137 @@
 import json
 import os
+import time
+
+from . import artifacts
+from .catalog import CatalogError, ChannelCatalog
+from .catalog_index import CatalogIndex
+from .result_cache import RESULT_CACHE
+
+# Каталог по умолчанию - относительно пакета, а не текущей папки процесса
+DEFAULT_JSON_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "channels.json")
+
+# Версия формата снимка: меняется вместе с классами каталога и индекса
+SNAPSHOT_VERSION = 1
+
 
 class DataLoader:
-    _cached_data = None  # Статическая переменная для хранения загруженных данных
+    _cached_catalog = None  # Статическая переменная: компактный каталог вместо вложенного JSON
+    _cached_index = None  # Индексы каталога для быстрого поиска
+    _cached_stamp = None  # Время изменения и размер JSON, из которого построен каталог
 
-    def __init__(self, json_path="backend/data/channels.json"):
+    def __init__(self, json_path=DEFAULT_JSON_PATH, use_snapshot: bool = True):
         self.json_path = json_path
+        self.use_snapshot = use_snapshot
+        self.load_seconds = 0.0  # Время последней загрузки (для замеров старта)
+        self.loaded_from = None  # "snapshot" или "json"
 
         # Если данные еще не загружены - загружаем
-        if DataLoader._cached_data is None:
-            DataLoader._cached_data = self._load_json()
-            print("✅ Данные загружены и сохранены в памяти сервера.")
+        if DataLoader._cached_catalog is None:
+            self._load()
+            print(f"✅ Данные загружены и сохранены в памяти сервера "
+                  f"({len(DataLoader._cached_catalog)} каналов, {self.loaded_from}, {self.load_seconds * 1000:.1f} мс).")
+
+    def _load(self):
+        """
+        Загружает каталог и индексы: из снимка рядом с JSON, если он есть
+        и соответствует файлу, иначе разбирает JSON, проверяет и сохраняет снимок.
+
+        Raises:
+            CatalogError: если JSON не найден, не читается или каталог некорректен
+        """
+        started = time.perf_counter()
+        # Отметку берем до чтения: правка файла во время загрузки даст еще одно перечитывание
+        stamp = self.file_stamp()
+        snapshot_path = self.snapshot_path() if self.use_snapshot else None
+
+        snapshot = artifacts.load_object(snapshot_path) if snapshot_path else None
+        if isinstance(snapshot, tuple) and len(snapshot) == 2 and isinstance(snapshot[0], ChannelCatalog):
+            catalog, index = snapshot
+            self.loaded_from = "snapshot"
+        else:
+            # Разобранный JSON после построения каталога не храним
+            catalog = ChannelCatalog.from_data(self._load_json())
+            catalog.validate(self.json_path)
+            index = CatalogIndex(catalog.records)
+            self.loaded_from = "json"
+            if snapshot_path and artifacts.save_object(snapshot_path, (catalog, index)):
+                # Снимки прошлых версий JSON больше не подойдут
+                artifacts.remove_stale(snapshot_path)
+
+        DataLoader._cached_catalog = catalog
+        DataLoader._cached_index = index
+        DataLoader._cached_stamp = stamp
+        self.load_seconds = time.perf_counter() - started
+
+    def snapshot_path(self) -> str:
+        """
+        Путь к снимку каталога: отпечаток - размер и время изменения JSON,
+        поэтому правка файла дает новый снимок.
+
+        Raises:
+            CatalogError: если JSON каталога не найден
+        """
+        try:
+            stat = os.stat(self.json_path)
+        except OSError as e:
+            raise CatalogError(f"Каталог каналов не найден: {self.json_path} ({e})") from e
+        return artifacts.artifact_path(self.json_path, "catalog", {
+            "version": SNAPSHOT_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        }, extension="pickle")
+
+    def file_stamp(self):
+        """Время изменения и размер JSON каталога (None, если файла нет)."""
+        try:
+            stat = os.stat(self.json_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def is_stale(self) -> bool:
+        """Изменился ли JSON каталога после загрузки (одна проверка os.stat)."""
+        return self.file_stamp() != DataLoader._cached_stamp
 
     def _load_json(self):
-        """Загружает JSON с частотами (только один раз за запуск сервера)."""
+        """
+        Загружает JSON с частотами.
+
+        Raises:
+            CatalogError: если файла нет или это не JSON-объект
+        """
         try:
             with open(self.json_path, "r", encoding="utf-8") as file:
-                return json.load(file)  # Читает и конвертирует JSON в словарь
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"❌ Ошибка загрузки JSON: {e}")
-            return {}
+                data = json.load(file)  # Читает и конвертирует JSON в словарь
+        except (OSError, json.JSONDecodeError) as e:
+            raise CatalogError(f"Ошибка загрузки каталога {self.json_path}: {e}") from e
+        if not isinstance(data, dict):
+            raise CatalogError(f"{self.json_path}: ожидался JSON-объект modulation -> range -> band")
+        return data
+
+    def reload(self):
+        """
+        Перечитывает JSON (например, после правки файла каталога на сервере).
+
+        Raises:
+            CatalogError: если новый каталог не читается или некорректен (прежний остается в памяти)
+        """
+        self._load()
+        # Результаты, посчитанные по старому каталогу, больше не нужны
+        RESULT_CACHE.invalidate()
+        print("🔄 Данные каталога перечитаны из файла.")
 
     def get_data(self):
-        """Возвращает данные из кэша (не загружает файл повторно)."""
-        return DataLoader._cached_data
+        """Возвращает данные в исходной форме JSON (собираются из каталога)."""
+        return DataLoader._cached_catalog.to_dict()
+
+    def get_catalog(self) -> ChannelCatalog:
+        """Возвращает компактный каталог каналов."""
+        return DataLoader._cached_catalog
+
+    def get_index(self) -> CatalogIndex:
+        """
+        Возвращает индексы каталога: поиск частоты по каналу, обратный поиск
+        канала по частоте и отсортированные частоты для запросов соседей.
+        """
+        return DataLoader._cached_index
@@ -0,0 +1,357 @@
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from . import imd_engine
+from .interference import InterferenceAnalyzer
+
+# Отношения мощностей округлены до 4 знаков - суммы храним целыми
+# в единицах 1e-4, чтобы добавления и удаления не накапливали ошибку
+RATIO_SCALE = 10000
+
+
+class GroupSession:
+    """
+    Группа каналов, которая живет на сервере между запросами.
+
+    Добавление или удаление канала пересчитывает только его строку
+    матрицы и IMD продукты с его участием (O(n²) продуктов), а
+    остальные каналы получают поправки к уже накопленным суммам.
+
+    Поправки всех n каналов от этих продуктов - один массив n × O(n²),
+    а сумма нового канала идет по всем уникальным продуктам группы (O(n³)),
+    так что изменение стоит O(n³) операций NumPy против O(n⁴) у полного анализа.
+    """
+
+    def __init__(self, analyzer: InterferenceAnalyzer, modulation: str = "analog"):
+        self.analyzer = analyzer
+        self.modulation = modulation
+        self.version = 0
+        self.touched_at = time.monotonic()
+        self.lock = threading.Lock()  # Изменения одной сессии выполняем по очереди
+
+        self.channels = []          # Информация о каналах, как в analyze_group_interference
+        self.matrix = []            # Парные ячейки матрицы взаимных помех
+        self.products = Counter()   # IMD продукт -> сколько троек каналов его дают
+        self._direct = []           # Суммы прямых помех каждого канала (в RATIO_SCALE)
+        self._imd = []              # Суммы помех от IMD продуктов (в RATIO_SCALE)
+        self._totals = []           # Последние отданные клиенту уровни помех
+
+    @property
+    def frequencies(self) -> List[float]:
+        return [ch["frequency"] for ch in self.channels]
+
+    def state(self) -> Dict:
+        """
+        Состояние, которое хранит клиент: модуляция, каналы и версия.
+        По нему любой воркер может восстановить сессию (см. SessionStore.restore).
+        """
+        return {
+            "modulation": self.modulation,
+            "channels": [{"band": ch["band"], "channel": ch["channel"], "range": ch["range"]}
+                         for ch in self.channels],
+            "version": self.version
+        }
+
+    def add_channel(self, spec: Dict[str, str]) -> Dict:
+        """
+        Добавляет канал в группу.
+
+        Returns:
+            Дельта: новая строка матрицы, изменения IMD продуктов
+            и каналы, у которых изменился уровень помех
+
+        Raises:
+            ValueError: если канал описан не объектом
+            KeyError: если канал не найден
+        """
+        if not isinstance(spec, dict):
+            raise ValueError("Канал должен быть объектом с band, channel и range")
+        band = spec.get("band")
+        channel = spec.get("channel")
+        range_name = spec.get("range", "5.8GHz")
+
+        freq = self.analyzer.get_frequency(self.modulation, range_name, band, channel)
+        if not freq:
+            raise KeyError(f"Канал не найден: band={band}, channel={channel}")
+
+        frequencies = self.frequencies
+        added, _ = self._update_products(imd_engine.imd_products_with(freq, frequencies)[0], 1)
+
+        # Поправки для уже выбранных каналов: новый прямой сосед и новые IMD продукты
+        direct_delta = self._scaled_ratios(freq, frequencies)
+        imd_delta = self._scaled_sums(frequencies, added)
+        for i in range(len(frequencies)):
+            self._direct[i] += int(direct_delta[i])
+            self._imd[i] += int(imd_delta[i])
+
+        # Новый канал: все соседи и все уникальные продукты группы
+        self._direct.append(int(direct_delta.sum()))
+        products = np.fromiter(self.products, dtype=np.float64, count=len(self.products))
+        self._imd.append(int(self._scaled_sums([freq], products)[0]))
+
+        info = {"band": band, "channel": channel, "frequency": freq, "range": range_name}
+        self.channels.append(info)
+
+        row = [self.analyzer._pair_cell(freq, f) for f in frequencies]
+        for i, cell in enumerate(row):
+            self.matrix[i].append(cell)
+        self.matrix.append(row + [{"interference": 0, "risk_level": "self"}])
+        self._totals.append(None)
+
+        index = len(self.channels) - 1
+        return self._delta("add", index, {
+            "channel": info,
+            "row": self.matrix[index],
+            "imd_added": sorted(added),
+            "imd_removed": []
+        })
+
+    def remove_channel(self, index: int) -> Dict:
+        """
+        Удаляет канал с позиции index.
+
+        Returns:
+            Дельта: номер удаленного канала, изменения IMD продуктов
+            и каналы, у которых изменился уровень помех
+        """
+        if not 0 <= index < len(self.channels):
+            raise IndexError(f"Нет канала с номером {index}")
+
+        info = self.channels.pop(index)
+        freq = info["frequency"]
+        for store in (self._direct, self._imd, self._totals, self.matrix):
+            store.pop(index)
+        for row in self.matrix:
+            row.pop(index)
+
+        frequencies = self.frequencies
+        _, removed = self._update_products(imd_engine.imd_products_with(freq, frequencies)[0], -1)
+
+        direct_delta = self._scaled_ratios(freq, frequencies)
+        imd_delta = self._scaled_sums(frequencies, removed)
+        for i in range(len(frequencies)):
+            self._direct[i] -= int(direct_delta[i])
+            self._imd[i] -= int(imd_delta[i])
+
+        return self._delta("remove", index, {
+            "channel": info,
+            "imd_added": [],
+            "imd_removed": sorted(removed)
+        })
+
+    def find_channel(self, spec: Dict[str, str]) -> int:
+        """Номер канала в группе по band/channel/range или -1."""
+        for i, ch in enumerate(self.channels):
+            if (ch["band"] == spec.get("band") and str(ch["channel"]) == str(spec.get("channel")) and
+                    ch["range"] == spec.get("range", ch["range"])):
+                return i
+        return -1
+
+    def snapshot(self) -> Dict:
+        """Полный результат в формате analyze_group_interference."""
+        specs = [{"band": ch["band"], "channel": ch["channel"], "range": ch["range"]} for ch in self.channels]
+        if len(specs) < 2:
+            return {"channels": self.channels, "interference_matrix": self.matrix, "critical_pairs": []}
+        return self.analyzer.analyze_group_interference(specs, self.modulation)
+
+    def _update_products(self, products: np.ndarray, step: int):
+        """Меняет счетчики IMD продуктов и возвращает появившиеся и исчезнувшие продукты."""
+        added, removed = [], []
+        for product in products.tolist():
+            count = self.products[product] + step
+            if count <= 0:
+                del self.products[product]
+                removed.append(product)
+            else:
+                if count == 1 and step > 0:
+                    added.append(product)
+                self.products[product] = count
+        return added, removed
+
+    def _scaled_ratios(self, target_freq: float, frequencies) -> np.ndarray:
+        """Отношения мощностей в целых единицах RATIO_SCALE."""
+        if len(frequencies) == 0:
+            return np.zeros(0, dtype=np.int64)
+        ratios = imd_engine.power_ratios(
+            target_freq, frequencies, self.analyzer.POWER_DECAY, self.analyzer.CHANNEL_WIDTH
+        )
+        return np.rint(ratios * RATIO_SCALE).astype(np.int64)
+
+    def _scaled_sums(self, targets, frequencies) -> np.ndarray:
+        """
+        Суммы отношений мощностей каждой цели ко всем частотам (в единицах RATIO_SCALE)
+        одним массивом targets × frequencies; каждое отношение округляется до суммирования,
+        как в _scaled_ratios.
+        """
+        targets = np.asarray(targets, dtype=np.float64)
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        if targets.size == 0 or frequencies.size == 0:
+            return np.zeros(targets.size, dtype=np.int64)
+        ratios = imd_engine.power_ratios(
+            0.0, targets[:, None] - frequencies[None, :], self.analyzer.POWER_DECAY, self.analyzer.CHANNEL_WIDTH
+        )
+        return np.rint(ratios * RATIO_SCALE).astype(np.int64).sum(axis=1)
+
+    def _channel_levels(self) -> List[Dict]:
+        """
+        Уровни помех всех каналов по накопленным суммам и измеренному фону
+        (та же формула, что в анализаторе).
+        """
+        n = len(self.channels)
+        if n < 2:
+            return [{"total_interference": 0, "interference_level": "none"} for _ in range(n)]
+
+        freqs = np.asarray(self.frequencies, dtype=np.float64)
+        separation = np.abs(freqs[:, None] - freqs[None, :])
+        np.fill_diagonal(separation, np.inf)
+        close = (separation <= self.analyzer.MIN_SAFE_DISTANCE * 1.5).sum(axis=1)
+
+        direct_coef, imd_coef = self.analyzer.interference_coefs(close)
+        # Измеренный сканером фон не накапливается: он меняется сам по себе и берется текущим
+        level = (direct_coef * (np.asarray(self._direct) / RATIO_SCALE + self.analyzer.measured_noise(freqs)) +
+                 imd_coef * np.asarray(self._imd) / RATIO_SCALE)
+        multiplier = self.analyzer.interference_multipliers(separation.min(axis=1), close, n)
+        totals = np.minimum(100, level * multiplier)
+
+        return [
+            {"total_interference": round(float(total), 2), "interference_level": self.analyzer.get_risk_level(total)}
+            for total in totals
+        ]
+
+    def _analysis(self) -> Dict:
+        """Сводка по группе: считается по уже заполненным парным ячейкам."""
+        cells = [
+            cell for i, row in enumerate(self.matrix)
+            for j, cell in enumerate(row) if i < j
+        ]
+        if not cells:
+            return {"total_channels": len(self.channels), "max_interference": 0,
+                    "safe_separation": True, "min_separation": None}
+
+        max_interference = max(cell["interference"] for cell in cells)
+        min_separation = min(cell["separation"] for cell in cells)
+        return {
+            "total_channels": len(self.channels),
+            "max_interference": max_interference,
+            "safe_separation": (min_separation >= self.analyzer.MIN_SAFE_DISTANCE and
+                                max_interference < self.analyzer.INTERFERENCE_THRESHOLDS["high"]),
+            "min_separation": min_separation
+        }
+
+    def _delta(self, operation: str, index: int, payload: Dict) -> Dict:
+        """Собирает ответ-дельту и запоминает отданные уровни помех."""
+        self.version += 1
+        self.touched_at = time.monotonic()
+
+        updated = []
+        for i, levels in enumerate(self._channel_levels()):
+            if self._totals[i] != levels:
+                self._totals[i] = levels
+                self.channels[i].update(levels)
+                updated.append({"index": i, **levels})
+
+        # Критичность пары зависит только от самой пары - новые пары бывают только у добавленного канала
+        critical_pairs = []
+        if operation == "add":
+            for j, cell in enumerate(self.matrix[index]):
+                if j != index and (cell["separation"] < self.analyzer.MIN_SAFE_DISTANCE or
+                                   cell["interference"] >= self.analyzer.INTERFERENCE_THRESHOLDS["high"]):
+                    critical_pairs.append({
+                        "channel1": self.channels[index],
+                        "channel2": self.channels[j],
+                        "interference": cell["interference"],
+                        "separation": cell["separation"]
+                    })
+
+        return {
+            "version": self.version,
+            "operation": operation,
+            "index": index,
+            **payload,
+            "updated": updated,
+            "critical_pairs_added": critical_pairs,
+            "analysis": self._analysis()
+        }
+
+
+class SessionStore:
+    """
+    Хранилище сессий в памяти процесса с ограничением по числу и времени жизни.
+    У каждого воркера gunicorn свое хранилище: если запрос попал в воркер,
+    где сессии нет или она отстала, сессия восстанавливается из состояния клиента.
+    """
+
+    def __init__(self, analyzer: InterferenceAnalyzer, max_sessions: int = 500, ttl: float = 3600):
+        self.analyzer = analyzer
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, modulation: str = "analog") -> Tuple[str, GroupSession]:
+        """Создает пустую сессию и возвращает ее идентификатор."""
+        session_id = uuid.uuid4().hex
+        session = GroupSession(self.analyzer, modulation)
+        self._put(session_id, session)
+        return session_id, session
+
+    def get(self, session_id: str) -> GroupSession:
+        """Возвращает сессию или None, если она не найдена или устарела."""
+        with self._lock:
+            self._evict()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.touched_at = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def restore(self, session_id: str, state: Dict) -> GroupSession:
+        """
+        Восстанавливает сессию по состоянию клиента (результат GroupSession.state).
+
+        Если в этом воркере уже есть сессия той же версии, возвращается она.
+
+        Raises:
+            KeyError: если канал из состояния не найден
+            ValueError: если состояние некорректно
+        """
+        if not isinstance(state, dict) or not isinstance(state.get("channels"), list):
+            raise ValueError("Некорректное состояние сессии")
+        version = int(state.get("version", 0))
+
+        session = self.get(session_id)
+        if session is not None and session.version == version:
+            return session
+
+        session = GroupSession(self.analyzer, state.get("modulation", "analog"))
+        for spec in state["channels"]:
+            session.add_channel(spec)
+        session.version = version
+        self._put(session_id, session)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _put(self, session_id: str, session: GroupSession):
+        """Сохраняет сессию, вытесняя устаревшие и самые давние сверх лимита."""
+        with self._lock:
+            self._evict()
+            self._sessions[session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def _evict(self):
+        """Удаляет сессии, к которым давно не обращались (самые старые - в начале)."""
+        deadline = time.monotonic() - self.ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.touched_at >= deadline:
+                break
+            self._sessions.popitem(last=False)
@@ -0,0 +1,83 @@
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Высшая гармоника по умолчанию (сервер переопределяет ее из Config)
+DEFAULT_MAX_ORDER = 5
+
+
+class HarmonicIndex:
+    """
+    Заранее посчитанные попадания гармоник каналов каталога в другие каналы.
+
+    Гармоника порядка k канала с частотой f и шириной полосы b занимает
+    k*f ± k*b/2 (девиация FM растет вместе с номером гармоники) и задевает
+    канал-жертву, если пересекается с его полосой. Сравниваются все каналы
+    каталога между собой, без учета модуляции и диапазона: так находятся,
+    например, 2-я и 3-я гармоники 2.4 ГГц и 4-я гармоника 1.3 ГГц в 5.2-5.8 ГГц.
+
+    Хранение - CSR по ID канала-источника: victims[offsets[i]:offsets[i + 1]]
+    (порядок гармоники - в orders, отстройка от центра жертвы - в offsets_mhz),
+    плюс словарь (источник, жертва) -> младший порядок для проверки групп поиском в словаре.
+    """
+
+    def __init__(self, frequencies: Iterable[float], bandwidths: Iterable[float], max_order: int = DEFAULT_MAX_ORDER):
+        if max_order < 2:
+            raise ValueError("Порядок гармоник должен быть не меньше 2")
+        self.frequencies = np.asarray(list(frequencies), dtype=np.float64)
+        self.bandwidths = np.asarray(list(bandwidths), dtype=np.float64)
+        self.max_order = max_order
+
+        # Все порядки сразу: (порядок, источник, жертва); нулевая частота - недоступный канал
+        orders = np.arange(2, max_order + 1, dtype=np.float64)[:, None, None]
+        used = self.frequencies > 0
+        harmonic = orders * self.frequencies[None, :, None]
+        distance = np.abs(harmonic - self.frequencies[None, None, :])
+        reach = orders * self.bandwidths[None, :, None] / 2 + self.bandwidths[None, None, :] / 2
+        hit = (distance < reach) & used[None, :, None] & used[None, None, :]
+
+        order_idx, source, victim = np.nonzero(hit)
+        # Сортируем по источнику, затем по порядку: CSR и младший порядок пары первым
+        sort = np.lexsort((victim, order_idx, source))
+        source, victim, order_idx = source[sort], victim[sort], order_idx[sort]
+        self.victims = victim.astype(np.int32)
+        self.orders = (order_idx + 2).astype(np.int8)
+        self.offsets_mhz = (harmonic[order_idx, source, 0] - self.frequencies[victim]).astype(np.float32)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(source, minlength=self.frequencies.size))])
+
+        self._pairs: Dict = {}
+        for s, v, k in zip(source.tolist(), self.victims.tolist(), self.orders.tolist()):
+            self._pairs.setdefault((s, v), k)
+
+    @classmethod
+    def for_catalog(cls, catalog, max_order: int = DEFAULT_MAX_ORDER) -> "HarmonicIndex":
+        """Индекс по всем каналам каталога (ID канала - позиция в колонках каталога)."""
+        return cls(catalog.frequency, catalog.bandwidth, max_order)
+
+    def __len__(self):
+        return int(self.victims.size)
+
+    def victims_of(self, channel_id: int, max_order: Optional[int] = None) -> List[Dict]:
+        """Каналы каталога, в которые попадают гармоники канала channel_id."""
+        start, stop = self.offsets[channel_id], self.offsets[channel_id + 1]
+        max_order = max_order or self.max_order
+        return [
+            {"id": int(victim), "order": int(order), "offset_mhz": round(float(offset), 2)}
+            for victim, order, offset in zip(self.victims[start:stop], self.orders[start:stop],
+                                             self.offsets_mhz[start:stop])
+            if order <= max_order
+        ]
+
+    def order_of(self, source_id: int, victim_id: int) -> Optional[int]:
+        """Младший порядок гармоники source_id, задевающей victim_id, или None."""
+        return self._pairs.get((source_id, victim_id))
+
+    def harmonic_order(self, source_freq: float, source_bandwidth: float, victim_freq: float,
+                       victim_bandwidth: float, max_order: Optional[int] = None) -> Optional[int]:
+        """То же для частот вне каталога: прямой перебор порядков."""
+        if source_freq <= 0 or victim_freq <= 0:
+            return None
+        for order in range(2, (max_order or self.max_order) + 1):
+            if abs(order * source_freq - victim_freq) < (order * source_bandwidth + victim_bandwidth) / 2:
+                return order
+        return None
@@ -0,0 +1,412 @@
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from . import imd_engine
+from .catalog_index import CatalogIndex
+from .interference import InterferenceAnalyzer
+
+# Параметры модели, которые нужны воркерам (сам анализатор с таблицами в процессы не передаем)
+MODEL_FIELDS = ("CHANNEL_WIDTH", "MIN_SAFE_DISTANCE", "INTERFERENCE_THRESHOLDS", "POWER_DECAY")
+
+# Сколько каналов пробуем за один шаг перенастройки пилота
+RETUNE_SAMPLES = 4
+
+# Раз в сколько шагов цепочка проверяет, не вышел ли бюджет времени
+DEADLINE_CHECK_STEPS = 50
+
+# Штраф за каждую повторную частоту в заезде (больше любого реального уровня помех)
+DUPLICATE_PENALTY = 1e5
+
+# Анализатор процесса-воркера (создается при первой задаче)
+_worker_analyzer = None
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Пул процессов для цепочек отжига. Процессы стартуют через forkserver (spawn, где его нет),
+    а не fork: fork из многопоточного воркера gunicorn копирует блокировки, захваченные
+    другими потоками (логирование, кэш результатов), и процесс пула может на них зависнуть.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def _model_of(analyzer: InterferenceAnalyzer) -> Dict:
+    return {field: getattr(analyzer, field) for field in MODEL_FIELDS}
+
+
+def _analyzer_for(model: Dict) -> InterferenceAnalyzer:
+    """Легкий анализатор с теми же параметрами модели (для процессов-воркеров)."""
+    global _worker_analyzer
+    if _worker_analyzer is None or _model_of(_worker_analyzer) != model:
+        _worker_analyzer = InterferenceAnalyzer({})
+        for field, value in model.items():
+            setattr(_worker_analyzer, field, value)
+    return _worker_analyzer
+
+
+def heat_raw_scores(analyzer: InterferenceAnalyzer, frequencies: np.ndarray) -> np.ndarray:
+    """
+    "Сырые" уровни помех каналов одного заезда (формула analyze_group_interference
+    без ограничения в 100%, чтобы плотные заезды можно было сравнивать между собой).
+    """
+    n = frequencies.size
+    if n < 2:
+        return np.zeros(n)
+
+    separation = np.abs(frequencies[:, None] - frequencies[None, :])
+    np.fill_diagonal(separation, np.inf)
+    close = (separation <= analyzer.MIN_SAFE_DISTANCE * 1.5).sum(axis=1)
+
+    decay, width = analyzer.POWER_DECAY, analyzer.CHANNEL_WIDTH
+    direct = imd_engine.power_ratios(0.0, separation, decay, width).sum(axis=1)
+    products = imd_engine.imd_products_array(frequencies)
+    imd = imd_engine.power_ratios(0.0, frequencies[:, None] - products[None, :], decay, width).sum(axis=1)
+
+    direct_coef, imd_coef = analyzer.interference_coefs(close)
+    multiplier = analyzer.interference_multipliers(separation.min(axis=1), close, n)
+    return (direct_coef * direct + imd_coef * imd) * multiplier
+
+
+class _Chain:
+    """
+    Одна цепочка отжига: разбиение пилотов по заездам и выбранный канал каждого пилота.
+    Передается между процессами целиком, поэтому хранит только массивы.
+    """
+
+    def __init__(self, heats: List[np.ndarray], choice: np.ndarray):
+        self.heats = heats
+        self.choice = choice
+        self.best_heats = [h.copy() for h in heats]
+        self.best_choice = choice.copy()
+        self.best_objective = float("inf")
+        self.temperature = None
+
+
+def _objective(scores: np.ndarray) -> float:
+    """Худший заезд, а при равенстве - меньшая сумма по заездам."""
+    return float(scores.max() + 1e-3 * scores.sum())
+
+
+def _run_chain(task: Dict) -> Dict:
+    """
+    Задача воркера: iterations шагов отжига одной цепочки (или меньше, если наступил
+    deadline - время time.time(), общее для процессов).
+    Все случайные решения берутся из генератора с сидом (seed, chain, round),
+    поэтому при одинаковых входных данных результат повторяется, если раунд уложился в бюджет.
+    """
+    analyzer = _analyzer_for(task["model"])
+    allowed = task["allowed"]
+    chain = task["chain"]
+    rng = np.random.default_rng([task["seed"], task["chain_id"], task["round"]])
+
+    def heat_score(heat):
+        freqs = np.array([allowed[p][chain.choice[p]] for p in heat], dtype=np.float64)
+        if freqs.size == 0:
+            return 0.0
+        # Модель не запрещает совпадающие частоты (повторы даже сокращают число IMD продуктов),
+        # но два пилота на одной частоте в заезде недопустимы - штрафуем каждый повтор
+        duplicates = freqs.size - np.unique(freqs).size
+        return float(heat_raw_scores(analyzer, freqs).max()) + DUPLICATE_PENALTY * duplicates
+
+    scores = np.array([heat_score(h) for h in chain.heats])
+    current = _objective(scores)
+    if chain.temperature is None:
+        chain.temperature = max(current * 0.1, 1.0)
+    if current < chain.best_objective:
+        chain.best_objective = current
+
+    evaluations = len(chain.heats)
+    iterations = task["iterations"]
+    cooling = task["cooling"] ** (1.0 / max(iterations, 1))
+    movable = [p for p in range(len(allowed)) if len(allowed[p]) > 1]
+
+    for step in range(iterations):
+        # Задачи, которые ждали свободный процесс, тоже не выходят за бюджет запроса
+        if step % DEADLINE_CHECK_STEPS == 0 and time.time() >= task["deadline"]:
+            break
+        # Чаще всего трогаем худший заезд - он и определяет результат
+        h = int(scores.argmax()) if rng.random() < 0.7 else int(rng.integers(len(chain.heats)))
+        heat = chain.heats[h]
+
+        trial = scores.copy()
+        if len(chain.heats) > 1 and (rng.random() < 0.5 or not movable):
+            # Обмен пилотами между заездами (каналы остаются за пилотами)
+            other = int(rng.integers(len(chain.heats) - 1))
+            other += other >= h
+            other_heat = chain.heats[other]
+            i, j = int(rng.integers(heat.size)), int(rng.integers(other_heat.size))
+            move = ("swap", i, j, other_heat, heat[i], other_heat[j])
+            heat[i], other_heat[j] = other_heat[j], heat[i]
+            trial[h], trial[other] = heat_score(heat), heat_score(other_heat)
+            evaluations += 2
+        else:
+            # Другой канал для пилота заезда: лучший из нескольких случайных
+            candidates = [p for p in heat if len(allowed[p]) > 1]
+            if not candidates:
+                continue
+            p = int(candidates[int(rng.integers(len(candidates)))])
+            move = ("retune", p, int(chain.choice[p]))
+            options = rng.choice(len(allowed[p]), size=min(RETUNE_SAMPLES, len(allowed[p])), replace=False)
+            best_option, best_score = move[2], float("inf")
+            for option in options:
+                if option == move[2]:
+                    continue
+                chain.choice[p] = option
+                score = heat_score(heat)
+                evaluations += 1
+                if score < best_score:
+                    best_option, best_score = int(option), score
+            chain.choice[p] = best_option
+            trial[h] = best_score
+
+        candidate = _objective(trial)
+        delta = candidate - current
+        if delta <= 0 or rng.random() < math.exp(-delta / chain.temperature):
+            scores, current = trial, candidate
+            if current < chain.best_objective:
+                chain.best_objective = current
+                chain.best_heats = [x.copy() for x in chain.heats]
+                chain.best_choice = chain.choice.copy()
+        elif move[0] == "swap":
+            _, i, j, other_heat, first, second = move
+            heat[i], other_heat[j] = first, second
+        else:
+            chain.choice[move[1]] = move[2]
+
+        chain.temperature = max(chain.temperature * cooling, 1e-6)
+
+    return {"chain": chain, "evaluations": evaluations}
+
+
+class HeatPlanner:
+    """
+    Раскладывает пилотов события по заездам и каналам так, чтобы
+    минимизировать помехи в худшем заезде.
+
+    Поиск - отжиг по нескольким независимым цепочкам. Цепочки выполняются
+    раундами в пуле процессов (по цепочке на задачу; сервер передает общий пул
+    воркера); после каждого раунда худшие цепочки перезапускаются с лучшего найденного плана.
+    Бюджет времени ограничивает и раунды, и шаги внутри раунда: цепочка, которой не хватило
+    времени (например, ждала свободный процесс), отдает лучшее, что успела найти.
+    Одинаковые seed, chains и rounds дают одинаковый план, если все раунды уложились в бюджет.
+    """
+
+    def __init__(self, analyzer: InterferenceAnalyzer, index: CatalogIndex):
+        self.analyzer = analyzer
+        self.index = index
+
+    def resolve_pilots(self, pilots: List[Dict]) -> List[List[Dict]]:
+        """
+        Разрешенные каналы каждого пилота (по одной записи каталога на частоту).
+
+        Пилот описывается либо списком channels (band/channel/range),
+        либо списком bands с необязательными range и modulation.
+
+        Каналы с нулевой частотой (заглушки каталога) не разрешаются.
+
+        Raises:
+            ValueError: если у пилота нет ни одного канала каталога
+        """
+        resolved = []
+        for number, pilot in enumerate(pilots, start=1):
+            name = pilot.get("pilot") or pilot.get("name") or f"#{number}"
+            records = []
+            if pilot.get("channels"):
+                for spec in pilot["channels"]:
+                    record = self.index.find(spec.get("band"), spec.get("channel"),
+                                             spec.get("range"), spec.get("modulation"))
+                    if record is None:
+                        raise ValueError(f"Пилот {name}: канал не найден: band={spec.get('band')}, "
+                                         f"channel={spec.get('channel')}")
+                    if record["frequency"] <= 0:
+                        raise ValueError(f"Пилот {name}: у канала нет частоты: band={spec.get('band')}, "
+                                         f"channel={spec.get('channel')}")
+                    records.append(record)
+            else:
+                bands = set(pilot.get("bands") or [])
+                records = [
+                    record for record in self.index.channels
+                    if record["band"] in bands and record["frequency"] > 0 and
+                    pilot.get("range") in (None, record["range"]) and
+                    pilot.get("modulation") in (None, record["modulation"])
+                ]
+
+            by_frequency = {}
+            for record in records:
+                by_frequency.setdefault(float(record["frequency"]), record)
+            if not by_frequency:
+                raise ValueError(f"Пилот {name}: нет разрешенных каналов")
+            resolved.append([by_frequency[f] for f in sorted(by_frequency)])
+        return resolved
+
+    def plan(self, pilots: List[Dict], heat_size: int = 4, seed: int = 0, time_budget: float = 10.0,
+             workers: Optional[int] = None, chains: Optional[int] = None, rounds: Optional[int] = None,
+             iterations: int = 1500, progress: Optional[Callable[[Dict], None]] = None,
+             executor: Optional[Executor] = None) -> Dict:
+        """
+        Ищет разбиение пилотов на заезды и каналы.
+
+        Args:
+            pilots: Пилоты: {"pilot": имя, "bands": [...], "range": ...} или {"pilot": имя, "channels": [...]}
+            heat_size: Максимум пилотов в заезде (заезды выравниваются по размеру)
+            seed: Сид генераторов случайных чисел
+            time_budget: Бюджет времени в секундах (новые раунды после него не запускаются,
+                а начатые останавливаются)
+            workers: Число процессов (по умолчанию - все ядра; 1 - без пула процессов)
+            chains: Число цепочек отжига (по умолчанию - по одной на процесс)
+            rounds: Максимум раундов (для воспроизводимости при большом бюджете)
+            iterations: Шагов отжига на цепочку за раунд
+            progress: Вызывается после каждого раунда со сводкой
+            executor: Общий пул процессов (сервер); без него план создает
+                свой пул на workers процессов и закрывает его в конце
+
+        Raises:
+            ValueError: если входные данные некорректны
+        """
+        started = time.perf_counter()
+        deadline = time.time() + time_budget
+        if heat_size < 2:
+            raise ValueError("В заезде должно быть не меньше 2 пилотов")
+        if not pilots:
+            raise ValueError("Необходимо указать pilots")
+
+        options = self.resolve_pilots(pilots)
+        allowed = [[float(record["frequency"]) for record in records] for records in options]
+        names = [p.get("pilot") or p.get("name") or f"#{i}" for i, p in enumerate(pilots, start=1)]
+
+        workers = workers or os.cpu_count() or 1
+        chains = chains or workers
+        heat_count = math.ceil(len(pilots) / heat_size)
+        model = _model_of(self.analyzer)
+
+        population = [self._initial_chain(allowed, heat_count, seed, chain_id) for chain_id in range(chains)]
+        own_pool = executor is None and workers > 1
+        pool = process_pool(workers) if own_pool else executor
+
+        round_number = 0
+        evaluations = 0
+        history = []
+        try:
+            while rounds is None or round_number < rounds:
+                if round_number > 0 and time.perf_counter() - started >= time_budget:
+                    break
+
+                tasks = [{
+                    "model": model, "allowed": allowed, "chain": chain, "seed": seed,
+                    "chain_id": chain_id, "round": round_number, "iterations": iterations, "cooling": 0.2,
+                    "deadline": deadline
+                } for chain_id, chain in enumerate(population)]
+                results = list(pool.map(_run_chain, tasks)) if pool else [_run_chain(t) for t in tasks]
+
+                population = [result["chain"] for result in results]
+                evaluations += sum(result["evaluations"] for result in results)
+                round_number += 1
+
+                # Худшую четверть цепочек продолжаем с лучшего плана
+                order = sorted(range(chains), key=lambda c: population[c].best_objective)
+                best = population[order[0]]
+                for c in order[len(order) - len(order) // 4:]:
+                    if c != order[0]:
+                        population[c] = self._restart_from(best, population[c].temperature)
+
+                summary = {
+                    "round": round_number,
+                    "evaluations": evaluations,
+                    "best_objective": round(best.best_objective, 2),
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+                }
+                history.append(summary)
+                if progress is not None:
+                    progress(summary)
+        finally:
+            if own_pool:
+                pool.shutdown()
+
+        best = min(population, key=lambda c: c.best_objective)
+        return self._report(best, options, allowed, names, {
+            "seed": seed,
+            "rounds": round_number,
+            "chains": chains,
+            "workers": workers,
+            "evaluations": evaluations,
+            "progress": history,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        })
+
+    @staticmethod
+    def _initial_chain(allowed: List[List[float]], heat_count: int, seed: int, chain_id: int) -> _Chain:
+        """Случайное выровненное разбиение и случайные каналы (детерминированно по сиду)."""
+        rng = np.random.default_rng([seed, chain_id, 2 ** 31])
+        order = rng.permutation(len(allowed))
+        heats = [np.array(part, dtype=np.int64) for part in np.array_split(order, heat_count)]
+
+        # Жадно: каждому пилоту канал, максимально удаленный от уже выбранных в заезде
+        choice = np.zeros(len(allowed), dtype=np.int64)
+        for heat in heats:
+            taken = []
+            for p in heat:
+                options = np.asarray(allowed[p])
+                if taken:
+                    distance = np.abs(options[:, None] - np.asarray(taken)[None, :]).min(axis=1)
+                    best = np.flatnonzero(distance == distance.max())
+                else:
+                    best = np.arange(options.size)
+                choice[p] = int(best[int(rng.integers(best.size))])
+                taken.append(options[choice[p]])
+        return _Chain(heats, choice)
+
+    @staticmethod
+    def _restart_from(best: _Chain, temperature: float) -> _Chain:
+        chain = _Chain([h.copy() for h in best.best_heats], best.best_choice.copy())
+        chain.best_objective = best.best_objective
+        chain.temperature = temperature
+        return chain
+
+    def _report(self, chain: _Chain, options: List[List[Dict]], allowed: List[List[float]],
+                names: List[str], stats: Dict) -> Dict:
+        """План в формате ответа API: заезды, каналы пилотов и уровни помех."""
+        heats = []
+        worst_raw = 0.0
+        for number, heat in enumerate(chain.best_heats, start=1):
+            freqs = [allowed[p][chain.best_choice[p]] for p in heat]
+            raw = heat_raw_scores(self.analyzer, np.asarray(freqs, dtype=np.float64))
+            worst_raw = max(worst_raw, float(raw.max()) if raw.size else 0.0)
+
+            entries = []
+            for k, p in enumerate(heat):
+                record = options[p][chain.best_choice[p]]
+                others = freqs[:k] + freqs[k + 1:]
+                interference = self.analyzer.calculate_total_interference(freqs[k], others)
+                entries.append({
+                    "pilot": names[p],
+                    "modulation": record["modulation"],
+                    "range": record["range"],
+                    "band": record["band"],
+                    "channel": record["channel"],
+                    "frequency": record["frequency"],
+                    "total_interference": interference["total_percent"],
+                    "interference_level": interference["risk_level"]
+                })
+
+            heats.append({
+                "heat": number,
+                "pilots": entries,
+                "worst_interference": max((e["total_interference"] for e in entries), default=0),
+                "worst_raw_interference": round(float(raw.max()), 2) if raw.size else 0,
+                # Частоты, на которых оказались несколько пилотов (если разрешенных каналов не хватило)
+                "shared_frequencies": sorted({f for f in freqs if freqs.count(f) > 1})
+            })
+
+        return {
+            "heats": heats,
+            "worst_interference": max(h["worst_interference"] for h in heats),
+            "worst_raw_interference": round(worst_raw, 2),
+            **stats
+        }
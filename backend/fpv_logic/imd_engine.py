@@ -0,0 +1,84 @@
+from typing import Iterable
+
+import numpy as np
+
+
+def imd_products_array(frequencies: Iterable[float], order: int = 3) -> np.ndarray:
+    """
+    Векторизованный аналог InterferenceAnalyzer.calculate_imd_products.
+
+    Все продукты f1 + f2 - f3 и 3f1 - 2f2 строятся broadcasting'ом,
+    а дубликаты убираются одним проходом np.unique (он же сортирует).
+
+    Args:
+        frequencies: Частоты передатчиков
+        order: Порядок IMD (3 или 5)
+
+    Returns:
+        Отсортированный массив уникальных частот IMD-продуктов
+    """
+    freqs = np.asarray(list(frequencies), dtype=np.float64)
+    n = freqs.size
+    parts = []
+
+    if order >= 3 and n >= 3:
+        # IMD3: f_i + f_j - f_k. Сумма симметрична, поэтому берем только i < j
+        i_idx, j_idx = np.triu_indices(n, k=1)
+        sums = freqs[i_idx] + freqs[j_idx]
+        products = sums[:, None] - freqs[None, :]
+        # k не должен совпадать ни с i, ни с j
+        k_idx = np.arange(n)
+        mask = (k_idx[None, :] != i_idx[:, None]) & (k_idx[None, :] != j_idx[:, None])
+        parts.append(products[mask])
+
+    if order >= 5 and n >= 2:
+        # IMD5: 3f_i - 2f_j, i != j
+        products = 3 * freqs[:, None] - 2 * freqs[None, :]
+        parts.append(products[~np.eye(n, dtype=bool)])
+
+    if not parts:
+        return np.empty(0, dtype=np.float64)
+
+    return np.unique(np.round(np.concatenate(parts), 1))
+
+
+def imd_products_with(new_freqs, frequencies: Iterable[float]) -> np.ndarray:
+    """
+    IMD3 продукты, которые добавляет к группе frequencies каждая из new_freqs:
+    x + f_i - f_j (i != j) и f_i + f_j - x (i < j).
+
+    Args:
+        new_freqs: Добавляемые частоты (массив длины r)
+        frequencies: Частоты группы
+
+    Returns:
+        Массив r x m округленных продуктов (с повторами, без удаления дубликатов)
+    """
+    new_freqs = np.atleast_1d(np.asarray(new_freqs, dtype=np.float64))
+    freqs = np.asarray(list(frequencies), dtype=np.float64)
+    n = freqs.size
+
+    if n < 2:
+        return np.empty((new_freqs.size, 0), dtype=np.float64)
+
+    i_idx, j_idx = np.nonzero(~np.eye(n, dtype=bool))
+    diffs = freqs[i_idx] - freqs[j_idx]
+    i_up, j_up = np.triu_indices(n, k=1)
+    sums = freqs[i_up] + freqs[j_up]
+
+    products = np.concatenate([
+        new_freqs[:, None] + diffs[None, :],
+        sums[None, :] - new_freqs[:, None]
+    ], axis=1)
+    return np.round(products, 1)
+
+
+def power_ratios(target_freq: float, frequencies, power_decay: float, channel_width: float) -> np.ndarray:
+    """
+    Векторизованный calculate_power_ratio: отношение мощностей
+    целевой частоты ко всем частотам массива сразу.
+    """
+    separation = np.abs(np.asarray(frequencies, dtype=np.float64) - target_freq)
+    # exp(0) == 1, поэтому совпадающие частоты отдельно не обрабатываем
+    return np.round(np.exp(-separation * power_decay / channel_width), 4)
+
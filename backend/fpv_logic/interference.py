@@ -2,6 +2,13 @@ import json
 from typing import Dict, List, Union, Tuple
 import math
 
+import numpy as np
+
+from . import imd_engine
+from .catalog_index import FrequencyIndex
+from .profiling import record_imd_products, span
+from .result_cache import RESULT_CACHE, ResultCache
+
 class InterferenceAnalyzer:
     def __init__(self, data):
         self.data = data
@@ -18,9 +25,41 @@ class InterferenceAnalyzer:
         }
         # Коэффициент затухания для расчета мощности
         self.POWER_DECAY = 1.2  # Было 1.5, делаем помягче
+        # Предрасчитанная попарная таблица каталога (подключается при старте сервера)
+        self.pairwise_table = None
+        # Индексы каталога для поиска частот без обхода вложенных словарей
+        self.catalog_index = None
+        # Общий кэш результатов (None - всегда считать заново, например в бенчмарках)
+        self.result_cache = RESULT_CACHE
+        # Измеренный сканером спектр (NoiseFloor): добавляется к прямым помехам
+        self.noise_floor = None
+
+    def attach_catalog_index(self, index):
+        """ Подключает индексы каталога: get_frequency становится одним поиском в словаре. """
+        self.catalog_index = index
+
+    def attach_pairwise_table(self, table):
+        """ Подключает попарную таблицу: парные расчеты становятся чтением из нее. """
+        self.pairwise_table = table
+
+    def attach_noise_floor(self, noise_floor):
+        """ Подключает измеренный спектр: его уровень в полосе канала добавляется к прямым помехам. """
+        self.noise_floor = noise_floor
+
+    def measured_noise(self, frequencies) -> np.ndarray:
+        """
+        Измеренная помеха в полосе каждой частоты в единицах отношения мощностей
+        (1.0 - как передатчик на той же частоте); нули, если спектр не подключен.
+        """
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        if self.noise_floor is None:
+            return np.zeros(frequencies.shape)
+        return self.noise_floor.ratios(frequencies, self.CHANNEL_WIDTH)
 
     def get_frequency(self, modulation: str, range_name: str, band: str, channel: str) -> Union[float, None]:
         """ Получает частоту по модуляции, диапазону, группе и номеру канала. """
+        if self.catalog_index is not None:
+            return self.catalog_index.get_frequency(modulation, range_name, band, channel)
         return (
             self.data.get(modulation, {})
             .get(range_name, {})
@@ -144,6 +183,11 @@ class InterferenceAnalyzer:
         Рассчитывает отношение мощности помехи к мощности полезного сигнала
         с учетом частотного разноса.
         """
+        if self.pairwise_table is not None:
+            cached = self.pairwise_table.power_ratio(freq1, freq2)
+            if cached is not None:
+                return cached
+
         freq_separation = abs(freq1 - freq2)
         
         if freq_separation == 0:
@@ -157,12 +201,44 @@ class InterferenceAnalyzer:
         """
         Рассчитывает общий уровень помех для целевой частоты
         с учетом всех других передатчиков и их IMD продуктов.
+        Повторные наборы частот (в любом порядке) берутся из кэша результатов.
         """
-        # Определяем множитель на основе близости каналов
-        min_separation = min(abs(target_freq - freq) for freq in other_freqs) if other_freqs else float('inf')
-        
-        # Считаем количество близких каналов
-        close_channels = sum(1 for freq in other_freqs if abs(target_freq - freq) <= self.MIN_SAFE_DISTANCE * 1.5)
+        if self.result_cache is None:
+            return self._calculate_total_interference(target_freq, other_freqs)
+        return self.result_cache.get_or_compute(
+            ResultCache.key(self, target_freq, other_freqs),
+            lambda: self._calculate_total_interference(target_freq, other_freqs)
+        )
+
+    def _calculate_total_interference(self, target_freq: float, other_freqs: List[float]) -> Dict:
+        # IMD продукты всей группы (цель + остальные) считаем векторно
+        with span("imd"):
+            imd_freqs = imd_engine.imd_products_array([target_freq] + list(other_freqs))
+        record_imd_products(len(imd_freqs))
+        with span("scoring"):
+            return self._score_interference(target_freq, other_freqs, imd_freqs)
+
+    def _score_interference(self, target_freq: float, other_freqs: List[float], imd_freqs,
+                            neighbours: FrequencyIndex = None, include_noise: bool = True) -> Dict:
+        """
+        Оценивает помехи для целевой частоты по уже посчитанным IMD продуктам.
+        Позволяет переиспользовать один набор IMD продуктов для нескольких целей.
+
+        Args:
+            neighbours: Отсортированный индекс всей группы (вместе с целью).
+                Если передан, соседи ищутся через bisect, а не перебором other_freqs.
+            include_noise: Добавлять ли измеренный сканером фон к прямым помехам
+        """
+        if neighbours is not None:
+            # Индекс содержит и саму цель - исключаем одно ее вхождение
+            min_separation = neighbours.nearest_distance(target_freq, exclude_self=True)
+            close_channels = neighbours.count_within(target_freq, self.MIN_SAFE_DISTANCE * 1.5) - 1
+        else:
+            # Определяем множитель на основе близости каналов
+            min_separation = min(abs(target_freq - freq) for freq in other_freqs) if other_freqs else float('inf')
+            
+            # Считаем количество близких каналов
+            close_channels = sum(1 for freq in other_freqs if abs(target_freq - freq) <= self.MIN_SAFE_DISTANCE * 1.5)
         
         # Базовые множители зависят от количества каналов
         channel_count = len(other_freqs) + 1
@@ -196,37 +272,35 @@ class InterferenceAnalyzer:
             direct_coef = 3
             imd_coef = 4
         
-        # Расчет прямых помех от других передатчиков
-        direct_interference = sum(
-            self.calculate_power_ratio(target_freq, freq) * direct_coef
-            for freq in other_freqs
-        )
+        # Расчет прямых помех от других передатчиков (и измеренного сканером фона, если он подключен).
+        # Для частот каталога отношения мощностей - одна строка попарной таблицы
+        ratios = self.pairwise_table.power_ratios(target_freq, other_freqs) if self.pairwise_table is not None else None
+        if ratios is None:
+            ratios = imd_engine.power_ratios(target_freq, other_freqs, self.POWER_DECAY, self.CHANNEL_WIDTH)
+        direct_interference = float((ratios * direct_coef).sum())
+        if include_noise and self.noise_floor is not None:
+            direct_interference += float(self.measured_noise([target_freq])[0]) * direct_coef
         
-        # Расчет IMD продуктов
-        imd_freqs = self.calculate_imd_products([target_freq] + other_freqs)
-        imd_interference = sum(
-            self.calculate_power_ratio(target_freq, imd_freq) * imd_coef
-            for imd_freq in imd_freqs
-        )
+        # Расчет помех от IMD продуктов
+        imd_interference = float((imd_engine.power_ratios(
+            target_freq, imd_freqs, self.POWER_DECAY, self.CHANNEL_WIDTH
+        ) * imd_coef).sum())
         
         # Общий уровень помех (нормализованный к 100%)
         total_interference = min(100, (direct_interference + imd_interference) * interference_multiplier)
         
         # Определение уровня опасности
-        risk_level = "none"
-        for level, threshold in self.INTERFERENCE_THRESHOLDS.items():
-            if total_interference >= threshold:
-                risk_level = level
-                break
+        risk_level = self.get_risk_level(total_interference)
                 
         return {
             "total_percent": round(total_interference, 2),
             "risk_level": risk_level,
             "direct_interference": round(direct_interference, 4),
             "imd_interference": round(imd_interference, 4),
-            "imd_frequencies": imd_freqs,
+            "imd_frequencies": list(map(float, imd_freqs)),
             "debug": {
-                "min_separation": round(min_separation, 1),
+                # Без других каналов разноса нет (inf не записывается в JSON)
+                "min_separation": round(min_separation, 1) if math.isfinite(min_separation) else None,
                 "multiplier": round(interference_multiplier, 1),
                 "channel_count": channel_count,
                 "close_channels": close_channels,
@@ -235,42 +309,352 @@ class InterferenceAnalyzer:
             }
         }
 
+    def score_candidates(self, candidate_freqs: List[float], other_freqs: List[float],
+                         include_imd: bool = True) -> List[Dict]:
+        """
+        Пакетный calculate_total_interference: оценивает каждую частоту-кандидата
+        против одного и того же набора других передатчиков.
+
+        IMD продукты набора считаются один раз, а для каждого кандидата
+        добавляются только продукты с его участием (одним массивом на всех).
+
+        Args:
+            candidate_freqs: Частоты-кандидаты
+            other_freqs: Частоты уже выбранных передатчиков
+            include_imd: Возвращать ли списки IMD частот для каждого кандидата
+
+        Returns:
+            Список результатов в формате calculate_total_interference
+        """
+        candidates = np.asarray(candidate_freqs, dtype=np.float64)
+        others = np.asarray(other_freqs, dtype=np.float64)
+        if candidates.size == 0:
+            return []
+
+        with span("imd"):
+            # Продукты набора общие для всех кандидатов
+            base_products = imd_engine.imd_products_array(others)
+
+            # Продукты с участием кандидата: оставляем уникальные и отсутствующие в наборе
+            extras = np.sort(imd_engine.imd_products_with(candidates, others), axis=1)
+            fresh = np.ones(extras.shape, dtype=bool)
+            fresh[:, 1:] = extras[:, 1:] != extras[:, :-1]
+            fresh &= ~np.isin(extras, base_products)
+        record_imd_products(len(base_products) + int(fresh.sum()))
+
+        separation = np.abs(candidates[:, None] - others[None, :])
+        min_separation = separation.min(axis=1) if others.size else np.full(candidates.size, np.inf)
+        close_channels = (separation <= self.MIN_SAFE_DISTANCE * 1.5).sum(axis=1)
+
+        channel_count = others.size + 1
+        direct_coef, imd_coef = self.interference_coefs(close_channels)
+        multiplier = self.interference_multipliers(min_separation, close_channels, channel_count)
+
+        # Коэффициент умножаем до суммирования - как в _score_interference
+        decay, width = self.POWER_DECAY, self.CHANNEL_WIDTH
+        direct = (imd_engine.power_ratios(0.0, separation, decay, width) * direct_coef[:, None]).sum(axis=1)
+        direct += self.measured_noise(candidates) * direct_coef
+        imd = (
+            (imd_engine.power_ratios(0.0, candidates[:, None] - base_products[None, :], decay, width)
+             * imd_coef[:, None]).sum(axis=1) +
+            (imd_engine.power_ratios(0.0, candidates[:, None] - extras, decay, width)
+             * fresh * imd_coef[:, None]).sum(axis=1)
+        )
+        totals = np.minimum(100, (direct + imd) * multiplier)
+
+        results = []
+        for i in range(candidates.size):
+            result = {
+                "total_percent": round(float(totals[i]), 2),
+                "risk_level": self.get_risk_level(totals[i]),
+                "direct_interference": round(float(direct[i]), 4),
+                "imd_interference": round(float(imd[i]), 4),
+                "debug": {
+                    "min_separation": round(float(min_separation[i]), 1) if others.size else None,
+                    "multiplier": round(float(multiplier[i]), 1),
+                    "channel_count": channel_count,
+                    "close_channels": int(close_channels[i]),
+                    "direct_coef": int(direct_coef[i]),
+                    "imd_coef": int(imd_coef[i])
+                }
+            }
+            if include_imd:
+                result["imd_frequencies"] = sorted(base_products.tolist() + extras[i][fresh[i]].tolist())
+            results.append(result)
+        return results
+
+    def get_risk_level(self, total_interference: float) -> str:
+        """ Определяет уровень опасности по общему уровню помех. """
+        for level, threshold in self.INTERFERENCE_THRESHOLDS.items():
+            if total_interference >= threshold:
+                return level
+        return "none"
+
+    def interference_multipliers(self, min_separation, close_channels, channel_count: int) -> np.ndarray:
+        """
+        Векторная версия расчета множителя из _score_interference:
+        принимает массивы минимальных разносов и числа близких каналов.
+        """
+        min_separation = np.asarray(min_separation, dtype=np.float64)
+        close_channels = np.asarray(close_channels)
+
+        if channel_count >= 3:
+            base_max = np.where(close_channels >= 2, 250, 200)
+            base_min = np.where(close_channels >= 2, 180, 150)
+        else:
+            base_max = np.full(min_separation.shape, 130)
+            base_min = np.full(min_separation.shape, 80)
+
+        ratio = (min_separation - self.MIN_SAFE_DISTANCE) / self.MIN_SAFE_DISTANCE
+        return np.where(
+            min_separation <= self.MIN_SAFE_DISTANCE,
+            base_max,
+            np.where(min_separation >= self.MIN_SAFE_DISTANCE * 2, base_min, base_max - 70 * ratio)
+        )
+
+    def interference_coefs(self, close_channels) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Векторная версия коэффициентов прямых помех и IMD из _score_interference.
+        """
+        close_channels = np.asarray(close_channels)
+        direct_coef = np.where(close_channels >= 2, 5, 3)
+        imd_coef = np.where(close_channels >= 2, 6, 4)
+        return direct_coef, imd_coef
+
+    def pair_interference(self, freq1: float, freq2: float) -> Dict:
+        """
+        Помехи между двумя передатчиками в формате calculate_total_interference, но без
+        измеренного фона: ячейки матрицы и попарная таблица описывают только саму пару
+        (и симметричны), а фон входит в total_interference каждого канала группы.
+        """
+        imd_freqs = imd_engine.imd_products_array([freq1, freq2])
+        return self._score_interference(freq1, [freq2], imd_freqs, include_noise=False)
+
+    def _pair_cell(self, freq1: float, freq2: float) -> Dict:
+        """
+        Ячейка матрицы взаимных помех для пары каналов (без измеренного фона, см. pair_interference).
+        Для частот каталога значения берутся из попарной таблицы.
+        """
+        separation = abs(freq1 - freq2)
+        cached = self.pairwise_table.pair(freq1, freq2) if self.pairwise_table is not None else None
+
+        if cached is None:
+            # Используем тот же метод расчета помех
+            pair_interference = self.pair_interference(freq1, freq2)
+            return {
+                "interference": pair_interference["total_percent"],
+                "risk_level": pair_interference["risk_level"],
+                "separation": separation,
+                "debug": pair_interference["debug"]
+            }
+
+        # Для пары каналов отладочные поля однозначно следуют из разноса
+        close_channels = 1 if separation <= self.MIN_SAFE_DISTANCE * 1.5 else 0
+        return {
+            "interference": cached["total_percent"],
+            "risk_level": cached["risk_level"],
+            "separation": separation,
+            "debug": {
+                "min_separation": round(separation, 1),
+                "multiplier": cached["multiplier"],
+                "channel_count": 2,
+                "close_channels": close_channels,
+                "direct_coef": 3,
+                "imd_coef": 4
+            }
+        }
+
+    def _resolve_group(self, channels: List[Dict[str, str]], modulation: str) -> Dict:
+        """
+        Находит частоты каналов группы.
+
+        Returns:
+            {"channels": [...]} или {"error": ...}, если канал не найден
+
+        Raises:
+            ValueError: если группа не список объектов-каналов
+        """
+        if not isinstance(channels, list) or not all(isinstance(ch_data, dict) for ch_data in channels):
+            raise ValueError("channels - список каналов (объектов с band, channel и range)")
+
+        channel_info = []
+        with span("catalog"):
+            for ch_data in channels:
+                band = ch_data.get("band")
+                channel = ch_data.get("channel")
+                range_name = ch_data.get("range", "5.8GHz")
+                # В смешанной группе (аналог + цифра) модуляция задается у канала
+                channel_modulation = ch_data.get("modulation", modulation)
+
+                freq = self.get_frequency(channel_modulation, range_name, band, channel)
+                if not freq:
+                    return {"error": f"Канал не найден: band={band}, channel={channel}"}
+
+                channel_info.append({
+                    "band": band,
+                    "channel": channel,
+                    "frequency": freq,
+                    "range": range_name
+                })
+                if channel_modulation != modulation:
+                    channel_info[-1]["modulation"] = channel_modulation
+        return {"channels": channel_info}
+
+    def _score_member(self, frequencies: List[float], i: int, group_imd, group_index: FrequencyIndex) -> Dict:
+        """
+        Оценка i-го канала группы по общим IMD продуктам группы.
+        Ключ кэша тот же, что у calculate_total_interference для этого канала.
+        """
+        others = frequencies[:i] + frequencies[i + 1:]
+        if self.result_cache is None:
+            return self._score_interference(frequencies[i], others, group_imd, group_index)
+        return self.result_cache.get_or_compute(
+            ResultCache.key(self, frequencies[i], others),
+            lambda: self._score_interference(frequencies[i], others, group_imd, group_index)
+        )
+
+    def _pair_arrays(self, frequencies: List[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Разнос, уровень помех и номер уровня опасности для пар i < j (верхний треугольник
+        построчно). Матрица симметрична, поэтому каждая пара считается один раз;
+        измеренный фон в пары не входит (см. pair_interference).
+        """
+        first, second = np.triu_indices(len(frequencies), k=1)
+        freqs = np.asarray(frequencies, dtype=np.float64)
+        separation = np.abs(freqs[first] - freqs[second])
+
+        table = self.pairwise_table
+        ids = [table.index_of(f) for f in frequencies] if table is not None else [None]
+        if None not in ids:
+            # Все частоты есть в каталоге - выбираем пары из попарной таблицы одним индексом
+            ids = np.asarray(ids)
+            percent = np.round(table.values[table.PAIR_PERCENT, ids[first], ids[second]].astype(np.float64), 2)
+            risk = table.values[table.PAIR_RISK, ids[first], ids[second]].astype(np.int64)
+            return separation, percent, risk
+
+        risk_levels = list(self.INTERFERENCE_THRESHOLDS) + ["none"]
+        percent = np.zeros(first.size)
+        risk = np.zeros(first.size, dtype=np.int64)
+        for k, (i, j) in enumerate(zip(first, second)):
+            pair = self.pair_interference(frequencies[i], frequencies[j])
+            percent[k] = pair["total_percent"]
+            risk[k] = risk_levels.index(pair["risk_level"])
+        return separation, percent, risk
+
+    def analyze_group_compact(self, channels: List[Dict[str, str]], modulation: str = "analog",
+                              include_debug: bool = False, include_imd: bool = False) -> Dict:
+        """
+        Компактный вариант analyze_group_interference: колонки плоских массивов
+        вместо списков словарей. Пары - только верхний треугольник матрицы
+        (i < j построчно), уровни опасности - номера в списке risk_levels.
+
+        Args:
+            include_debug: Добавить коэффициенты расчета по каждому каналу
+            include_imd: Добавить IMD продукты группы (один список на группу)
+
+        Returns:
+            Dict с колонками каналов и пар, номерами критичных пар и сводкой
+            или {"error": ...}, если канал не найден
+
+        Raises:
+            ValueError: если группа не список объектов-каналов
+        """
+        channel_info = self._resolve_group(channels, modulation)
+        if "error" in channel_info:
+            return channel_info
+        return self.compact_analysis(channel_info["channels"], include_debug=include_debug, include_imd=include_imd)
+
+    def compact_analysis(self, channel_info: List[Dict], include_debug: bool = False,
+                         include_imd: bool = False) -> Dict:
+        """
+        Расчет analyze_group_compact по уже найденным каналам (band/channel/range/frequency):
+        так его можно выполнить в процессе пула, где нет индексов каталога.
+        """
+        frequencies = [ch["frequency"] for ch in channel_info]
+        risk_levels = list(self.INTERFERENCE_THRESHOLDS) + ["none"]
+
+        with span("imd"):
+            group_imd = imd_engine.imd_products_array(frequencies)
+        record_imd_products(len(group_imd))
+        group_index = FrequencyIndex(frequencies)
+
+        with span("scoring"):
+            scores = [self._score_member(frequencies, i, group_imd, group_index) for i in range(len(frequencies))]
+
+        with span("matrix"):
+            separation, percent, risk = self._pair_arrays(frequencies)
+        critical = np.nonzero(
+            (separation < self.MIN_SAFE_DISTANCE) | (percent >= self.INTERFERENCE_THRESHOLDS["high"])
+        )[0]
+        max_interference = float(percent.max()) if percent.size else 0.0
+        min_separation = float(separation.min()) if separation.size else None
+
+        result = {
+            "format": "compact",
+            "risk_levels": risk_levels,
+            "channels": {
+                "band": [ch["band"] for ch in channel_info],
+                "channel": [ch["channel"] for ch in channel_info],
+                "range": [ch["range"] for ch in channel_info],
+                "frequency": frequencies,
+                "total_interference": [score["total_percent"] for score in scores],
+                "interference_level": [risk_levels.index(score["risk_level"]) for score in scores]
+            },
+            "pairs": {
+                "separation": separation.tolist(),
+                "interference": percent.tolist(),
+                "risk_level": risk.tolist()
+            },
+            "critical_pairs": critical.tolist(),
+            "analysis": {
+                "total_channels": len(channel_info),
+                "max_interference": max_interference,
+                "safe_separation": (min_separation is None or min_separation >= self.MIN_SAFE_DISTANCE)
+                                   and max_interference < self.INTERFERENCE_THRESHOLDS["high"],
+                "min_separation": min_separation
+            }
+        }
+        if include_imd:
+            result["imd_products"] = group_imd.tolist()
+        if include_debug:
+            result["debug"] = {
+                "direct_interference": [score["direct_interference"] for score in scores],
+                "imd_interference": [score["imd_interference"] for score in scores],
+                "multiplier": [score["debug"]["multiplier"] for score in scores],
+                "close_channels": [score["debug"]["close_channels"] for score in scores],
+                "min_safe_distance": self.MIN_SAFE_DISTANCE,
+                "high_threshold": self.INTERFERENCE_THRESHOLDS["high"]
+            }
+        return result
+
     def analyze_group_interference(self, channels: List[Dict[str, str]], modulation: str = "analog") -> Dict:
         """
         Анализирует взаимную интерференцию для группы каналов.
+
+        Raises:
+            ValueError: если группа не список объектов-каналов
         """
-        # Получаем частоты для всех каналов
-        channel_info = []
-        frequencies = []
-        
-        for ch_data in channels:
-            band = ch_data.get("band")
-            channel = ch_data.get("channel")
-            range_name = ch_data.get("range", "5.8GHz")
-            
-            freq = self.get_frequency(modulation, range_name, band, channel)
-            if not freq:
-                return {"error": f"Канал не найден: band={band}, channel={channel}"}
-                
-            channel_info.append({
-                "band": band,
-                "channel": channel,
-                "frequency": freq,
-                "range": range_name
-            })
-            frequencies.append(freq)
+        channel_info = self._resolve_group(channels, modulation)
+        if "error" in channel_info:
+            return channel_info
+        channel_info = channel_info["channels"]
+        frequencies = [ch["frequency"] for ch in channel_info]
+
+        # IMD продукты одинаковы для любого канала группы - считаем их один раз
+        with span("imd"):
+            group_imd = imd_engine.imd_products_array(frequencies)
+        record_imd_products(len(group_imd))
+        # Соседей каждого канала ищем по одному отсортированному индексу группы
+        group_index = FrequencyIndex(frequencies)
 
         # Создаем матрицу взаимных помех
         interference_matrix = []
         for i, ch1 in enumerate(channel_info):
             row = []
-            other_freqs = [f for j, f in enumerate(frequencies) if j != i]
             
-            # Анализируем помехи для текущего канала
-            interference_data = self.calculate_total_interference(
-                ch1["frequency"], 
-                other_freqs
-            )
+            # Анализируем помехи для текущего канала (повторные группы - из кэша)
+            with span("scoring"):
+                interference_data = self._score_member(frequencies, i, group_imd, group_index)
             
             ch1.update({
                 "interference_level": interference_data["risk_level"],
@@ -279,24 +663,15 @@ class InterferenceAnalyzer:
             })
             
             # Заполняем строку матрицы
-            for j, ch2 in enumerate(channel_info):
-                if i == j:
-                    row.append({
-                        "interference": 0,
-                        "risk_level": "self"
-                    })
-                else:
-                    # Используем тот же метод расчета помех
-                    pair_interference = self.calculate_total_interference(
-                        ch1["frequency"], 
-                        [ch2["frequency"]]
-                    )
-                    row.append({
-                        "interference": pair_interference["total_percent"],
-                        "risk_level": pair_interference["risk_level"],
-                        "separation": abs(ch1["frequency"] - ch2["frequency"]),
-                        "debug": pair_interference["debug"]
-                    })
+            with span("matrix"):
+                for j, ch2 in enumerate(channel_info):
+                    if i == j:
+                        row.append({
+                            "interference": 0,
+                            "risk_level": "self"
+                        })
+                    else:
+                        row.append(self._pair_cell(ch1["frequency"], ch2["frequency"]))
             
             interference_matrix.append(row)
 
@@ -315,21 +690,22 @@ class InterferenceAnalyzer:
                             "separation": cell.get("separation", 0)
                         })
 
-        # Проверяем безопасность разделения
-        min_separation = min(
+        # Проверяем безопасность разделения (у одного канала пар нет - как в analyze_group_compact)
+        separations = [
             abs(ch1["frequency"] - ch2["frequency"])
             for i, ch1 in enumerate(channel_info)
             for j, ch2 in enumerate(channel_info)
             if i < j
-        )
+        ]
+        min_separation = min(separations) if separations else None
         
         # Используем максимальную интерференцию из матрицы
-        max_interference = max(
+        max_interference = max((
             cell["interference"]
             for row in interference_matrix
             for cell in row
             if cell["risk_level"] != "self"
-        )
+        ), default=0.0)
 
         # Собираем все пары каналов для отладки
         all_pairs = []
@@ -352,16 +728,12 @@ class InterferenceAnalyzer:
             "analysis": {
                 "total_channels": len(channels),
                 "max_interference": max_interference,
-                "safe_separation": min_separation >= self.MIN_SAFE_DISTANCE and max_interference < self.INTERFERENCE_THRESHOLDS["high"],
+                "safe_separation": (min_separation is None or min_separation >= self.MIN_SAFE_DISTANCE)
+                                   and max_interference < self.INTERFERENCE_THRESHOLDS["high"],
                 "min_separation": min_separation,
                 "debug": {
-                    "separations": [
-                        abs(ch1["frequency"] - ch2["frequency"])
-                        for i, ch1 in enumerate(channel_info)
-                        for j, ch2 in enumerate(channel_info)
-                        if i < j
-                    ],
-                    "imd_products": self.calculate_imd_products(frequencies) if len(frequencies) > 2 else [],
+                    "separations": separations,
+                    "imd_products": list(map(float, group_imd)),
                     "all_pairs": all_pairs,
                     "min_safe_distance": self.MIN_SAFE_DISTANCE,
                     "high_threshold": self.INTERFERENCE_THRESHOLDS["high"]
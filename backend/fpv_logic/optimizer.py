@@ -0,0 +1,358 @@
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .imd_engine import power_ratios
+from .interference import InterferenceAnalyzer
+
+
+class _SearchTimeout(Exception):
+    """Бюджет времени поиска исчерпан."""
+
+
+class ChannelOptimizer:
+    """
+    Подбирает набор из N каналов с минимальной худшей интерференцией
+    (максимум calculate_total_interference по каналам набора).
+
+    Поиск - branch-and-bound: у каждого узла оцениваются сразу все
+    дочерние наборы (одним векторным проходом по попарной таблице),
+    ветки с нижней оценкой хуже найденного решения отсекаются.
+    Сравнение идет по "сырому" уровню помех без ограничения в 100%,
+    иначе все плотные наборы были бы одинаково плохими.
+    """
+
+    # Доля бюджета времени на поиск начального решения
+    LOCAL_SEARCH_SHARE = 0.2
+
+    def __init__(self, analyzer: InterferenceAnalyzer, frequencies: List[float]):
+        self.analyzer = analyzer
+
+        # Частоты храним в десятых долях МГц: IMD продукты остаются целыми числами.
+        # Нулевая частота в каталоге - канал-заглушка, в наборы он не попадает.
+        frequencies = np.round(np.asarray(frequencies, dtype=np.float64), 1)
+        self.frequencies = np.unique(frequencies[frequencies > 0])
+        self._units = np.rint(self.frequencies * 10).astype(np.int64)
+
+        # Попарная таблица: разнос (МГц) и отношение мощностей между частотами каталога
+        self.pair_separation = np.abs(self.frequencies[:, None] - self.frequencies[None, :])
+        self.pair_ratio = power_ratios(0.0, self.pair_separation, analyzer.POWER_DECAY, analyzer.CHANNEL_WIDTH)
+
+        # Отношение мощностей по разносу в 0.1 МГц - для IMD продуктов.
+        # Дальше последнего элемента отношение округляется до нуля.
+        max_distance = int(self._units.max() - self._units.min()) * 2 + 1 if self._units.size else 1
+        distances = np.arange(max_distance + 1) / 10
+        self._ratio_by_distance = power_ratios(0.0, distances, analyzer.POWER_DECAY, analyzer.CHANNEL_WIDTH)
+        nonzero = np.nonzero(self._ratio_by_distance)[0]
+        self._ratio_by_distance = self._ratio_by_distance[:(nonzero[-1] + 2 if nonzero.size else 1)]
+
+        self._close_distance = analyzer.MIN_SAFE_DISTANCE * 1.5
+
+    def optimize(self, count: int, pinned: Optional[List[float]] = None,
+                 candidates: Optional[List[float]] = None, time_budget: float = 0.5) -> Dict:
+        """
+        Ищет лучший набор из count частот.
+
+        Args:
+            count: Сколько каналов должно быть в наборе (включая закрепленные)
+            pinned: Закрепленные частоты, которые обязаны войти в набор
+            candidates: Частоты, из которых можно выбирать (по умолчанию - весь каталог)
+            time_budget: Бюджет времени в секундах; по его истечении
+                возвращается лучший найденный набор
+
+        Returns:
+            Dict с выбранными частотами, худшим "сырым" уровнем помех
+            и статистикой поиска
+
+        Raises:
+            ValueError: если count меньше 1, частоты нет в таблице или кандидатов не хватает
+        """
+        if count < 1:
+            raise ValueError("Размер набора должен быть не меньше 1")
+
+        started = time.perf_counter()
+        pinned_idx = self._indices(pinned or [])
+        candidate_idx = self._indices(candidates) if candidates is not None else np.arange(self.frequencies.size)
+        candidate_idx = np.setdiff1d(candidate_idx, pinned_idx)
+
+        search = {
+            "count": count,
+            "deadline": started + time_budget,
+            "best_score": float("inf"),
+            "best_set": None,
+            "nodes": 0
+        }
+
+        # Закрепленные каналы добавляем по одному тем же механизмом, что и при поиске
+        state = self._empty_state(self.analyzer.measured_noise(self.frequencies))
+        for index in pinned_idx:
+            evaluation = self._expand(state, np.array([index]), count)
+            state = self._descend(state, evaluation, 0)
+
+        if candidate_idx.size < count - len(pinned_idx):
+            raise ValueError(f"Недостаточно каналов для набора из {count}")
+
+        complete = True
+        if len(pinned_idx) >= count:
+            search["best_set"] = list(state["chosen"])
+            search["best_score"] = self._exact_score(state) if state["chosen"] else 0.0
+        else:
+            # Хорошее начальное решение сразу отсекает большую часть дерева
+            # и остается ответом, если перебор не уложится в бюджет
+            self._local_search(state, candidate_idx, search, started + time_budget * self.LOCAL_SEARCH_SHARE)
+            try:
+                self._branch(state, candidate_idx, 0.0, search)
+            except _SearchTimeout:
+                complete = False
+
+        best_set = search["best_set"] or []
+        return {
+            "frequencies": [float(self.frequencies[i]) for i in best_set],
+            "pinned": [float(self.frequencies[i]) for i in pinned_idx],
+            "worst_raw_interference": round(search["best_score"], 2) if best_set else None,
+            "complete": complete,
+            "nodes": search["nodes"],
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    def _local_search(self, state: Dict, candidates: np.ndarray, search: Dict, deadline: float):
+        """
+        Жадная сборка набора и улучшение заменой одного канала, пока это снижает оценку.
+        Все замены одного места оцениваются одним вызовом _expand.
+        """
+        count = search["count"]
+        pinned = len(state["chosen"])
+        free = candidates
+        while len(state["chosen"]) < count:
+            evaluation = self._expand(state, free, count)
+            column = int(np.argmin(evaluation["scores"]))
+            state = self._descend(state, evaluation, column)
+            free = np.delete(free, column)
+
+        chosen, score = state["chosen"], self._exact_score(state)
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for slot in range(pinned, count):
+                rest = chosen[:slot] + chosen[slot + 1:]
+                others = np.setdiff1d(candidates, chosen)
+                if not others.size:
+                    break
+                evaluation = self._expand(self._state_for(state["noise"], rest, count), others, count)
+                column = int(np.argmin(evaluation["scores"]))
+                if evaluation["scores"][column] < score - 1e-9:
+                    chosen, score = rest + [int(others[column])], float(evaluation["scores"][column])
+                    improved = True
+
+        if score < search["best_score"]:
+            search["best_score"], search["best_set"] = score, chosen
+
+    def _state_for(self, noise: np.ndarray, indices: List[int], count: int) -> Dict:
+        """Состояние набора из заданных индексов (добавляются по одному)."""
+        state = self._empty_state(noise)
+        for index in indices:
+            state = self._descend(state, self._expand(state, np.array([index]), count), 0)
+        return state
+
+    def _indices(self, frequencies: List[float]) -> np.ndarray:
+        """Переводит частоты в индексы попарной таблицы."""
+        values = np.round(np.asarray(list(frequencies), dtype=np.float64), 1)
+        idx = np.searchsorted(self.frequencies, values)
+        idx = np.clip(idx, 0, max(self.frequencies.size - 1, 0))
+        if values.size and not np.array_equal(self.frequencies[idx], values):
+            missing = values[self.frequencies[idx] != values]
+            raise ValueError(f"Частоты нет в каталоге: {missing.tolist()}")
+        return np.unique(idx)
+
+    def _empty_state(self, noise: np.ndarray) -> Dict:
+        """
+        Состояние пустого набора.
+
+        Args:
+            noise: Измеренная помеха на каждой частоте таблицы (прибавляется к прямым помехам)
+        """
+        empty = np.empty(0, dtype=np.float64)
+        return {
+            "noise": noise,
+            "chosen": [],
+            "direct": empty,
+            "imd": empty,
+            "close": np.empty(0, dtype=np.int64),
+            "min_sep": empty,
+            "products": np.empty(0, dtype=np.int64)
+        }
+
+    def _expand(self, state: Dict, candidates: np.ndarray, count: int) -> Dict:
+        """
+        Оценивает все наборы "текущий + один кандидат" за один векторный проход.
+
+        Для каждой цели храним несмещенные суммы прямых помех и IMD,
+        число близких каналов и минимальный разнос - из них по формулам
+        анализатора получаются и точная оценка, и нижняя граница.
+        """
+        chosen = np.asarray(state["chosen"], dtype=np.int64)
+        m = chosen.size
+        units = self._units
+
+        sep = self.pair_separation[chosen][:, candidates]      # m x r
+        ratio = self.pair_ratio[chosen][:, candidates]
+        close = sep <= self._close_distance
+
+        # Новые IMD продукты с участием кандидата: c + s_i - s_j и s_i + s_j - c
+        if m >= 2:
+            i_idx, j_idx = np.nonzero(~np.eye(m, dtype=bool))
+            diffs = units[chosen[i_idx]] - units[chosen[j_idx]]
+            i_up, j_up = np.triu_indices(m, k=1)
+            sums = units[chosen[i_up]] + units[chosen[j_up]]
+            cand_units = units[candidates][:, None]
+            extras = np.sort(np.concatenate([cand_units + diffs[None, :], sums[None, :] - cand_units], axis=1), axis=1)
+            # Учитываем только уникальные продукты, которых еще нет у набора
+            fresh = np.ones(extras.shape, dtype=bool)
+            fresh[:, 1:] = extras[:, 1:] != extras[:, :-1]
+            fresh &= ~self._contains(state["products"], extras)
+        else:
+            extras = np.empty((candidates.size, 0), dtype=np.int64)
+            fresh = np.empty((candidates.size, 0), dtype=bool)
+
+        # Вклад новых продуктов в уже выбранные каналы
+        extra_imd = (self._ratio_units(units[chosen][:, None, None] - extras[None, :, :]) * fresh[None]).sum(axis=2)
+
+        # Помехи для самого кандидата: все продукты набора плюс новые
+        cand_imd = (self._ratio_units(units[candidates][:, None] - state["products"][None, :]).sum(axis=1)
+                    + (self._ratio_units(units[candidates][:, None] - extras) * fresh).sum(axis=1))
+
+        direct = np.vstack([
+            state["direct"][:, None] + ratio,
+            (ratio.sum(axis=0) + state["noise"][candidates])[None, :]
+        ])
+        imd = np.vstack([state["imd"][:, None] + extra_imd, cand_imd[None, :]])
+        close_count = np.vstack([state["close"][:, None] + close, close.sum(axis=0)[None, :]])
+        min_sep = np.vstack([
+            np.minimum(state["min_sep"][:, None], sep),
+            (sep.min(axis=0) if m else np.full(candidates.size, np.inf))[None, :]
+        ])
+
+        direct_coef, imd_coef = self.analyzer.interference_coefs(close_count)
+        multiplier = self.analyzer.interference_multipliers(min_sep, close_count, count)
+
+        if m + 1 == count:
+            level = direct_coef * direct + imd_coef * imd
+            scores = (level * multiplier).max(axis=0)
+        else:
+            level = direct_coef * direct + imd_coef * imd
+            future = count - m - 1
+            if candidates.size > future:
+                level = level + self._completion(candidates, ratio, extra_imd, future, direct_coef, imd_coef)
+            # Добавление каналов не уменьшает суммы и число близких каналов,
+            # а минимальный разнос может только уменьшиться. Множитель убывает
+            # с разносом до 2 * MIN_SAFE_DISTANCE и скачком растет после - берем
+            # минимум по всем разносам не больше текущего.
+            edge = self.analyzer.interference_multipliers(
+                np.full(min_sep.shape, self.analyzer.MIN_SAFE_DISTANCE * 2 - 1e-9), close_count, count
+            )
+            lower = np.where(min_sep >= self.analyzer.MIN_SAFE_DISTANCE * 2, np.minimum(multiplier, edge), multiplier)
+            scores = (level * lower).max(axis=0)
+
+        return {
+            "candidates": candidates,
+            "scores": scores,
+            "direct": direct,
+            "imd": imd,
+            "close": close_count,
+            "min_sep": min_sep,
+            "extras": extras,
+            "fresh": fresh
+        }
+
+    def _completion(self, candidates: np.ndarray, ratio: np.ndarray, extra_imd: np.ndarray, future: int,
+                    direct_coef: np.ndarray, imd_coef: np.ndarray) -> np.ndarray:
+        """
+        Нижняя оценка прироста уровня помех от future каналов, которые
+        еще будут добавлены к наборам "текущий + кандидат" из тех же кандидатов.
+
+        Прямые помехи складываются, поэтому прирост не меньше суммы future
+        наименьших отношений мощностей к кандидатам. IMD продукты могут совпадать,
+        но каждый из future каналов добавит свои новые продукты: прирост у
+        выбранного канала не меньше future-го по величине вклада одного кандидата.
+        """
+        pair = self.pair_ratio[candidates][:, candidates].copy()
+        np.fill_diagonal(pair, np.inf)
+        own_direct = np.partition(pair, future - 1, axis=1)[:, :future].sum(axis=1)
+
+        if ratio.shape[0]:
+            chosen_direct = np.partition(ratio, future - 1, axis=1)[:, :future].sum(axis=1)
+            # Вклад самого кандидата уже учтен: берем максимум, а не сумму
+            chosen_imd = np.maximum(extra_imd, np.partition(extra_imd, future - 1, axis=1)[:, future - 1:future])
+            chosen_imd = chosen_imd - extra_imd
+            chosen = direct_coef[:-1] * chosen_direct[:, None] + imd_coef[:-1] * chosen_imd
+        else:
+            chosen = np.empty((0, candidates.size))
+        return np.vstack([chosen, (direct_coef[-1] * own_direct)[None, :]])
+
+    def _descend(self, state: Dict, evaluation: Dict, column: int) -> Dict:
+        """Строит состояние набора с добавленным кандидатом из evaluation."""
+        extras = evaluation["extras"][column][evaluation["fresh"][column]]
+        return {
+            "noise": state["noise"],
+            "chosen": state["chosen"] + [int(evaluation["candidates"][column])],
+            "direct": evaluation["direct"][:, column],
+            "imd": evaluation["imd"][:, column],
+            "close": evaluation["close"][:, column],
+            "min_sep": evaluation["min_sep"][:, column],
+            # Продукты держим отсортированными для быстрого поиска
+            "products": np.sort(np.concatenate([state["products"], extras]))
+        }
+
+    def _exact_score(self, state: Dict) -> float:
+        """Точный худший уровень помех для полностью собранного набора."""
+        direct_coef, imd_coef = self.analyzer.interference_coefs(state["close"])
+        level = direct_coef * state["direct"] + imd_coef * state["imd"]
+        multiplier = self.analyzer.interference_multipliers(state["min_sep"], state["close"], len(state["chosen"]))
+        return float((level * multiplier).max())
+
+    def _branch(self, state: Dict, free: np.ndarray, bound: float, search: Dict):
+        """Рекурсивный шаг branch-and-bound."""
+        search["nodes"] += 1
+        if time.perf_counter() > search["deadline"]:
+            raise _SearchTimeout()
+
+        need = search["count"] - len(state["chosen"])
+        evaluation = self._expand(state, free, search["count"])
+        scores = np.maximum(evaluation["scores"], bound)
+        order = np.argsort(scores, kind="stable")
+
+        for position, column in enumerate(order):
+            if free.size - position < need:
+                break
+
+            # Каждый из need оставшихся каналов будет выбран не раньше текущего,
+            # а оценка набора не меньше оценки любого его поднабора "текущий + канал".
+            # Поэтому граница ветки - оценка need-го по порядку кандидата.
+            score = scores[order[position + need - 1]]
+            if score >= search["best_score"]:
+                # Дети отсортированы по оценке - дальше только хуже
+                break
+
+            if need == 1:
+                # Для полного набора оценка точная
+                search["best_score"] = float(evaluation["scores"][column])
+                search["best_set"] = state["chosen"] + [int(free[column])]
+                continue
+
+            child = self._descend(state, evaluation, column)
+            # Наборы с уже просмотренными кандидатами разобраны в предыдущих ветках
+            self._branch(child, free[order[position + 1:]], float(score), search)
+
+    @staticmethod
+    def _contains(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Проверяет вхождение values в отсортированный массив бинарным поиском."""
+        if sorted_values.size == 0:
+            return np.zeros(values.shape, dtype=bool)
+        positions = np.minimum(np.searchsorted(sorted_values, values), sorted_values.size - 1)
+        return sorted_values[positions] == values
+
+    def _ratio_units(self, distance_units: np.ndarray) -> np.ndarray:
+        """Отношение мощностей по разносу в 0.1 МГц через таблицу."""
+        distance = np.minimum(np.abs(distance_units), self._ratio_by_distance.size - 1)
+        return self._ratio_by_distance[distance]
@@ -0,0 +1,147 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from . import artifacts, imd_engine
+
+
+class PairwiseTable:
+    """
+    Плотная таблица попарных характеристик всех каналов каталога.
+
+    Индексы строк и столбцов - ID каналов (позиции в ChannelCatalog.records).
+    Все величины хранятся в одном массиве float32 формы (5, N, N):
+    разнос, отношение мощностей, уровень помех пары, множитель пары
+    и номер уровня опасности пары.
+    Массив сохраняется рядом с JSON и при следующем старте
+    открывается через mmap, а не пересчитывается.
+    """
+
+    SEPARATION = 0
+    POWER_RATIO = 1
+    PAIR_PERCENT = 2
+    PAIR_MULTIPLIER = 3
+    PAIR_RISK = 4
+    PLANES = 5
+
+    def __init__(self, frequencies: List[float], values: np.ndarray, risk_levels: List[str],
+                 path: Optional[str] = None):
+        self.frequencies = [float(f) for f in frequencies]
+        self.values = values
+        self.risk_levels = risk_levels
+        # Файл, открытый через mmap (None - таблица только в памяти): по нему ее открывают процессы пула
+        self.path = path
+
+        # Одинаковые частоты в разных группах дают одинаковые строки - берем первую
+        self._index = {}
+        for channel_id, frequency in enumerate(self.frequencies):
+            self._index.setdefault(frequency, channel_id)
+
+    @classmethod
+    def build(cls, analyzer, frequencies: List[float]) -> "PairwiseTable":
+        """Считает таблицу для списка частот каталога."""
+        freqs = np.asarray(frequencies, dtype=np.float64)
+        n = freqs.size
+        values = np.zeros((cls.PLANES, n, n), dtype=np.float32)
+        risk_levels = cls.risk_levels_of(analyzer)
+
+        values[cls.SEPARATION] = np.abs(freqs[:, None] - freqs[None, :])
+        values[cls.POWER_RATIO] = imd_engine.power_ratios(
+            0.0, values[cls.SEPARATION].astype(np.float64), analyzer.POWER_DECAY, analyzer.CHANNEL_WIDTH
+        )
+
+        # Пары считаем по уникальным частотам - в каталоге много повторов
+        unique = sorted(set(freqs.tolist()))
+        results = {}
+        for i, f1 in enumerate(unique):
+            for f2 in unique[i:]:
+                pair = analyzer.pair_interference(f1, f2)
+                results[(f1, f2)] = results[(f2, f1)] = (
+                    pair["total_percent"],
+                    pair["debug"]["multiplier"],
+                    risk_levels.index(pair["risk_level"])
+                )
+
+        for i, f1 in enumerate(freqs.tolist()):
+            for j, f2 in enumerate(freqs.tolist()):
+                percent, multiplier, risk = results[(f1, f2)]
+                values[cls.PAIR_PERCENT, i, j] = percent
+                values[cls.PAIR_MULTIPLIER, i, j] = multiplier
+                values[cls.PAIR_RISK, i, j] = risk
+
+        return cls(frequencies, values, risk_levels)
+
+    @classmethod
+    def load_or_build(cls, analyzer, frequencies: List[float], json_path: str) -> "PairwiseTable":
+        """
+        Открывает сохраненную таблицу через mmap или строит и сохраняет новую.
+
+        Имя файла содержит отпечаток частот и параметров модели,
+        поэтому изменение каталога или коэффициентов дает новый файл,
+        а таблицы по прошлым версиям удаляются после его сохранения.
+        """
+        n = len(frequencies)
+        path = cls.artifact_path(analyzer, frequencies, json_path)
+        values = artifacts.load_or_build(path, (cls.PLANES, n, n), lambda: cls.build(analyzer, frequencies).values)
+        return cls(frequencies, values, cls.risk_levels_of(analyzer),
+                   path if isinstance(values, np.memmap) else None)
+
+    @classmethod
+    def open(cls, analyzer, frequencies: List[float], path: str) -> Optional["PairwiseTable"]:
+        """Открывает сохраненную таблицу через mmap (в процессе пула) или None, если файла нет."""
+        n = len(frequencies)
+        values = artifacts.load_array(path, (cls.PLANES, n, n))
+        return None if values is None else cls(frequencies, values, cls.risk_levels_of(analyzer), path)
+
+    @staticmethod
+    def risk_levels_of(analyzer) -> List[str]:
+        """Уровни опасности в порядке порогов анализатора (номер уровня хранится в таблице)."""
+        return list(analyzer.INTERFERENCE_THRESHOLDS) + ["none"]
+
+    @staticmethod
+    def artifact_path(analyzer, frequencies: List[float], json_path: str) -> str:
+        """Путь к файлу таблицы рядом с JSON каталога."""
+        return artifacts.artifact_path(json_path, "pairwise", {
+            "frequencies": [float(f) for f in frequencies],
+            "power_decay": analyzer.POWER_DECAY,
+            "channel_width": analyzer.CHANNEL_WIDTH,
+            "min_safe_distance": analyzer.MIN_SAFE_DISTANCE,
+            "thresholds": analyzer.INTERFERENCE_THRESHOLDS
+        })
+
+    def index_of(self, frequency: float) -> Optional[int]:
+        """ID первого канала каталога с этой частотой."""
+        return self._index.get(float(frequency))
+
+    def power_ratio(self, freq1: float, freq2: float) -> Optional[float]:
+        """Отношение мощностей из таблицы или None, если частот нет в каталоге."""
+        i, j = self.index_of(freq1), self.index_of(freq2)
+        if i is None or j is None:
+            return None
+        return round(float(self.values[self.POWER_RATIO, i, j]), 4)
+
+    def power_ratios(self, target_freq: float, frequencies: List[float]) -> Optional[np.ndarray]:
+        """
+        Отношения мощностей цели ко всем частотам списка одной строкой таблицы
+        (как imd_engine.power_ratios) или None, если какой-то частоты нет в каталоге.
+        """
+        i = self.index_of(target_freq)
+        ids = [self.index_of(f) for f in frequencies]
+        if i is None or None in ids:
+            return None
+        return np.round(self.values[self.POWER_RATIO, i, ids].astype(np.float64), 4)
+
+    def pair(self, freq1: float, freq2: float) -> Optional[Dict]:
+        """
+        Разнос, уровень помех и множитель пары каналов
+        или None, если частот нет в каталоге.
+        """
+        i, j = self.index_of(freq1), self.index_of(freq2)
+        if i is None or j is None:
+            return None
+        return {
+            "separation": float(self.values[self.SEPARATION, i, j]),
+            "total_percent": round(float(self.values[self.PAIR_PERCENT, i, j]), 2),
+            "risk_level": self.risk_levels[int(self.values[self.PAIR_RISK, i, j])],
+            "multiplier": round(float(self.values[self.PAIR_MULTIPLIER, i, j]), 1)
+        }
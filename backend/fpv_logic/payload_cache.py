@@ -0,0 +1,46 @@
+import gzip
+import hashlib
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli  # Необязательная зависимость: без нее отдаем gzip
+except ImportError:
+    brotli = None
+
+
+class PreparedPayload:
+    """
+    Заранее сериализованный ответ: исходные байты, сжатые варианты и ETag.
+
+    Все варианты считаются один раз при сборке, запросы только выбирают
+    подходящий. Когда каталог меняется, Services собирает новый ответ.
+    """
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+        # Слабый ETag: один на все кодировки, содержимое после распаковки одинаковое
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+
+        self.variants: Dict[str, bytes] = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(body, quality=11)
+
+    def select(self, accepted: Dict[str, float]) -> Tuple[Optional[str], bytes]:
+        """
+        Выбирает вариант по качествам из Accept-Encoding.
+
+        Args:
+            accepted: Кодировка -> качество (0 - клиент ее не принимает)
+
+        Returns:
+            (Content-Encoding или None для несжатого тела, байты ответа)
+        """
+        best = None
+        for encoding in ("br", "gzip"):
+            quality = accepted.get(encoding, 0)
+            if encoding in self.variants and quality > 0 and (best is None or quality > best[1]):
+                best = (encoding, quality)
+        if best is None:
+            return None, self.body
+        return best[0], self.variants[best[0]]
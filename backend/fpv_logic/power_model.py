@@ -0,0 +1,174 @@
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Мощность передатчика по умолчанию (мВт) - минимальная разрешенная на гонках
+DEFAULT_POWER_MW = 25.0
+# Показатель затухания: 2 - свободное пространство, 2.5-3 - поле с препятствиями
+DEFAULT_PATH_LOSS_EXPONENT = 2.0
+# Шум на входе приемника в полосе канала (дБм)
+DEFAULT_NOISE_FLOOR_DBM = -90.0
+# Точка пересечения третьего порядка по входу приемника (дБм): чем ниже, тем сильнее IMD
+DEFAULT_IIP3_DBM = -10.0
+# Минимальное отношение сигнал/(помеха+шум), при котором видео еще пригодно (дБ)
+DEFAULT_MIN_SINR_DB = 10.0
+# Расстояние ближе 1 м считаем равным 1 м (модель затухания там не работает)
+MIN_DISTANCE_M = 1.0
+# Испытания считаются частями по CHUNK_ELEMENTS элементов массивов (испытания, приемники, передатчики):
+# память не растет с числом испытаний
+CHUNK_ELEMENTS = 1 << 20
+
+
+def dbm_to_mw(dbm):
+    return 10 ** (np.asarray(dbm, dtype=np.float64) / 10)
+
+
+def mw_to_dbm(mw):
+    return 10 * np.log10(np.maximum(np.asarray(mw, dtype=np.float64), 1e-30))
+
+
+class PowerModel:
+    """
+    Модель помех с учетом мощности передатчиков и расстояний.
+
+    У каждого пилота свой приемник (очки, стоит на месте) и передатчик (дрон).
+    Мощность передатчика j на приемнике i затухает по логарифмической модели
+    расстояния, а избирательность по частоте - та же, что у InterferenceAnalyzer
+    (exp(-разнос * POWER_DECAY / CHANNEL_WIDTH)). IMD третьего порядка 2fj - fk
+    возникают во входном каскаде приемника: P = 2Pj + Pk - 2*IIP3 (дБм).
+
+    Метод Монте-Карло: положения дронов случайны (равномерно в круге радиуса
+    area_radius вокруг старта), испытания считаются частями по массивам формы
+    (испытания, приемники, передатчики).
+    """
+
+    def __init__(self, analyzer, path_loss_exponent: float = DEFAULT_PATH_LOSS_EXPONENT,
+                 noise_floor_dbm: float = DEFAULT_NOISE_FLOOR_DBM, iip3_dbm: float = DEFAULT_IIP3_DBM):
+        self.analyzer = analyzer
+        self.path_loss_exponent = path_loss_exponent
+        self.noise_floor_dbm = noise_floor_dbm
+        self.iip3_dbm = iip3_dbm
+
+    def selectivity(self, separation) -> np.ndarray:
+        """Доля мощности, попадающая в приемник при данном разносе частот (без округления)."""
+        separation = np.abs(np.asarray(separation, dtype=np.float64))
+        return np.exp(-separation * self.analyzer.POWER_DECAY / self.analyzer.CHANNEL_WIDTH)
+
+    def _sinr(self, receivers: np.ndarray, drones: np.ndarray, freqs: np.ndarray, power_mw: np.ndarray,
+              direct_weights: np.ndarray, imd_weights: np.ndarray):
+        """
+        SINR (дБ) и доля IMD в помехах для части испытаний: массивы (испытания, приемники).
+
+        IMD 2fj - fk считается как P = Pj^2 * Pk / IIP3^2 (мВт): сумма по k - пакетное
+        умножение матриц по приемникам, без массива (испытания, i, j, k).
+        """
+        n = freqs.size
+        # Мощность передатчика j на приемнике i: (испытания, i, j)
+        distance = np.linalg.norm(receivers[None, :, None, :] - drones[:, None, :, :], axis=-1)
+        received = power_mw[None, None, :] * self.path_gain(distance, freqs[None, None, :])
+
+        signal = received[:, np.arange(n), np.arange(n)]
+        direct = np.einsum("tij,ij->ti", received, direct_weights)
+
+        by_receiver = received.transpose(1, 0, 2)                       # (i, испытания, k)
+        pair = np.matmul(by_receiver, imd_weights).transpose(1, 0, 2)    # (испытания, i, j)
+        imd = (received ** 2 * pair).sum(axis=2) / dbm_to_mw(self.iip3_dbm) ** 2
+
+        noise = dbm_to_mw(self.noise_floor_dbm)
+        sinr_db = mw_to_dbm(signal) - mw_to_dbm(direct + imd + noise)
+        total_interference = direct + imd
+        imd_share = np.divide(imd, total_interference, out=np.zeros_like(imd), where=total_interference > 0)
+        return sinr_db, imd_share
+
+    def path_gain(self, distance, frequency) -> np.ndarray:
+        """
+        Линейный коэффициент передачи по мощности: потери в свободном пространстве
+        на 1 м плюс 10*n*log10(d) дальше.
+        """
+        distance = np.maximum(np.asarray(distance, dtype=np.float64), MIN_DISTANCE_M)
+        loss_1m = 20 * np.log10(np.asarray(frequency, dtype=np.float64)) - 27.55  # МГц, метры
+        return 10 ** (-(loss_1m + 10 * self.path_loss_exponent * np.log10(distance)) / 10)
+
+    def simulate(self, transmitters: List[Dict], trials: int = 2000, area_radius: float = 100.0,
+                 min_sinr_db: float = DEFAULT_MIN_SINR_DB, seed: Optional[int] = None) -> Dict:
+        """
+        Вероятность непригодного видео на каждом канале группы.
+
+        Args:
+            transmitters: Пилоты группы: frequency (МГц), power_mw, pilot [x, y] - где стоит
+                приемник (по умолчанию пилоты стоят в ряд через 1 м), drone [x, y] - положение
+                дрона (если задано, оно не разыгрывается)
+            trials: Число испытаний Монте-Карло
+            area_radius: Радиус области полета вокруг старта, м
+            min_sinr_db: Порог пригодности видео по SINR
+            seed: Сид генератора (одинаковый сид - одинаковый результат)
+
+        Returns:
+            Dict с вероятностью непригодного видео, квантилями SINR и долями
+            прямых помех и IMD по каждому каналу
+
+        Raises:
+            ValueError: если передатчиков нет или параметры некорректны
+        """
+        n = len(transmitters)
+        if n == 0:
+            raise ValueError("Нужен хотя бы один передатчик")
+        if trials < 1 or area_radius <= 0:
+            raise ValueError("trials и area_radius должны быть положительными")
+
+        freqs = np.array([float(t["frequency"]) for t in transmitters])
+        if np.any(freqs <= 0):
+            raise ValueError("Частота передатчика должна быть положительной")
+        power_mw = np.array([float(t.get("power_mw") or DEFAULT_POWER_MW) for t in transmitters])
+        if np.any(power_mw <= 0):
+            raise ValueError("Мощность передатчика должна быть положительной")
+        receivers = np.array([
+            t["pilot"] if t.get("pilot") is not None else (float(i), 0.0) for i, t in enumerate(transmitters)
+        ], dtype=np.float64)
+
+        # Положения дронов: заданные - как есть, остальные - равномерно в круге
+        rng = np.random.default_rng(seed)
+        radius = area_radius * np.sqrt(rng.random((trials, n)))
+        angle = rng.random((trials, n)) * 2 * math.pi
+        drones = np.stack([radius * np.cos(angle), radius * np.sin(angle)], axis=-1)
+        for j, t in enumerate(transmitters):
+            if t.get("drone") is not None:
+                drones[:, j] = np.asarray(t["drone"], dtype=np.float64)
+
+        direct_weights = self.selectivity(freqs[:, None] - freqs[None, :])
+        np.fill_diagonal(direct_weights, 0.0)
+        # IMD 2fj - fk на входе приемника i, только j != k; матрица весов k x j для каждого приемника
+        imd_weights = self.selectivity(freqs[:, None, None] - (2 * freqs[None, :, None] - freqs[None, None, :]))
+        imd_weights[:, np.arange(n), np.arange(n)] = 0.0
+        imd_weights = imd_weights.transpose(0, 2, 1)
+
+        sinr_db = np.empty((trials, n))
+        imd_share = np.empty((trials, n))
+        chunk = max(1, CHUNK_ELEMENTS // (n * n))
+        for start in range(0, trials, chunk):
+            part = slice(start, start + chunk)
+            sinr_db[part], imd_share[part] = self._sinr(receivers, drones[part], freqs, power_mw,
+                                                        direct_weights, imd_weights)
+        unusable = sinr_db < min_sinr_db
+
+        p10, p50, p90 = np.percentile(sinr_db, [10, 50, 90], axis=0)
+
+        channels = []
+        for i, t in enumerate(transmitters):
+            channels.append({
+                "frequency": float(freqs[i]),
+                "power_mw": float(power_mw[i]),
+                "unusable_probability": round(float(unusable[:, i].mean()), 4),
+                "sinr_db": {"p10": round(float(p10[i]), 2), "p50": round(float(p50[i]), 2),
+                            "p90": round(float(p90[i]), 2)},
+                "imd_share": round(float(imd_share[:, i].mean()), 4)
+            })
+
+        return {
+            "trials": trials,
+            "area_radius": area_radius,
+            "min_sinr_db": min_sinr_db,
+            "any_unusable_probability": round(float(unusable.any(axis=1).mean()), 4),
+            "channels": channels
+        }
@@ -0,0 +1,251 @@
+import cProfile
+import os
+import pstats
+import random
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Замеры текущего запроса (у каждого потока/запроса свои)
+_current: ContextVar[Optional["RequestTimings"]] = ContextVar("fpv_request_timings", default=None)
+
+# Профили задач пула расчетов, запущенных профилируемым запросом (None - запрос не профилируется)
+_task_profiles: ContextVar[Optional[List[cProfile.Profile]]] = ContextVar("fpv_task_profiles", default=None)
+
+# Границы корзин гистограмм (секунды и штуки)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+IMD_PRODUCT_BUCKETS = (0, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+
+class RequestTimings:
+    """Сумма длительностей именованных этапов одного запроса."""
+
+    __slots__ = ("started", "stages", "imd_products")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.imd_products = []
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        """Значение заголовка Server-Timing (длительности в мс)."""
+        parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()]
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+def start_request() -> RequestTimings:
+    """Начинает сбор замеров для текущего запроса."""
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def finish_request() -> Optional[RequestTimings]:
+    """Заканчивает сбор замеров и возвращает их (None, если сбор не начинали)."""
+    timings = _current.get()
+    _current.set(None)
+    return timings
+
+
+@contextmanager
+def span(name: str):
+    """
+    Замер этапа. Вне запроса ничего не записывает, поэтому
+    расчетный код можно вызывать и из скриптов, и из бенчмарков.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def record_imd_products(count: int):
+    """Запоминает число IMD продуктов, посчитанных в текущем запросе."""
+    timings = _current.get()
+    if timings is not None:
+        timings.imd_products.append(count)
+
+
+class Histogram:
+    """Гистограмма в формате Prometheus (накопительные корзины, сумма и количество)."""
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Последняя корзина - +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> list:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{le}"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.total:.6f}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Счетчики и гистограммы запросов в памяти процесса.
+    У каждого воркера gunicorn свой реестр - Prometheus собирает их по отдельности.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)      # (endpoint, method, status) -> количество
+        self.latency = {}                     # endpoint -> Histogram
+        self.stage_seconds = defaultdict(float)
+        self.stage_count = defaultdict(int)
+        self.imd_products = Histogram(IMD_PRODUCT_BUCKETS)
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float,
+                        timings: Optional[RequestTimings] = None):
+        with self._lock:
+            self.requests[(endpoint, method, status)] += 1
+            if endpoint not in self.latency:
+                self.latency[endpoint] = Histogram(LATENCY_BUCKETS)
+            self.latency[endpoint].observe(seconds)
+
+            if timings is not None:
+                for stage, stage_seconds in timings.stages.items():
+                    self.stage_seconds[(endpoint, stage)] += stage_seconds
+                    self.stage_count[(endpoint, stage)] += 1
+                for count in timings.imd_products:
+                    self.imd_products.observe(count)
+
+    def render(self) -> str:
+        """Текст в формате Prometheus exposition 0.0.4."""
+        lines = [
+            "# HELP fpv_http_requests_total Количество HTTP запросов",
+            "# TYPE fpv_http_requests_total counter"
+        ]
+        with self._lock:
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'fpv_http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}'
+                )
+
+            lines += [
+                "# HELP fpv_http_request_duration_seconds Время обработки запроса",
+                "# TYPE fpv_http_request_duration_seconds histogram"
+            ]
+            for endpoint, histogram in sorted(self.latency.items()):
+                lines += histogram.render("fpv_http_request_duration_seconds", f'endpoint="{endpoint}"')
+
+            lines += [
+                "# HELP fpv_stage_seconds_total Суммарное время этапов обработки",
+                "# TYPE fpv_stage_seconds_total counter"
+            ]
+            for (endpoint, stage), seconds in sorted(self.stage_seconds.items()):
+                lines.append(f'fpv_stage_seconds_total{{endpoint="{endpoint}",stage="{stage}"}} {seconds:.6f}')
+
+            lines += [
+                "# HELP fpv_stage_calls_total Количество запросов с этим этапом",
+                "# TYPE fpv_stage_calls_total counter"
+            ]
+            for (endpoint, stage), count in sorted(self.stage_count.items()):
+                lines.append(f'fpv_stage_calls_total{{endpoint="{endpoint}",stage="{stage}"}} {count}')
+
+            lines += [
+                "# HELP fpv_imd_products Число IMD продуктов в одном расчете",
+                "# TYPE fpv_imd_products histogram"
+            ]
+            lines += self.imd_products.render("fpv_imd_products", "")
+
+        return "\n".join(lines) + "\n"
+
+
+def profiled(compute: Callable[[], object]) -> Callable[[], object]:
+    """
+    Обертка задачи пула расчетов: если запрос, запустивший задачу, профилируется,
+    задача пишет свой профиль в потоке пула (cProfile видит только свой поток),
+    и RequestProfiler.stop добавляет его к профилю запроса.
+    Контекст запроса переносится в поток пула вместе с задачей.
+    """
+    def run():
+        profiles = _task_profiles.get()
+        if profiles is None:
+            return compute()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return compute()
+        finally:
+            profiler.disable()
+            profiles.append(profiler)
+    return run
+
+
+class RequestProfiler:
+    """
+    cProfile для отдельных запросов: по явной просьбе клиента
+    или случайной выборкой с вероятностью sample_rate.
+    Одновременно профилируется не больше одного запроса в процессе.
+    Расчеты запроса в пуле (profiled) попадают в тот же файл.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, directory: Optional[str] = None):
+        self.sample_rate = sample_rate
+        self.directory = directory or tempfile.gettempdir()
+        self._busy = threading.Lock()
+
+    def start(self, requested: bool = False) -> Optional[cProfile.Profile]:
+        """Включает профилировщик, если запрос попал в выборку и другой профиль не пишется."""
+        if not requested and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            return None
+        if not self._busy.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        _task_profiles.set([])
+        profiler.enable()
+        return profiler
+
+    def stop(self, profiler: cProfile.Profile, label: str) -> Optional[str]:
+        """
+        Выключает профилировщик и сохраняет статистику запроса вместе
+        с профилями его задач в пуле (файл для pstats/snakeviz).
+        """
+        try:
+            profiler.disable()
+            stats = pstats.Stats(profiler)
+            for task_profile in _task_profiles.get() or []:
+                stats.add(task_profile)
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"fpv-{label}-{time.time_ns()}.prof")
+            stats.dump_stats(path)
+            return path
+        except OSError as e:
+            print(f"❌ Не удалось сохранить профиль: {e}")
+            return None
+        finally:
+            _task_profiles.set(None)
+            self._busy.release()
+
+
+# Общий реестр процесса
+METRICS = MetricsRegistry()
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+# Значения по умолчанию (сервер переопределяет их из Config)
+DEFAULT_MAX_SIZE = 4096
+DEFAULT_TTL = 600.0
+
+
+class ResultCache:
+    """
+    LRU кэш результатов расчета помех с ограничением по размеру и времени жизни.
+
+    Ключ - целевая частота, отсортированный набор остальных частот (порядок
+    передатчиков на результат не влияет), параметры модели анализатора
+    и версия измеренного спектра.
+    Один кэш общий для всех анализаторов процесса: разные параметры дают разные ключи.
+    Кэшированные словари общие для всех вызывающих - изменять их нельзя.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, ttl: Optional[float] = DEFAULT_TTL):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # ключ -> (момент записи, результат)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def configure(self, max_size: int, ttl: Optional[float]):
+        """Меняет лимиты (0 - кэш выключен, ttl <= 0 - без ограничения по времени)."""
+        with self._lock:
+            self.max_size = max_size
+            self.ttl = ttl if ttl and ttl > 0 else None
+            self._trim()
+
+    @staticmethod
+    def key(analyzer, target_freq: float, other_freqs: Iterable[float]) -> Tuple:
+        """Ключ результата calculate_total_interference."""
+        return (
+            round(float(target_freq), 3),
+            tuple(sorted(round(float(f), 3) for f in other_freqs)),
+            analyzer.POWER_DECAY,
+            analyzer.CHANNEL_WIDTH,
+            analyzer.MIN_SAFE_DISTANCE,
+            tuple(analyzer.INTERFERENCE_THRESHOLDS.items()),
+            # Новые измерения сканера дают новые ключи
+            analyzer.noise_floor.version if getattr(analyzer, "noise_floor", None) is not None else None
+        )
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Dict]) -> Dict:
+        """
+        Возвращает результат из кэша или считает и запоминает его.
+        Расчет идет без блокировки: два потока с одним ключом посчитают его дважды.
+        """
+        if self.max_size <= 0:
+            return compute()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self.ttl is None or now - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        result = compute()
+        with self._lock:
+            self._entries[key] = (now, result)
+            self._entries.move_to_end(key)
+            self._trim()
+        return result
+
+    def invalidate(self):
+        """Сбрасывает все результаты (каталог перечитан или модель изменилась)."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def _trim(self):
+        while len(self._entries) > max(self.max_size, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        """Счетчики кэша."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+    def render_metrics(self) -> str:
+        """Счетчики в формате Prometheus (дополняют /metrics)."""
+        stats = self.stats()
+        lines = [
+            "# HELP fpv_result_cache_entries Записей в кэше результатов",
+            "# TYPE fpv_result_cache_entries gauge",
+            f"fpv_result_cache_entries {stats['size']}",
+            "# HELP fpv_result_cache_events_total События кэша результатов",
+            "# TYPE fpv_result_cache_events_total counter"
+        ]
+        for event in ("hits", "misses", "evictions", "expirations", "invalidations"):
+            lines.append(f'fpv_result_cache_events_total{{event="{event}"}} {stats[event]}')
+        return "\n".join(lines) + "\n"
+
+
+# Общий кэш процесса: его используют анализатор, обработчики API и оптимизатор
+RESULT_CACHE = ResultCache()
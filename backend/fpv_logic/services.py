@@ -0,0 +1,243 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Mapping, Optional
+
+from .compute_pool import ComputePool
+from .catalog import CatalogError
+from .data_loader import DEFAULT_JSON_PATH, DataLoader
+from .group_session import SessionStore
+from .harmonic_index import HarmonicIndex
+from .heat_planner import HeatPlanner, process_pool
+from .interference import InterferenceAnalyzer
+from .optimizer import ChannelOptimizer
+from .pairwise_table import PairwiseTable
+from .payload_cache import PreparedPayload
+from .power_model import PowerModel
+from .spectral_imd import SpectralIMDEngine
+from .spectrum_scan import NoiseFloor, ScanIngestor
+
+# Порядок прогрева: каждый компонент строится после тех, от которых зависит.
+# Пула процессов планировщика здесь нет: его очереди и процессы не должны
+# создаваться в мастере gunicorn до fork - каждый воркер строит свой при первом плане.
+WARM_UP_ORDER = (
+    "loader", "noise_floor", "scan_ingestor", "analyzer", "spectral_engine", "harmonics", "optimizer", "sessions",
+    "planner", "power_model", "data_payload", "compute_pool"
+)
+
+# Компоненты, построенные по каталогу: при перечитывании каталога строятся заново
+CATALOG_DEPENDENT = (
+    "noise_floor", "scan_ingestor", "analyzer", "spectral_engine", "harmonics", "optimizer", "sessions",
+    "planner", "power_model", "data_payload"
+)
+
+
+def _lazy(build: Callable) -> property:
+    """
+    Компонент, который строится при первом обращении (один раз на процесс)
+    и попадает в замеры старта.
+    """
+    name = build.__name__
+
+    def getter(self):
+        if name not in self._built:
+            with self._lock:
+                if name not in self._built:
+                    started = time.perf_counter()
+                    self._built[name] = build(self)
+                    self.startup_seconds[name] = time.perf_counter() - started
+        return self._built[name]
+
+    getter.__doc__ = build.__doc__
+    return property(getter)
+
+
+class Services:
+    """
+    Каталог, анализатор и остальные тяжелые объекты сервера.
+
+    Ничего не загружается при создании: каждый компонент строится при первом
+    запросе, которому он нужен (или сразу в warm_up - например, в мастер-процессе
+    gunicorn до fork). Время построения каждого компонента сохраняется в startup_seconds.
+    """
+
+    def __init__(self, config: Mapping, dumps: Callable[[object], str]):
+        self.config = config
+        self.dumps = dumps
+        self.startup_seconds: Dict[str, float] = {}
+        self._built = {}
+        self._lock = threading.RLock()
+        self._scan_checked = 0.0
+        self._rejected_stamp = None
+
+    @_lazy
+    def loader(self) -> DataLoader:
+        """📥 Каталог и его индексы (снимок рядом с JSON или разбор JSON с проверкой)."""
+        return DataLoader(self.config.get("CATALOG_PATH") or DEFAULT_JSON_PATH)
+
+    @property
+    def catalog(self):
+        return self.loader.get_catalog()
+
+    @property
+    def catalog_index(self):
+        return self.loader.get_index()
+
+    @_lazy
+    def analyzer(self) -> InterferenceAnalyzer:
+        """⚡ Анализатор помех с индексами каталога и попарной таблицей (mmap рядом с JSON)."""
+        # Вложенный словарь ему не нужен: частоты каналов он берет из индекса каталога
+        analyzer = InterferenceAnalyzer({})
+        analyzer.attach_catalog_index(self.catalog_index)
+        analyzer.attach_pairwise_table(PairwiseTable.load_or_build(
+            analyzer, self.catalog.frequency.tolist(), self.loader.json_path
+        ))
+        # Таблица - чистая модель передатчиков; измеренный фон добавляется поверх нее
+        analyzer.attach_noise_floor(self.noise_floor)
+        return analyzer
+
+    @_lazy
+    def noise_floor(self) -> NoiseFloor:
+        """📻 Измеренный сканером спектр (сетка 1 МГц по всему каталогу)."""
+        return NoiseFloor.for_catalog(
+            self.catalog.frequency, self.catalog.bandwidth, self.config.get("NOISE_REFERENCE_DBM", -50.0)
+        )
+
+    @_lazy
+    def scan_ingestor(self) -> Optional[ScanIngestor]:
+        """📻 Чтение лога сканера SCAN_PATH (None, если лог не задан)."""
+        path = self.config.get("SCAN_PATH")
+        if not path:
+            return None
+        ingestor = ScanIngestor(path, self.noise_floor)
+        ingestor.update()
+        self._scan_checked = time.monotonic()
+        return ingestor
+
+    def refresh_noise_floor(self) -> int:
+        """
+        Дочитывает лог сканера, если с прошлой проверки прошло SCAN_REFRESH секунд.
+
+        Returns:
+            Сколько измерений добавлено
+        """
+        ingestor = self.scan_ingestor
+        if ingestor is None or time.monotonic() - self._scan_checked < self.config.get("SCAN_REFRESH", 5.0):
+            return 0
+        self._scan_checked = time.monotonic()
+        added = ingestor.update()
+        if added:
+            print(f"📻 Из лога сканера добавлено {added} измерений")
+        return added
+
+    @_lazy
+    def spectral_engine(self) -> SpectralIMDEngine:
+        """🌈 Спектральная модель IMD (сетка 1 МГц по всему каталогу)."""
+        return SpectralIMDEngine.for_catalog(self.catalog.frequency, self.catalog.bandwidth)
+
+    @_lazy
+    def harmonics(self) -> HarmonicIndex:
+        """🎼 Попадания гармоник каналов в другие каналы каталога (все диапазоны и модуляции)."""
+        return HarmonicIndex.for_catalog(self.catalog, self.config.get("HARMONIC_MAX_ORDER", 5))
+
+    @_lazy
+    def optimizer(self) -> ChannelOptimizer:
+        """🧠 Оптимизатор наборов каналов."""
+        return ChannelOptimizer(self.analyzer, self.catalog.frequency.tolist())
+
+    @_lazy
+    def sessions(self) -> SessionStore:
+        """🗂️ Сессии групп (у каждого воркера свои)."""
+        return SessionStore(self.analyzer)
+
+    @_lazy
+    def planner(self) -> HeatPlanner:
+        """🏁 Планировщик заездов."""
+        return HeatPlanner(self.analyzer, self.catalog_index)
+
+    @_lazy
+    def process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """🏁 Общий пул процессов воркера: планировщик заездов и пакеты групп (None - считать в потоке запроса)."""
+        workers = self.config.get("PLANNER_WORKERS") or os.cpu_count() or 1
+        return process_pool(workers) if workers > 1 else None
+
+    @_lazy
+    def power_model(self) -> PowerModel:
+        """📶 Модель помех с мощностями передатчиков и расстояниями (Монте-Карло)."""
+        return PowerModel(self.analyzer)
+
+    @_lazy
+    def compute_pool(self) -> ComputePool:
+        """🚦 Ограниченный пул тяжелых расчетов с объединением одинаковых запросов."""
+        return ComputePool(
+            workers=self.config.get("COMPUTE_WORKERS", 2),
+            max_queue=self.config.get("COMPUTE_QUEUE", 8),
+            timeout=self.config.get("COMPUTE_TIMEOUT", 10.0),
+            retry_after=self.config.get("COMPUTE_RETRY_AFTER", 1)
+        )
+
+    @_lazy
+    def data_payload(self) -> PreparedPayload:
+        """📦 Готовый ответ /api/data (JSON + gzip/brotli + ETag)."""
+        return self._build_data_payload()
+
+    def _build_data_payload(self) -> PreparedPayload:
+        return PreparedPayload(self.dumps(self.loader.get_data()).encode("utf-8"))
+
+    def refresh_catalog(self) -> bool:
+        """
+        Если файл каталога поменяли - перечитывает его и сбрасывает компоненты
+        из CATALOG_DEPENDENT (они построятся заново по новому каталогу).
+        Вызывается перед каждым запросом: пока каталог не загружен, ничего не делает,
+        а проверка загруженного - один os.stat.
+
+        Returns:
+            Перечитан ли каталог
+        """
+        if "loader" not in self._built:
+            return False
+        loader = self.loader
+        stamp = loader.file_stamp()
+        if stamp == self._rejected_stamp or not loader.is_stale():
+            return False
+
+        with self._lock:
+            if not loader.is_stale():
+                return False
+            try:
+                loader.reload()
+            except CatalogError as e:
+                # Некорректную правку не применяем и не перечитываем, пока файл не изменится снова
+                self._rejected_stamp = stamp
+                print(f"❌ Каталог не перечитан, работаем с прежним: {e}")
+                return False
+            for name in CATALOG_DEPENDENT:
+                self._built.pop(name, None)
+        return True
+
+    def warm_up(self) -> float:
+        """
+        Строит все компоненты сразу.
+
+        Returns:
+            Суммарное время построения, с
+        """
+        started = time.perf_counter()
+        for name in WARM_UP_ORDER:
+            getattr(self, name)
+        total = time.perf_counter() - started
+        print(f"🚀 Сервер прогрет за {total * 1000:.0f} мс: " + ", ".join(
+            f"{name} {seconds * 1000:.0f} мс" for name, seconds in self.startup_seconds.items()
+        ))
+        return total
+
+    def render_metrics(self) -> str:
+        """Время построения компонентов в формате Prometheus (дополняет /metrics)."""
+        lines = [
+            "# HELP fpv_startup_seconds Время построения компонента сервера при старте или первом запросе",
+            "# TYPE fpv_startup_seconds gauge"
+        ]
+        for name, seconds in sorted(self.startup_seconds.items()):
+            lines.append(f'fpv_startup_seconds{{component="{name}"}} {seconds:.6f}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,155 @@
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Шаг сетки спектра (МГц)
+GRID_STEP = 1.0
+
+# Относительный вес продуктов каждого порядка в суммарной плотности:
+# каждый следующий нечетный порядок примерно на 10 дБ слабее
+DEFAULT_ORDER_WEIGHTS = {3: 1.0, 5: 0.1, 7: 0.01}
+
+
+class SpectrumDensity:
+    """
+    Плотность IMD продуктов на сетке 1 МГц, отдельно по каждому порядку.
+
+    Значение в ячейке - сколько комбинаций передатчиков дает продукт
+    на этой частоте, взвешенных формой излучения (площадь формы каждого
+    передатчика равна 1). Комбинация из разных передатчиков считается один
+    раз, с повторяющимися (2f1 - f2) - с долей 1/(число перестановок).
+    """
+
+    def __init__(self, frequencies: np.ndarray, by_order: Dict[int, np.ndarray]):
+        self.frequencies = frequencies
+        self.by_order = by_order
+
+    def total(self, weights: Optional[Dict[int, float]] = None) -> np.ndarray:
+        """Суммарная плотность всех порядков с весами."""
+        weights = weights or DEFAULT_ORDER_WEIGHTS
+        total = np.zeros(self.frequencies.size)
+        for order, density in self.by_order.items():
+            total += weights.get(order, 0.0) * density
+        return total
+
+    def at(self, frequency: float, bandwidth: float = 20.0, order: Optional[int] = None,
+           weights: Optional[Dict[int, float]] = None) -> float:
+        """
+        Плотность продуктов в полосе приемника [frequency - bandwidth/2, frequency + bandwidth/2].
+
+        Args:
+            order: Только продукты этого порядка (по умолчанию - сумма с весами)
+        """
+        density = self.by_order[order] if order is not None else self.total(weights)
+        lo = np.searchsorted(self.frequencies, frequency - bandwidth / 2, side="left")
+        hi = np.searchsorted(self.frequencies, frequency + bandwidth / 2, side="right")
+        return float(density[lo:hi].sum())
+
+
+class SpectralIMDEngine:
+    """
+    Альтернативный расчет IMD: передатчики кладутся на фиксированную сетку
+    спектра с шагом 1 МГц, а продукты порядка 2m+1 (m+1 частот со знаком "+"
+    и m со знаком "-") получаются сверткой спектра занятости через FFT:
+    A^(m+1) * conj(A)^m. Стоимость зависит от размера сетки, а не от n^порядок.
+
+    Из свертки вычитаются вырожденные комбинации, которые совпадают с несущей
+    (f1 + f2 - f2, 3f1 - 2f1 и т.п.): все положительные частоты, кроме одной,
+    взаимно сокращаются с отрицательными. Их сумма считается в частотной области
+    через произведения |A_q|^2 без перебора комбинаций.
+    """
+
+    def __init__(self, f_min: float, f_max: float):
+        self.f0 = math.floor(f_min)
+        self.size = int(math.ceil(f_max) - self.f0) + 1
+        self.frequencies = self.f0 + np.arange(self.size) * GRID_STEP
+
+    @classmethod
+    def for_catalog(cls, frequencies: Iterable[float], bandwidths: Iterable[float]) -> "SpectralIMDEngine":
+        """Сетка, покрывающая все каналы каталога вместе с шириной их полосы."""
+        frequencies = np.asarray(list(frequencies), dtype=np.float64)
+        bandwidths = np.asarray(list(bandwidths), dtype=np.float64)
+        # Нулевая частота в каталоге означает недоступный канал - сетку по ней не растягиваем
+        used = frequencies > 0
+        margin = float(bandwidths[used].max())
+        return cls(frequencies[used].min() - margin, frequencies[used].max() + margin)
+
+    def shape(self, frequency: float, bandwidth: float) -> np.ndarray:
+        """
+        Форма излучения передатчика на сетке: прямоугольник шириной bandwidth
+        с единичной площадью (узкая полоса занимает хотя бы одну ячейку).
+
+        Raises:
+            ValueError: если частота вне сетки
+        """
+        if not self.frequencies[0] <= frequency <= self.frequencies[-1]:
+            raise ValueError(f"Частота {frequency} вне сетки спектра")
+        lo = np.searchsorted(self.frequencies, frequency - bandwidth / 2, side="left")
+        hi = np.searchsorted(self.frequencies, frequency + bandwidth / 2, side="right")
+        if hi <= lo:
+            lo = int(round((frequency - self.f0) / GRID_STEP))
+            hi = lo + 1
+        shape = np.zeros(self.size)
+        shape[lo:hi] = 1.0 / (hi - lo)
+        return shape
+
+    def density(self, transmitters: Iterable[Tuple[float, float]], max_order: int = 7) -> SpectrumDensity:
+        """
+        Плотность IMD продуктов 3, 5, ... max_order порядка.
+
+        Args:
+            transmitters: Пары (частота, ширина полосы) передатчиков
+            max_order: Максимальный нечетный порядок продуктов
+        """
+        transmitters = list(transmitters)
+        orders = list(range(3, max_order + 1, 2))
+        if not transmitters or not orders:
+            return SpectrumDensity(self.frequencies, {order: np.zeros(self.size) for order in orders})
+
+        # Продукты порядка N лежат в диапазоне индексов [-m(L-1), (m+1)(L-1)] - берем FFT
+        # такой длины, чтобы отрицательные индексы не наложились на окно сетки
+        fft_size = 1 << (max_order * (self.size - 1)).bit_length()
+        spectra = np.array([np.fft.rfft(self.shape(f, bw), fft_size) for f, bw in transmitters])
+        total = spectra.sum(axis=0)
+        powers = (spectra * spectra.conj()).real     # |A_q|^2 каждого передатчика
+
+        m_max = (max_order - 1) // 2
+        # F_q(x) = sum_k |A_q|^(2k) / (k!)^2 x^k; G = prod_q F_q - коэффициенты при x^0..x^m_max
+        factors = np.array([[p ** k / math.factorial(k) ** 2 for k in range(m_max + 1)] for p in powers])
+        product = np.zeros((m_max + 1, powers.shape[1]))
+        product[0] = 1.0
+        for factor in factors:
+            product = np.array([
+                sum(product[d - k] * factor[k] for k in range(d + 1)) for d in range(m_max + 1)
+            ])
+
+        by_order = {}
+        for order in orders:
+            m = (order - 1) // 2
+            full = total ** (m + 1) * total.conj() ** m
+
+            # Вырожденные комбинации: положительные частоты = отрицательные + одна несущая i
+            degenerate = np.zeros_like(full)
+            for i, factor in enumerate(factors):
+                without = self._deflate(product, factor, m)
+                weight = sum(factor[k] / (k + 1) * without[m - k] for k in range(m + 1))
+                degenerate += spectra[i] * weight
+            orderings = math.factorial(m + 1) * math.factorial(m)
+            degenerate *= orderings
+
+            # Делим на число перестановок слагаемых: упорядоченные наборы -> комбинации
+            density = np.fft.irfft(full - degenerate, fft_size)[:self.size] / orderings
+            # Погрешность FFT дает околонулевые отрицательные значения
+            density[density < 1e-9] = 0.0
+            by_order[order] = density
+
+        return SpectrumDensity(self.frequencies, by_order)
+
+    @staticmethod
+    def _deflate(product: np.ndarray, factor: np.ndarray, degree: int) -> List[np.ndarray]:
+        """Коэффициенты произведения без одного множителя (деление рядов, factor[0] = 1)."""
+        result = [product[0]]
+        for d in range(1, degree + 1):
+            result.append(product[d] - sum(factor[k] * result[d - k] for k in range(1, d + 1)))
+        return result
@@ -0,0 +1,338 @@
+import io
+import math
+import os
+import threading
+import time
+import warnings
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+# Сколько байт лога разбираем за раз: память не зависит от размера файла
+CHUNK_BYTES = 16 * 1024 * 1024
+# Уровень (дБм), который считается равным одному передатчику на той же частоте
+DEFAULT_REFERENCE_DBM = -50.0
+# Столбцы CSV по умолчанию, если заголовка нет: timestamp, frequency, rssi
+DEFAULT_COLUMNS = (1, 2)
+
+
+class NoiseFloor:
+    """
+    Измеренный спектр на сетке 1 МГц: средний уровень (по мощности) и пиковый уровень.
+
+    Хранит только суммы по ячейкам, поэтому новые измерения добавляются
+    инкрементально, а память не зависит от числа строк в логах.
+    """
+
+    def __init__(self, f_min: float, f_max: float, reference_dbm: float = DEFAULT_REFERENCE_DBM):
+        self.f0 = math.floor(f_min)
+        self.size = int(math.ceil(f_max) - self.f0) + 1
+        self.frequencies = self.f0 + np.arange(self.size, dtype=np.float64)
+        self.reference_mw = 10 ** (reference_dbm / 10)
+        self.sum_mw = np.zeros(self.size)
+        self.count = np.zeros(self.size, dtype=np.int64)
+        self.peak_dbm = np.full(self.size, -np.inf)
+        # Меняется при каждом добавлении: входит в ключ кэша результатов
+        self.version = 0
+        self._prefix = (None, None, None)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_catalog(cls, frequencies: Iterable[float], bandwidths: Iterable[float],
+                    reference_dbm: float = DEFAULT_REFERENCE_DBM) -> "NoiseFloor":
+        """Сетка, покрывающая все каналы каталога вместе с шириной их полосы."""
+        frequencies = np.asarray(list(frequencies), dtype=np.float64)
+        bandwidths = np.asarray(list(bandwidths), dtype=np.float64)
+        # Нулевая частота в каталоге означает недоступный канал - сетку по ней не растягиваем
+        used = frequencies > 0
+        margin = float(bandwidths[used].max())
+        return cls(frequencies[used].min() - margin, frequencies[used].max() + margin, reference_dbm)
+
+    def add(self, frequencies: np.ndarray, levels_dbm: np.ndarray) -> int:
+        """
+        Добавляет измерения (частота в МГц, уровень в дБм). Точки вне сетки пропускаются.
+
+        Returns:
+            Сколько измерений попало на сетку
+        """
+        cells = np.rint(np.asarray(frequencies, dtype=np.float64)).astype(np.int64) - self.f0
+        levels_dbm = np.asarray(levels_dbm, dtype=np.float64)
+        valid = (cells >= 0) & (cells < self.size) & np.isfinite(levels_dbm)
+        cells, levels_dbm = cells[valid], levels_dbm[valid]
+        if cells.size == 0:
+            return 0
+
+        with self._lock:
+            self.sum_mw += np.bincount(cells, weights=10 ** (levels_dbm / 10), minlength=self.size)
+            self.count += np.bincount(cells, minlength=self.size)
+            np.maximum.at(self.peak_dbm, cells, levels_dbm)
+            self.version += 1
+        return int(cells.size)
+
+    def reset(self):
+        """Забывает все измерения."""
+        with self._lock:
+            self.sum_mw[:] = 0
+            self.count[:] = 0
+            self.peak_dbm[:] = -np.inf
+            self.version += 1
+
+    def floor_dbm(self) -> np.ndarray:
+        """Средний уровень по ячейкам (NaN, где измерений нет)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.count > 0, 10 * np.log10(self.sum_mw / np.maximum(self.count, 1)), np.nan)
+
+    def ratios(self, frequencies, bandwidth: float) -> np.ndarray:
+        """
+        Измеренная помеха в полосе каждого канала в единицах модели анализатора:
+        средняя мощность по ячейкам полосы относительно reference_dbm
+        (1.0 - как передатчик на той же частоте). Ячейки без измерений не учитываются.
+        """
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        power, cells = self._prefix_sums()
+        if cells[-1] == 0:
+            return np.zeros(frequencies.shape)
+        lo = np.clip(np.searchsorted(self.frequencies, frequencies - bandwidth / 2, side="left"), 0, self.size)
+        hi = np.clip(np.searchsorted(self.frequencies, frequencies + bandwidth / 2, side="right"), 0, self.size)
+        covered = cells[hi] - cells[lo]
+        return np.divide(power[hi] - power[lo], covered * self.reference_mw,
+                         out=np.zeros(frequencies.shape), where=covered > 0)
+
+    def _prefix_sums(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Префиксные суммы средней мощности и числа измеренных ячеек: окно любого канала -
+        разность двух элементов. Пересчитываются только после новых измерений.
+        """
+        with self._lock:
+            if self._prefix[0] != self.version:
+                mean_mw = self.sum_mw / np.maximum(self.count, 1)
+                self._prefix = (
+                    self.version,
+                    np.concatenate([[0.0], np.cumsum(mean_mw)]),
+                    np.concatenate([[0], np.cumsum(self.count > 0)])
+                )
+            return self._prefix[1], self._prefix[2]
+
+    def sample(self, frequencies: Iterable[float], bandwidth: float) -> "NoiseSample":
+        """Помеха на заданных частотах (ratios) для передачи в процессы пула."""
+        frequencies = sorted({float(f) for f in frequencies})
+        return NoiseSample(dict(zip(frequencies, self.ratios(frequencies, bandwidth).tolist())), bandwidth,
+                           self.version)
+
+    def to_dict(self) -> Dict:
+        """Ячейки с измерениями (для /api/noise-floor)."""
+        measured = np.flatnonzero(self.count)
+        return {
+            "version": self.version,
+            "frequencies": self.frequencies[measured].tolist(),
+            "floor_dbm": np.round(self.floor_dbm()[measured], 2).tolist(),
+            "peak_dbm": np.round(self.peak_dbm[measured], 2).tolist(),
+            "samples": self.count[measured].tolist()
+        }
+
+
+class NoiseSample:
+    """
+    Измеренная помеха на конкретных частотах, снятая с NoiseFloor.sample.
+    Процессам пула передается она, а не весь спектр (с блокировкой он не сериализуется);
+    ratios() отвечает так же, как NoiseFloor, но только для снятых частот.
+    """
+
+    def __init__(self, ratios: Dict[float, float], bandwidth: float, version: int):
+        self._ratios = ratios
+        self.bandwidth = bandwidth
+        self.version = version
+
+    def ratios(self, frequencies, bandwidth: float) -> np.ndarray:
+        """
+        Raises:
+            KeyError: если частоты или ширины полосы нет в снимке
+        """
+        if bandwidth != self.bandwidth:
+            raise KeyError(f"Снимок фона снят для полосы {self.bandwidth} МГц, а не {bandwidth}")
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        return np.array([self._ratios[f] for f in frequencies.ravel().tolist()]).reshape(frequencies.shape)
+
+
+def _parse_columns(header: bytes) -> Optional[Tuple[int, int]]:
+    """Столбцы частоты и уровня по строке заголовка или None, если это строка данных."""
+    names = [name.strip().lower() for name in header.decode("utf-8", "replace").split(",")]
+    if not any(any(ch.isalpha() for ch in name) for name in names):
+        return None
+    freq_col = next((i for i, name in enumerate(names) if "freq" in name), DEFAULT_COLUMNS[0])
+    level_col = next((i for i, name in enumerate(names)
+                      if any(key in name for key in ("rssi", "dbm", "level", "power"))), DEFAULT_COLUMNS[1])
+    return freq_col, level_col
+
+
+def _parse_rows(data: bytes, columns: Tuple[int, int]) -> np.ndarray:
+    """Строки CSV -> массив (частота, уровень); битые строки пропускаются."""
+    try:
+        values = np.loadtxt(io.BytesIO(data), delimiter=",", usecols=columns, ndmin=2)
+    except ValueError:
+        # Битые строки (обрыв записи, мусор) пропускаем, остальное берем
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            values = np.genfromtxt(io.BytesIO(data), delimiter=",", usecols=columns, invalid_raise=False)
+        values = np.atleast_2d(values)
+        if values.size == 0:
+            return np.empty((0, 2))
+        values = values[np.all(np.isfinite(values), axis=1)]
+    return values
+
+
+def read_csv(stream: BinaryIO, columns: Optional[Tuple[int, int]] = None,
+             final: bool = True) -> Iterator[Tuple[np.ndarray, np.ndarray, int, Tuple[int, int]]]:
+    """
+    Читает CSV свипов (timestamp, frequency, rssi) из потока кусками по CHUNK_BYTES.
+    Весь файл в память не загружается.
+
+    Args:
+        columns: Столбцы частоты и уровня; None - определить по заголовку (или взять 1 и 2)
+        final: Последняя строка без перевода строки - полная (загрузка файла целиком),
+            иначе она остается непрочитанной (лог еще дописывается)
+
+    Yields:
+        (частоты в МГц, уровни в дБм, прочитано байт, столбцы) для каждого куска
+    """
+    tail = b""
+    while True:
+        chunk = stream.read(CHUNK_BYTES)
+        if not chunk and not (final and tail):
+            break
+        data = tail + chunk
+        if chunk:
+            cut = data.rfind(b"\n") + 1
+            data, tail = data[:cut], data[cut:]
+        else:
+            tail = b""
+        consumed = len(data)
+
+        if columns is None and data:
+            header, _, rest = data.partition(b"\n")
+            columns = _parse_columns(header)
+            if columns is None:
+                columns = DEFAULT_COLUMNS
+            else:
+                data = rest
+
+        values = _parse_rows(data, columns) if data.strip() else np.empty((0, 2))
+        yield _to_mhz(values[:, 0]), values[:, 1], consumed, columns
+
+
+def ingest_csv(stream: BinaryIO, noise_floor: NoiseFloor, columns: Optional[Tuple[int, int]] = None,
+               final: bool = True) -> Tuple[int, int, Optional[Tuple[int, int]]]:
+    """
+    Добавляет измерения из CSV свипов в noise_floor (аргументы - как у read_csv).
+
+    Returns:
+        (добавлено измерений, прочитано байт, столбцы)
+    """
+    added = consumed = 0
+    for frequencies, levels_dbm, size, columns in read_csv(stream, columns, final):
+        consumed += size
+        if frequencies.size:
+            added += noise_floor.add(frequencies, levels_dbm)
+    return added, consumed, columns
+
+
+def _to_mhz(frequencies: np.ndarray) -> np.ndarray:
+    """
+    Некоторые сканеры пишут частоту в Гц: единицы определяются по каждой строке
+    (выше 100 ГГц в МГц не бывает), так что в одном логе могут быть и те, и другие.
+    """
+    return np.where(frequencies > 1e5, frequencies / 1e6, frequencies)
+
+
+class ScanIngestor:
+    """
+    Инкрементальное чтение CSV лога сканера, который дописывается во время работы.
+
+    Файл читается от последней прочитанной позиции до последней полной строки -
+    дописанные свипы добавляются при следующем update(), а недописанная строка
+    ждет следующего раза. Если файл стал короче (лог начали заново),
+    измерения сбрасываются.
+    """
+
+    def __init__(self, path: str, noise_floor: NoiseFloor):
+        self.path = path
+        self.noise_floor = noise_floor
+        self.offset = 0
+        self.columns: Optional[Tuple[int, int]] = None
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def update(self) -> int:
+        """
+        Дочитывает новые строки лога.
+
+        Returns:
+            Сколько измерений добавлено
+        """
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return 0
+            if size < self.offset:
+                print(f"🔄 Лог сканера {self.path} начат заново - сбрасываем измерения")
+                self.noise_floor.reset()
+                self.offset, self.columns, self.samples = 0, None, 0
+            if size == self.offset:
+                return 0
+
+            with open(self.path, "rb") as file:
+                file.seek(self.offset)
+                added, consumed, self.columns = ingest_csv(file, self.noise_floor, self.columns, final=False)
+            self.offset += consumed
+            self.samples += added
+            return added
+
+    def append(self, stream: BinaryIO) -> Tuple[int, int]:
+        """
+        Дописывает свипы из потока (CSV с заголовком или timestamp,frequency,rssi) в конец лога:
+        их дочитают все процессы, которые следят за этим логом, а не только текущий.
+
+        Строки переписываются в столбцы лога (частота - в МГц), измерения вне сетки спектра
+        и битые строки пропускаются. Файл открыт на дозапись, и каждая запись - целые строки,
+        поэтому загрузки из разных процессов не перемешиваются внутри строки.
+
+        Returns:
+            (записано измерений, прочитано байт из потока)
+        """
+        self.update()
+        columns = self.columns
+        # Без буфера: каждый write - целые строки одним системным вызовом
+        with open(self.path, "ab+", buffering=0) as log:
+            if log.tell() == 0:
+                log.write(b"timestamp,frequency,rssi\n")
+                columns = DEFAULT_COLUMNS
+            elif columns is None:
+                columns = DEFAULT_COLUMNS
+            # Недописанную строку сканера завершаем, чтобы не склеить с ней первую строку загрузки
+            log.seek(-1, os.SEEK_END)
+            if log.read(1) != b"\n":
+                log.write(b"\n")
+
+            written = consumed = 0
+            for frequencies, levels_dbm, size, _ in read_csv(stream):
+                consumed += size
+                count, rows = self._log_rows(frequencies, levels_dbm, columns)
+                if count:
+                    log.write(rows)
+                    written += count
+        return written, consumed
+
+    def _log_rows(self, frequencies: np.ndarray, levels_dbm: np.ndarray,
+                  columns: Tuple[int, int]) -> Tuple[int, bytes]:
+        """Строки лога для измерений на сетке спектра: частота и уровень - в столбцах лога."""
+        cells = np.rint(frequencies).astype(np.int64) - self.noise_floor.f0
+        keep = (cells >= 0) & (cells < self.noise_floor.size) & np.isfinite(levels_dbm)
+        rows = np.zeros((int(keep.sum()), max(columns) + 1))
+        if 0 not in columns:
+            rows[:, 0] = time.time()
+        rows[:, columns[0]] = frequencies[keep]
+        rows[:, columns[1]] = levels_dbm[keep]
+        buffer = io.BytesIO()
+        np.savetxt(buffer, rows, fmt="%.3f", delimiter=",")
+        return len(rows), buffer.getvalue()
@@ -0,0 +1,156 @@
+import heapq
+from itertools import combinations, count, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from . import imd_engine
+from .interference import InterferenceAnalyzer
+
+# Как часто отправлять клиенту строку прогресса (в том числе чтобы заметить его отключение)
+PROGRESS_EVERY = 500
+
+# Сколько вариантов считается за одну задачу пула расчетов
+CHUNK_SIZE = 500
+
+
+def sort_key(result: Dict) -> Tuple[float, float]:
+    """
+    Ключ сортировки результатов (меньше - лучше): уровень помех,
+    а среди насыщенных 100% - "сырой" уровень без ограничения.
+    """
+    return result["total_interference"], result["raw_interference"]
+
+
+def _scored(analyzer: InterferenceAnalyzer, frequency: float, others: List[float], imd_freqs=None) -> Dict:
+    """
+    calculate_total_interference в коротком виде для потока результатов.
+
+    Кэш результатов не используется: варианты перебора почти не повторяются
+    и только вытеснили бы из кэша наборы, которые запрашивают часто.
+
+    Args:
+        imd_freqs: Уже посчитанные IMD продукты всей группы (для всех каналов одного набора)
+    """
+    if imd_freqs is None:
+        result = analyzer._calculate_total_interference(frequency, others)
+    else:
+        result = analyzer._score_interference(frequency, others, imd_freqs)
+    return {
+        "total_interference": result["total_percent"],
+        "interference_level": result["risk_level"],
+        "raw_interference": round(
+            (result["direct_interference"] + result["imd_interference"]) * result["debug"]["multiplier"], 2
+        )
+    }
+
+
+def channel_sweep(analyzer: InterferenceAnalyzer, candidates: Iterable[Dict],
+                  selected: List[float]) -> Iterator[Dict]:
+    """
+    Оценивает каждый канал-кандидат относительно выбранных частот (по одному).
+    Каналы с нулевой частотой (заглушки каталога) пропускаются.
+    """
+    for record in candidates:
+        if record["frequency"] <= 0:
+            continue
+        yield {
+            "band": record["band"],
+            "channel": record["channel"],
+            "range": record["range"],
+            "modulation": record["modulation"],
+            "frequency": record["frequency"],
+            **_scored(analyzer, float(record["frequency"]), selected)
+        }
+
+
+def subset_sweep(analyzer: InterferenceAnalyzer, pool: List[Dict], size: int,
+                 selected: List[float]) -> Iterator[Dict]:
+    """
+    Перебирает все наборы из size каналов пула (itertools.combinations - без списка наборов)
+    и оценивает каждый вместе с выбранными частотами по худшему каналу.
+    """
+    pool = [record for record in pool if record["frequency"] > 0]
+    for subset in combinations(pool, size):
+        frequencies = [float(record["frequency"]) for record in subset] + list(selected)
+        # IMD продукты у всех каналов набора общие - считаем один раз
+        imd_freqs = imd_engine.imd_products_array(frequencies)
+        worst = None
+        for i, frequency in enumerate(frequencies):
+            scored = _scored(analyzer, frequency, frequencies[:i] + frequencies[i + 1:], imd_freqs)
+            if worst is None or sort_key(scored) > sort_key(worst):
+                worst = scored
+        yield {
+            "channels": [
+                {"band": r["band"], "channel": r["channel"], "frequency": r["frequency"]} for r in subset
+            ],
+            **worst
+        }
+
+
+def pooled(results: Iterable[Dict], run: Callable[[Callable[[], List[Dict]]], List[Dict]],
+           chunk: int = CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Считает поток результатов частями по chunk вариантов через run (пул расчетов сервера):
+    поток запроса только отдает готовые строки, а отключение клиента замечается между частями.
+    """
+    results = iter(results)
+    while True:
+        part = run(lambda: list(islice(results, chunk)))
+        if not part:
+            return
+        yield from part
+
+
+class TopK:
+    """
+    k лучших результатов (по возрастанию key) в куче из k элементов -
+    память не зависит от длины потока.
+    """
+
+    def __init__(self, k: int, key: Callable[[Dict], Tuple] = sort_key):
+        self.k = k
+        self.key = key
+        self._heap = []
+        self._order = count()
+
+    def push(self, result: Dict):
+        # Сверху кучи - худший из лучших: ключ с обратным знаком,
+        # при равенстве ключей вытесняется более поздний результат
+        entry = (tuple(-value for value in self.key(result)), -next(self._order), result)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def results(self) -> List[Dict]:
+        """Лучшие результаты от лучшего к худшему."""
+        return [entry[2] for entry in sorted(self._heap, reverse=True)]
+
+
+def stream(results: Iterable[Dict], top: int = None, limit: int = None) -> Iterator[Dict]:
+    """
+    Поток событий для клиента: результаты по мере расчета (или top лучших в конце),
+    строки прогресса и итоговая строка.
+
+    Если клиент отключился, сервер закрывает генератор и расчет прекращается
+    на ближайшем yield - поэтому в режиме top прогресс отправляется регулярно.
+    """
+    processed = 0
+    results = iter(results)
+    if limit is not None:
+        results = (result for _, result in zip(range(limit), results))
+
+    if top is None:
+        for processed, result in enumerate(results, start=1):
+            yield {"type": "result", **result}
+            if processed % PROGRESS_EVERY == 0:
+                yield {"type": "progress", "processed": processed}
+    else:
+        best = TopK(top)
+        for processed, result in enumerate(results, start=1):
+            best.push(result)
+            if processed % PROGRESS_EVERY == 0:
+                yield {"type": "progress", "processed": processed}
+        for rank, result in enumerate(best.results(), start=1):
+            yield {"type": "result", "rank": rank, **result}
+
+    yield {"type": "done", "processed": processed}
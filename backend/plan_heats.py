@@ -0,0 +1,78 @@
+"""
+🏁 Планировщик заездов из командной строки.
+
+Ростер - JSON со списком пилотов (или {"pilots": [...]}), например:
+    [
+        {"pilot": "Alice", "bands": ["R", "F", "E"], "range": "5G8", "modulation": "analog"},
+        {"pilot": "Bob", "bands": ["HDZ"]},
+        {"pilot": "Carol", "channels": [{"band": "DJI_FCC", "channel": "3", "range": "5G8"}]}
+    ]
+
+Запуск из корня репозитория:
+    python backend/plan_heats.py roster.json --heat-size 6 --budget 30 --seed 1 --output plan.json
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.stdout.reconfigure(encoding='utf-8')
+
+from fpv_logic.data_loader import DataLoader  # noqa: E402
+from fpv_logic.heat_planner import HeatPlanner  # noqa: E402
+from fpv_logic.interference import InterferenceAnalyzer  # noqa: E402
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Распределение пилотов по заездам и каналам")
+    parser.add_argument("roster", help="JSON со списком пилотов")
+    parser.add_argument("--catalog", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "channels.json"),
+                        help="JSON каталога каналов")
+    parser.add_argument("--heat-size", type=int, default=4, help="Максимум пилотов в заезде")
+    parser.add_argument("--budget", type=float, default=30.0, help="Бюджет времени, с")
+    parser.add_argument("--seed", type=int, default=0, help="Сид (одинаковые seed/chains/rounds - одинаковый план)")
+    parser.add_argument("--workers", type=int, help="Число процессов (по умолчанию - все ядра)")
+    parser.add_argument("--chains", type=int, help="Число цепочек поиска (по умолчанию = workers)")
+    parser.add_argument("--rounds", type=int, help="Максимум раундов")
+    parser.add_argument("--output", help="Куда сохранить план (JSON)")
+    args = parser.parse_args(argv)
+
+    with open(args.roster, "r", encoding="utf-8") as file:
+        roster = json.load(file)
+    pilots = roster.get("pilots", []) if isinstance(roster, dict) else roster
+
+    loader = DataLoader(args.catalog)
+    analyzer = InterferenceAnalyzer({})
+    analyzer.attach_catalog_index(loader.get_index())
+    planner = HeatPlanner(analyzer, loader.get_index())
+
+    def report(summary):
+        print(f"⏳ Раунд {summary['round']}: {summary['evaluations']} оценок, "
+              f"лучший худший заезд {summary['best_objective']}, {summary['elapsed_ms'] / 1000:.1f} с",
+              file=sys.stderr)
+
+    try:
+        plan = planner.plan(pilots, heat_size=args.heat_size, seed=args.seed, time_budget=args.budget,
+                            workers=args.workers, chains=args.chains, rounds=args.rounds, progress=report)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    for heat in plan["heats"]:
+        print(f"🏁 Заезд {heat['heat']} (худшие помехи {heat['worst_interference']}%)")
+        for pilot in heat["pilots"]:
+            print(f"   {pilot['pilot']:20s} {pilot['band']:>16s} {pilot['channel']:>3s} "
+                  f"{pilot['frequency']:>6} МГц  {pilot['total_interference']:>6}% {pilot['interference_level']}")
+        if heat["shared_frequencies"]:
+            print(f"   ⚠️ Несколько пилотов на частотах: {heat['shared_frequencies']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(plan, file, indent=2, ensure_ascii=False)
+        print(f"💾 План сохранен: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
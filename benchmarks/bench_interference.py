@@ -0,0 +1,272 @@
+"""
+Бенчмарки движка интерференции (backend/fpv_logic).
+
+Замеряет горячие пути на реальном каталоге static/data/fpv_channels.json
+для групп из 2-32 каналов: ops/sec, p50/p99 и пиковую память (tracemalloc).
+Результаты сохраняются в JSON и сравниваются с сохраненной базой;
+если медиана какого-то замера выросла больше порога - код возврата 1.
+
+Машины и их загрузка разные, поэтому сравниваются не миллисекунды, а доли
+от эталонного замера (reference_workload): он выполняется в том же процессе
+попеременно с каждым вызовом замера, и медленная или занятая машина замедляет оба.
+
+Примеры:
+    python benchmarks/bench_interference.py                       # замер + сравнение с baseline.json
+    python benchmarks/bench_interference.py --save-baseline       # обновить базу
+    python benchmarks/bench_interference.py --only bulk --quick   # часть замеров, быстрее
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+from fpv_logic import imd_engine  # noqa: E402
+from fpv_logic.api_handlers import calculate_bulk_interference  # noqa: E402
+from fpv_logic.catalog import ChannelCatalog  # noqa: E402
+from fpv_logic.catalog_index import CatalogIndex  # noqa: E402
+from fpv_logic.interference import InterferenceAnalyzer  # noqa: E402
+from fpv_logic.power_model import PowerModel  # noqa: E402
+from fpv_logic.spectral_imd import SpectralIMDEngine  # noqa: E402
+
+CATALOG_PATH = os.path.join(ROOT, "static", "data", "fpv_channels.json")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+GROUP_SIZES = (2, 4, 8, 16, 32)
+IMD_ORDERS = (3, 5)
+
+# Группы берем из самого большого диапазона каталога
+GROUP_MODULATION = "Analog"
+GROUP_RANGE = "5.8GHz"
+
+
+def load_catalog(path: str):
+    """Каталог, анализатор с индексом и записи диапазона, из которого собираются группы."""
+    with open(path, "r", encoding="utf-8") as file:
+        catalog = ChannelCatalog.from_data(json.load(file))
+
+    analyzer = InterferenceAnalyzer({})
+    # Меряем сам расчет: повторные вызовы не должны попадать в кэш результатов
+    analyzer.result_cache = None
+    analyzer.attach_catalog_index(CatalogIndex(catalog.records))
+
+    pool = [r for r in catalog.records if r.modulation == GROUP_MODULATION and r.range == GROUP_RANGE]
+    return catalog, analyzer, pool
+
+
+def pick_group(pool: List, size: int) -> List:
+    """size каналов, равномерно разбросанных по диапазону (детерминированно)."""
+    ordered = sorted(pool, key=lambda r: (r.frequency, r.id))
+    positions = np.linspace(0, len(ordered) - 1, size).round().astype(int)
+    return [ordered[i] for i in positions]
+
+
+def build_cases(catalog, analyzer, pool, sizes) -> Dict[str, Callable[[], object]]:
+    """Имя замера -> функция без аргументов."""
+    cases = {}
+    spectral = SpectralIMDEngine.for_catalog(catalog.frequency, catalog.bandwidth)
+    power_model = PowerModel(analyzer)
+    for size in sizes:
+        group = pick_group(pool, size)
+        freqs = [float(r.frequency) for r in group]
+        specs = [{"band": r.band, "channel": r.channel, "range": r.range} for r in group]
+        group_ids = {r.id for r in group}
+        rest = [r.to_dict() for r in catalog.records if r.id not in group_ids]
+        selected = [r.to_dict() for r in group]
+
+        for order in IMD_ORDERS:
+            cases[f"calculate_imd_products/order={order}/n={size}"] = (
+                lambda f=freqs, o=order: analyzer.calculate_imd_products(f, o)
+            )
+            cases[f"imd_products_array/order={order}/n={size}"] = (
+                lambda f=freqs, o=order: imd_engine.imd_products_array(f, o)
+            )
+
+        transmitters = [(float(r.frequency), float(r.bandwidth)) for r in group]
+        cases[f"spectral_imd/order=7/n={size}"] = (
+            lambda t=transmitters: spectral.density(t, 7)
+        )
+
+        power_transmitters = [{"frequency": f} for f in freqs]
+        cases[f"power_model/trials=2000/n={size}"] = (
+            lambda t=power_transmitters: power_model.simulate(t, trials=2000, seed=0)
+        )
+
+        cases[f"calculate_total_interference/n={size}"] = (
+            lambda f=freqs: analyzer.calculate_total_interference(f[0], f[1:])
+        )
+        cases[f"analyze_group_interference/n={size}"] = (
+            lambda s=specs: analyzer.analyze_group_interference(s, GROUP_MODULATION)
+        )
+        cases[f"calculate_bulk_interference/n={size}"] = (
+            lambda s=selected, r=rest: calculate_bulk_interference(s, r)
+        )
+    return cases
+
+
+# Эталонная нагрузка: не зависит от кода проекта, но похожа на него (циклы Python + numpy)
+_REFERENCE_VALUES = np.random.default_rng(0).random(20000)
+
+
+def reference_workload() -> float:
+    """Эталонный замер для нормализации: сортировка массива и цикл по словарю."""
+    ordered = np.sort(_REFERENCE_VALUES)
+    table = {i: i * 0.5 for i in range(2000)}
+    return float(ordered[100]) + sum(table[i] for i in range(0, 2000, 3))
+
+
+def measure(func: Callable[[], object], min_time: float, max_runs: int) -> Dict:
+    """
+    Время выполнения (повторы до min_time секунд) и пиковая память одного вызова.
+    Перед каждым вызовом выполняется эталон - его медиана сохраняется в reference_ms.
+    """
+    func()  # Прогрев
+    reference_workload()
+
+    timings, reference = [], []
+    gc.collect()
+    started = time.perf_counter()
+    while len(timings) < max_runs and (time.perf_counter() - started < min_time or len(timings) < 5):
+        t0 = time.perf_counter()
+        reference_workload()
+        t1 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t1)
+        reference.append(t1 - t0)
+
+    # Память меряем отдельным вызовом: tracemalloc сильно замедляет код
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "runs": len(timings),
+        "ops_per_sec": round(len(timings) / sum(timings), 2),
+        "p50_ms": round(statistics.median(timings) * 1000, 4),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000, 4),
+        "peak_kib": round(peak / 1024, 1),
+        "reference_ms": round(statistics.median(reference) * 1000, 4)
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float, min_delta_ms: float = 0.0) -> List[Dict]:
+    """
+    Замеры, у которых медиана выросла больше чем на threshold (доля) относительно базы.
+    Рост меньше min_delta_ms миллисекунд не считается (шум на микросекундных замерах).
+
+    Если у замера и базы есть эталон (reference_ms), медиана базы пересчитывается
+    на скорость машины во время замера: разница машин и их загрузки не считается регрессией.
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("p50_ms"):
+            continue
+        expected_ms = base["p50_ms"]
+        if current.get("reference_ms") and base.get("reference_ms"):
+            expected_ms *= current["reference_ms"] / base["reference_ms"]
+        change = current["p50_ms"] / expected_ms - 1
+        current["p50_change"] = round(change, 3)
+        if change > threshold and current["p50_ms"] - expected_ms >= min_delta_ms:
+            regressions.append({"name": name, "baseline_ms": round(expected_ms, 4),
+                                "current_ms": current["p50_ms"], "change": round(change, 3)})
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки движка интерференции")
+    parser.add_argument("--catalog", default=CATALOG_PATH, help="JSON каталога каналов")
+    parser.add_argument("--output", help="Куда сохранить результаты (JSON)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="База для сравнения")
+    parser.add_argument("--save-baseline", action="store_true", help="Записать результаты как новую базу")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Допустимый рост медианы (доля, по умолчанию 0.25 = +25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.02,
+                        help="Минимальный абсолютный рост медианы, который считается регрессией, мс")
+    parser.add_argument("--only", help="Запускать только замеры, в имени которых есть эта строка")
+    parser.add_argument("--sizes", help="Размеры групп через запятую (по умолчанию 2,4,8,16,32)")
+    parser.add_argument("--min-time", type=float, default=0.3, help="Минимальное время на замер, с")
+    parser.add_argument("--max-runs", type=int, default=2000, help="Максимум повторов на замер")
+    parser.add_argument("--quick", action="store_true", help="Короткие замеры (min-time 0.05)")
+    args = parser.parse_args(argv)
+
+    sizes = tuple(int(s) for s in args.sizes.split(",")) if args.sizes else GROUP_SIZES
+    min_time = 0.05 if args.quick else args.min_time
+
+    catalog, analyzer, pool = load_catalog(args.catalog)
+    if max(sizes) > len(pool):
+        parser.error(f"В диапазоне {GROUP_RANGE} только {len(pool)} каналов")
+
+    cases = build_cases(catalog, analyzer, pool, sizes)
+    if args.only:
+        cases = {name: func for name, func in cases.items() if args.only in name}
+
+    results = {}
+    for name, func in cases.items():
+        results[name] = measure(func, min_time, args.max_runs)
+        r = results[name]
+        print(f"{name:55s} {r['ops_per_sec']:>12.1f} ops/s  p50 {r['p50_ms']:>9.3f} ms  "
+              f"p99 {r['p99_ms']:>9.3f} ms  peak {r['peak_kib']:>9.1f} KiB  эталон {r['reference_ms']:.3f} ms")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "catalog": os.path.relpath(args.catalog, ROOT),
+            "catalog_channels": len(catalog)
+        },
+        "results": results
+    }
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline.get("results", {}), args.threshold, args.min_delta_ms)
+        if regressions:
+            # Короткий всплеск нагрузки на машине не должен ронять проверку: подозрительные замеры повторяем
+            print(f"🔁 Повторный замер: {len(regressions)}")
+            for item in regressions:
+                results[item["name"]] = measure(cases[item["name"]], min_time, args.max_runs)
+            repeated = {item["name"]: results[item["name"]] for item in regressions}
+            regressions = compare(repeated, baseline.get("results", {}), args.threshold, args.min_delta_ms)
+        report["regressions"] = regressions
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"💾 Результаты сохранены: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"💾 База сохранена: {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"❌ Регрессии (порог +{args.threshold:.0%}):")
+        for item in regressions:
+            print(f"   {item['name']}: {item['baseline_ms']} ms -> {item['current_ms']} ms ({item['change']:+.0%})")
+        return 1
+
+    print("✅ Регрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
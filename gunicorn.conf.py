@@ -0,0 +1,29 @@
+"""
+⚙️ Настройки gunicorn (Procfile: gunicorn -c gunicorn.conf.py backend.app:app).
+
+С preload_app каталог, индексы и попарная таблица загружаются один раз
+в мастер-процессе до fork (прогрев в when_ready): воркеры получают их
+страницы copy-on-write, а попарная таблица открыта через mmap и делится
+через page cache ОС.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+# Потоки воркера (gthread): пока тяжелый расчет идет в пуле, поток принимает
+# одинаковые запросы (они ждут тот же расчет) и быстро отвечает 503 при перегрузке
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+
+def when_ready(server):
+    # С preload прогреваем все компоненты в мастере (иначе каждый воркер строит их при первом запросе);
+    # некорректный каталог останавливает запуск, а не превращается в пустые ответы
+    if preload_app:
+        server.app.wsgi().extensions["fpv"].warm_up()
+
+    # Объекты, созданные при загрузке приложения, переводим в постоянное поколение GC:
+    # сборщик в воркерах не трогает их счетчики и не копирует общие страницы
+    gc.freeze()
+    server.log.info("🧊 Объекты приложения заморожены для GC (%d)", gc.get_freeze_count())
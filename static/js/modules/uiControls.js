@@ -182,7 +182,8 @@ export class UIControls {
                     'Content-Type': 'application/json'
                 },
                 body: JSON.stringify({
-                    currentChannel: { band, channel, frequency }
+                    currentChannel: { band, channel, frequency },
+                    count: this.maxSelectedChannels
                 })
             });
 
@@ -190,10 +191,10 @@ export class UIControls {
                 throw new Error('Network response was not ok');
             }
 
-            const optimalChannels = await response.json();
+            const result = await response.json();
             
-            // Подсвечиваем рекомендуемые каналы
-            optimalChannels.forEach(channel => {
+            // Подсвечиваем рекомендуемые каналы (закрепленные уже выбраны)
+            result.recommended.forEach(channel => {
                 const element = document.querySelector(`[data-channel="${channel.band}${channel.channel}"]`);
                 if (element) {
                     element.classList.add('recommended');
@@ -0,0 +1,60 @@
+import os
+import sys
+
+import pytest
+
+# Приложение импортирует и backend.config, и fpv_logic напрямую (как при запуске из backend/)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "backend")]
+
+from backend.app import create_app  # noqa: E402
+from backend.config import Config  # noqa: E402
+from fpv_logic.result_cache import RESULT_CACHE  # noqa: E402
+
+
+class TestingConfig(Config):
+    TESTING = True
+    EAGER_STARTUP = False
+    SCAN_PATH = None
+    # Короткий потолок бюджета планировщика: тест ограничения не ждет 5 с
+    PLANNER_MAX_BUDGET = 1.0
+
+
+@pytest.fixture(scope="session")
+def app():
+    """Приложение на каталоге из backend/data (компоненты строятся один раз на все тесты)."""
+    return create_app(TestingConfig)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope="session")
+def services(app):
+    return app.extensions["fpv"]
+
+
+@pytest.fixture(scope="session")
+def analyzer(services):
+    return services.analyzer
+
+
+@pytest.fixture
+def scan_app(tmp_path):
+    """Отдельное приложение с логом сканера (tmp_path/scan.csv), который дочитывается перед каждым запросом."""
+    path = tmp_path / "scan.csv"
+    path.write_text("timestamp,frequency,rssi\n")
+
+    class ScanConfig(TestingConfig):
+        SCAN_PATH = str(path)
+        SCAN_REFRESH = 0
+        NOISE_UPLOAD_ENABLED = True
+
+    # Кэш результатов общий на процесс, а версии спектра у разных приложений совпадают
+    RESULT_CACHE.invalidate()
+    app = create_app(ScanConfig)
+    app.scan_path = path
+    yield app
+    RESULT_CACHE.invalidate()
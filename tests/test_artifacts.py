@@ -0,0 +1,91 @@
+import numpy as np
+
+from fpv_logic import artifacts
+
+VALUES = np.arange(24, dtype=np.float32).reshape(2, 3, 4)
+
+
+def builder(calls, values=VALUES):
+    def build():
+        calls.append(1)
+        return values.copy()
+    return build
+
+
+def test_artifact_path_depends_on_fingerprint(tmp_path):
+    json_path = str(tmp_path / "channels.json")
+    path = artifacts.artifact_path(json_path, "pairwise", {"decay": 1.2, "width": 20})
+
+    assert path.startswith(str(tmp_path / "channels.pairwise.")) and path.endswith(".npy")
+    # Порядок ключей не важен, значения - важны
+    assert artifacts.artifact_path(json_path, "pairwise", {"width": 20, "decay": 1.2}) == path
+    assert artifacts.artifact_path(json_path, "pairwise", {"decay": 1.5, "width": 20}) != path
+    assert artifacts.artifact_path(json_path, "catalog", {}, extension="pickle").endswith(".pickle")
+
+
+def test_load_or_build_maps_saved_array(tmp_path):
+    path = artifacts.artifact_path(str(tmp_path / "channels.json"), "test", {"n": 1})
+    calls = []
+
+    built = artifacts.load_or_build(path, VALUES.shape, builder(calls))
+    assert calls == [1]
+    # Построенная копия заменяется отображением файла
+    assert isinstance(built, np.memmap)
+    np.testing.assert_array_equal(built, VALUES)
+
+    loaded = artifacts.load_or_build(path, VALUES.shape, builder(calls))
+    assert calls == [1]
+    assert isinstance(loaded, np.memmap) and not loaded.flags.writeable
+    np.testing.assert_array_equal(loaded, VALUES)
+    assert not [name for name in tmp_path.iterdir() if name.suffix == ".tmp"]
+
+
+def test_wrong_shape_or_broken_file_is_rebuilt(tmp_path):
+    path = str(tmp_path / "channels.test.abc.npy")
+    artifacts.save_array(path, VALUES)
+    assert artifacts.load_array(path, (2, 3, 5)) is None
+
+    calls = []
+    rebuilt = artifacts.load_or_build(path, (2, 3, 5), builder(calls, np.zeros((2, 3, 5))))
+    assert calls == [1]
+    assert rebuilt.shape == (2, 3, 5)
+
+    (tmp_path / "channels.test.abc.npy").write_bytes(b"not numpy")
+    assert artifacts.load_array(path, VALUES.shape) is None
+    assert artifacts.load_array(str(tmp_path / "missing.npy"), VALUES.shape) is None
+
+
+def test_unwritable_folder_keeps_array_in_memory(tmp_path):
+    path = str(tmp_path / "missing" / "channels.test.abc.npy")
+    calls = []
+
+    values = artifacts.load_or_build(path, VALUES.shape, builder(calls))
+    assert calls == [1]
+    assert not isinstance(values, np.memmap)
+    np.testing.assert_array_equal(values, VALUES)
+
+
+def test_object_round_trip(tmp_path):
+    path = str(tmp_path / "channels.catalog.abc.pickle")
+    value = ({"R": [5658.0, 5695.0]}, VALUES)
+
+    assert artifacts.save_object(path, value)
+    restored = artifacts.load_object(path)
+    assert restored[0] == value[0]
+    np.testing.assert_array_equal(restored[1], VALUES)
+
+    (tmp_path / "channels.catalog.abc.pickle").write_bytes(b"\x80\x05broken")
+    assert artifacts.load_object(path) is None
+    assert artifacts.load_object(str(tmp_path / "missing.pickle")) is None
+
+
+def test_remove_stale_keeps_other_kinds(tmp_path):
+    for name in ("channels.pairwise.aaa.npy", "channels.pairwise.bbb.npy", "channels.pairwise.ccc.pickle",
+                 "channels.catalog.aaa.pickle", "other.pairwise.aaa.npy", "channels.json"):
+        (tmp_path / name).write_bytes(b"")
+
+    assert artifacts.remove_stale(str(tmp_path / "channels.pairwise.bbb.npy")) == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "channels.catalog.aaa.pickle", "channels.json", "channels.pairwise.bbb.npy", "channels.pairwise.ccc.pickle",
+        "other.pairwise.aaa.npy"
+    ]
@@ -0,0 +1,101 @@
+import pytest
+
+from fpv_logic.api_handlers import BATCH_CHUNK_GROUPS, analyze_group_batch
+from fpv_logic.heat_planner import process_pool
+
+from test_noise_floor import write_sweeps
+
+RACE_1 = [{"band": "R", "channel": "1", "range": "5G8"}, {"band": "R", "channel": "8", "range": "5G8"}]
+RACE_2 = [{"band": "LR", "channel": "4", "range": "1G3"}, {"band": "TBS", "channel": "2", "range": "2G4"},
+          {"band": "R", "channel": "4", "range": "5G8"}]
+
+
+# Больше одной части пакета: считаются в пуле процессов
+MANY_GROUPS = [
+    [{"band": "R", "channel": str(r), "range": "5G8"}, {"band": "F", "channel": str(f), "range": "5G8"},
+     {"band": "LR", "channel": "4", "range": "1G3"}]
+    for r in range(1, 9) for f in range(1, 9)
+]
+
+
+def without_index(summary):
+    return {key: value for key, value in summary.items() if key != "index"}
+
+
+def test_batch_matches_single_group_analysis(analyzer):
+    result = analyze_group_batch(analyzer, [RACE_1, RACE_2])
+    assert result["unique_groups"] == 2
+    assert result["errors"] == 0
+
+    for index, (group, summary) in enumerate(zip([RACE_1, RACE_2], result["groups"])):
+        full = analyzer.analyze_group_interference(group)
+        assert summary["index"] == index
+        assert summary["frequencies"] == [ch["frequency"] for ch in full["channels"]]
+        assert summary["total_interference"] == pytest.approx(
+            [ch["total_interference"] for ch in full["channels"]], abs=0.0100001
+        )
+
+
+def test_duplicate_groups_are_computed_once(analyzer):
+    # Порядок ключей в описании канала не делает группу другой
+    reordered = [{"range": ch["range"], "channel": ch["channel"], "band": ch["band"]} for ch in RACE_1]
+    result = analyze_group_batch(analyzer, [RACE_1, RACE_2, reordered, RACE_2])
+
+    assert result["unique_groups"] == 2
+    groups = result["groups"]
+    assert [group["index"] for group in groups] == [0, 1, 2, 3]
+    assert without_index(groups[0]) == without_index(groups[2])
+    assert without_index(groups[1]) == without_index(groups[3])
+
+
+def test_bad_groups_get_their_own_errors(analyzer):
+    unknown = [{"band": "R", "channel": "1", "range": "5G8"}, {"band": "Z", "channel": "9", "range": "5G8"}]
+    result = analyze_group_batch(analyzer, [RACE_1, unknown, [], "R1", RACE_2])
+
+    assert result["errors"] == 3
+    assert [("error" in group) for group in result["groups"]] == [False, True, True, True, False]
+    assert result["groups"][4]["total_interference"]
+
+
+def test_batch_route_limits(app, client, monkeypatch):
+    assert client.post("/api/interference/analyze/batch", json={}).status_code == 400
+    assert client.post("/api/interference/analyze/batch", json={"groups": []}).status_code == 400
+
+    monkeypatch.setitem(app.config, "BATCH_MAX_GROUPS", 2)
+    response = client.post("/api/interference/analyze/batch", json={"groups": [RACE_1] * 3})
+    assert response.status_code == 400
+
+    response = client.post("/api/interference/analyze/batch", json={"groups": [RACE_1, RACE_1]})
+    assert response.status_code == 200
+    assert response.get_json()["unique_groups"] == 1
+
+
+def test_pool_matches_serial(analyzer):
+    assert len(MANY_GROUPS) > BATCH_CHUNK_GROUPS
+    assert analyzer.pairwise_table is not None and analyzer.pairwise_table.path is not None
+    groups = MANY_GROUPS + [[{"band": "Z", "channel": "9", "range": "5G8"}]] + MANY_GROUPS[:3]
+
+    serial = analyze_group_batch(analyzer, groups)
+    with process_pool(2) as pool:
+        assert analyze_group_batch(analyzer, groups, executor=pool) == serial
+    assert serial["unique_groups"] == len(MANY_GROUPS) + 1
+    assert serial["errors"] == 1
+
+
+def test_pool_uses_measured_noise(scan_app):
+    services = scan_app.extensions["fpv"]
+    ingestor = services.scan_ingestor
+    write_sweeps(scan_app)
+    ingestor.update()
+    analyzer = services.analyzer
+
+    serial = analyze_group_batch(analyzer, MANY_GROUPS)
+    with process_pool(2) as pool:
+        assert analyze_group_batch(analyzer, MANY_GROUPS, executor=pool) == serial
+
+    analyzer.attach_noise_floor(None)
+    try:
+        quiet = analyze_group_batch(analyzer, MANY_GROUPS)
+    finally:
+        analyzer.attach_noise_floor(services.noise_floor)
+    assert serial != quiet
@@ -0,0 +1,59 @@
+import json
+
+import numpy as np
+import pytest
+
+from fpv_logic.catalog import DEFAULT_BANDWIDTH, CatalogError, ChannelCatalog
+from fpv_logic.data_loader import DEFAULT_JSON_PATH
+
+# Вложенная группа, пустой канал и ширина под разными именами - как в настоящем JSON
+DATA = {
+    "analog": {
+        "5G8": {
+            "R": {"bandName": "Race", "region": "FCC/CE", "channelWidth": "30",
+                  "channels": {"1": 5658, "2": 5695, "3": ""}},
+            "DJI": {"bandwidth": "",
+                    "channels": {"1": 5735},
+                    "Fast": {"channels": {"1": 5745}}}
+        }
+    },
+    "digital": {"5G8": {"W": {"bandwidth": 40, "channels": {"1": 5760.5}}}}
+}
+
+
+def test_round_trip_restores_json():
+    catalog = ChannelCatalog.from_data(DATA)
+    assert catalog.to_dict() == DATA
+
+    with open(DEFAULT_JSON_PATH, encoding="utf-8") as file:
+        data = json.load(file)
+    assert ChannelCatalog.from_data(data).to_dict() == data
+
+
+def test_records_and_columns():
+    catalog = ChannelCatalog.from_data(DATA)
+    # Пустой канал в расчетах не участвует
+    assert len(catalog) == 5
+    assert [record.id for record in catalog.records] == list(range(5))
+    np.testing.assert_array_equal(catalog.frequency, [5658, 5695, 5735, 5745, 5760.5])
+    np.testing.assert_array_equal(catalog.bandwidth, [30, 30, DEFAULT_BANDWIDTH, DEFAULT_BANDWIDTH, 40])
+    assert catalog.regions[catalog.region_id[0]] == "FCC/CE"
+
+    record = catalog.records[3]
+    assert (record["band"], record["channel"], record.get("modulation")) == ("Fast", "1", "analog")
+    assert record.to_dict()["frequency"] == 5745
+    assert record.get("missing", "default") == "default"
+    with pytest.raises(KeyError):
+        record["missing"]
+    assert not hasattr(record, "__dict__")
+
+
+@pytest.mark.parametrize("data", [
+    {"analog": {}},
+    {"analog": {"5G8": {"R": {"channels": {"1": -5658}}}}},
+    {"analog": {"5G8": {"R": {"channels": {"1": 0}}}}},
+    {"analog": {"5G8": {"R": {"bandwidth": -1, "channels": {"1": 5658}}}}}
+])
+def test_validate_rejects_bad_catalogs(data):
+    with pytest.raises(CatalogError):
+        ChannelCatalog.from_data(data).validate()
@@ -0,0 +1,56 @@
+from fpv_logic.catalog_index import FrequencyIndex
+
+FREQUENCIES = [5800.0, 5658.0, 5740.0, 5658.0, 5917.0, 5705.0]
+
+
+def test_window_queries_match_linear_scan():
+    index = FrequencyIndex(FREQUENCIES)
+    assert index.frequencies == sorted(FREQUENCIES)
+    for frequency in (5600.0, 5658.0, 5700.0, 5740.0, 5990.0):
+        for within in (0.0, 5.0, 42.0, 500.0):
+            expected = sorted(i for i, f in enumerate(FREQUENCIES) if abs(f - frequency) <= within)
+            assert sorted(index.ids_within(frequency, within)) == expected
+            assert index.count_within(frequency, within) == len(expected)
+
+
+def test_nearest_distance():
+    index = FrequencyIndex(FREQUENCIES)
+    assert index.nearest_distance(5700.0) == 5.0
+    assert index.nearest_distance(5740.0) == 0.0
+    assert index.nearest_distance(5740.0, exclude_self=True) == 35.0
+    # Повтор частоты: исключается только одно вхождение
+    assert index.nearest_distance(5658.0, exclude_self=True) == 0.0
+    assert FrequencyIndex([5800.0]).nearest_distance(5800.0, exclude_self=True) == float("inf")
+
+
+def test_catalog_lookups_match_linear_scan(services):
+    index = services.catalog_index
+    channels = index.channels
+
+    for record in channels[::7]:
+        key = (record["modulation"], record["range"], record["band"], record["channel"])
+        first = next(ch for ch in channels if (ch["modulation"], ch["range"], ch["band"], ch["channel"]) == key)
+        assert index.get_frequency(*key) == first["frequency"]
+        assert index.find(record["band"], record["channel"], record["range"], record["modulation"]) is first
+
+        on_frequency = [ch for ch in channels if float(ch["frequency"]) == float(record["frequency"])]
+        assert index.first_on_frequency(record["frequency"]) is on_frequency[0]
+        assert len(index.lookup_frequency(record["frequency"])) == len(on_frequency)
+
+        neighbours = {ch["id"] for ch in index.neighbours(record["frequency"], 40.0)}
+        assert neighbours == {ch["id"] for ch in channels if abs(ch["frequency"] - record["frequency"]) <= 40.0}
+
+    assert index.get_frequency("analog", "5G8", "R", "99") is None
+    assert index.lookup_frequency(1.5) == []
+
+
+def test_reverse_lookup_route(client):
+    result = client.get("/api/frequency?frequency=5658&within=20").get_json()
+    assert {"band": "R", "channel": "1", "range": "5G8", "modulation": "analog"} in result["channels"]
+    assert all(abs(ch["frequency"] - 5658) <= 20 for ch in result["neighbours"])
+    assert client.get("/api/frequency?frequency=abc").status_code == 400
+
+
+def test_forward_lookup_route(client):
+    assert client.get("/api/frequency?band=R&channel=1&range=5G8").get_json() == {"frequency": 5658, "unit": "MHz"}
+    assert client.get("/api/frequency?band=R&channel=99&range=5G8").status_code == 404
@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from fpv_logic.interference import InterferenceAnalyzer
+
+GROUPS = [
+    [{"band": "R", "channel": "1", "range": "5G8"}],
+    [{"band": "R", "channel": "1", "range": "5G8"}, {"band": "R", "channel": "2", "range": "5G8"},
+     {"band": "F", "channel": "4", "range": "5G8"}, {"band": "R", "channel": "8", "range": "5G8"}],
+    # Смешанная группа: разные диапазоны и критичная пара рядом
+    [{"band": "LR", "channel": "4", "range": "1G3"}, {"band": "TBS", "channel": "2", "range": "2G4"},
+     {"band": "R", "channel": "4", "range": "5G8"}, {"band": "F", "channel": "2", "range": "5G8"},
+     {"band": "E", "channel": "1", "range": "5G8"}],
+]
+
+
+def without_table(analyzer):
+    """Тот же анализатор без попарной таблицы: пары считаются напрямую."""
+    bare = InterferenceAnalyzer({})
+    bare.catalog_index = analyzer.catalog_index
+    bare.result_cache = None
+    return bare
+
+
+def assert_compact_matches_full(analyzer, group):
+    full = analyzer.analyze_group_interference(group)
+    compact = analyzer.analyze_group_compact(group, include_debug=True, include_imd=True)
+    risk_levels = compact["risk_levels"]
+    channels = compact["channels"]
+    n = len(group)
+
+    assert compact["format"] == "compact"
+    for key in ("band", "channel", "range", "frequency", "total_interference"):
+        assert channels[key] == [ch[key] for ch in full["channels"]]
+    assert [risk_levels[level] for level in channels["interference_level"]] == \
+        [ch["interference_level"] for ch in full["channels"]]
+
+    # Пары - верхний треугольник полной матрицы построчно
+    cells = [(i, j, full["interference_matrix"][i][j]) for i in range(n) for j in range(i + 1, n)]
+    assert compact["pairs"]["separation"] == [cell["separation"] for _, _, cell in cells]
+    assert compact["pairs"]["interference"] == [cell["interference"] for _, _, cell in cells]
+    assert [risk_levels[level] for level in compact["pairs"]["risk_level"]] == \
+        [cell["risk_level"] for _, _, cell in cells]
+
+    # В полном ответе каждая критичная пара есть в обоих направлениях
+    critical = {(cells[k][0], cells[k][1]) for k in compact["critical_pairs"]}
+    index = {ch["frequency"]: i for i, ch in enumerate(full["channels"])}
+    assert critical == {
+        tuple(sorted((index[pair["channel1"]["frequency"]], index[pair["channel2"]["frequency"]])))
+        for pair in full["critical_pairs"]
+    }
+
+    expected = {key: value for key, value in full["analysis"].items() if key != "debug"}
+    assert compact["analysis"] == expected
+    assert compact["imd_products"] == full["analysis"]["debug"]["imd_products"]
+    assert len(compact["debug"]["direct_interference"]) == n
+
+
+@pytest.mark.parametrize("group", GROUPS)
+def test_compact_matches_full(analyzer, group):
+    assert_compact_matches_full(analyzer, group)
+
+
+@pytest.mark.parametrize("group", GROUPS)
+def test_compact_matches_full_without_table(analyzer, group):
+    assert_compact_matches_full(without_table(analyzer), group)
+
+
+def test_debug_and_imd_are_opt_in(analyzer):
+    compact = analyzer.analyze_group_compact(GROUPS[1])
+    assert "debug" not in compact and "imd_products" not in compact
+
+
+def test_route_formats(client):
+    group = GROUPS[2]
+    full = client.post("/api/interference/analyze", json={"channels": group})
+    compact = client.post("/api/interference/analyze?format=compact", json={"channels": group})
+    assert full.status_code == compact.status_code == 200
+
+    assert compact.get_json()["format"] == "compact"
+    assert compact.get_json() == client.post("/api/interference/analyze",
+                                             json={"channels": group, "format": "compact"}).get_json()
+    assert len(compact.get_data()) * 10 < len(full.get_data())
+    assert "Accept" in compact.headers["Vary"]
+
+    unknown = client.post("/api/interference/analyze",
+                          json={"channels": [{"band": "Z", "channel": "9"}], "format": "compact"})
+    assert unknown.status_code == 404
+
+
+def test_msgpack_on_request(client):
+    msgpack = pytest.importorskip("msgpack")
+    response = client.post("/api/interference/analyze", json={"channels": GROUPS[1], "format": "compact"},
+                           headers={"Accept": "application/msgpack"})
+    assert response.mimetype == "application/msgpack"
+    body = msgpack.unpackb(response.get_data())
+    expected = client.post("/api/interference/analyze", json={"channels": GROUPS[1], "format": "compact"}).get_json()
+    assert body["channels"]["band"] == expected["channels"]["band"]
+    # Числа передаются в float32
+    assert body["pairs"]["interference"] == pytest.approx(expected["pairs"]["interference"], rel=1e-6)
+
+
+def test_json_when_msgpack_is_missing(client, monkeypatch):
+    import backend.app
+
+    monkeypatch.setattr(backend.app, "msgpack", None)
+    response = client.post("/api/interference/analyze", json={"channels": GROUPS[1], "format": "compact"},
+                           headers={"Accept": "application/msgpack"})
+    assert response.mimetype == "application/json"
+    assert json.loads(response.get_data())["format"] == "compact"
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+from backend.app import create_app
+from fpv_logic.compute_pool import ComputePool, Saturated
+
+from conftest import TestingConfig
+
+GROUP = [{"band": "R", "channel": "1", "range": "5G8"}, {"band": "R", "channel": "8", "range": "5G8"}]
+
+
+class Blocker:
+    """Расчет, который ждет release(): держит поток пула занятым."""
+
+    def __init__(self, value="done"):
+        self.value = value
+        self.started = threading.Event()
+        self._release = threading.Event()
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self._release.wait(5)
+        return self.value
+
+    def release(self):
+        self._release.set()
+
+
+def run_in_thread(pool, key, compute, results):
+    def target():
+        try:
+            results.append(pool.run(key, compute))
+        except Exception as e:
+            results.append(e)
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+def test_identical_requests_share_one_computation():
+    pool = ComputePool(workers=2, max_queue=0, timeout=5)
+    blocker, results = Blocker(), []
+    first = run_in_thread(pool, "key", blocker, results)
+    assert blocker.started.wait(5)
+    # Второй запрос с тем же ключом присоединяется к идущему расчету, не занимая поток
+    second = run_in_thread(pool, "key", Blocker("other"), results)
+    while pool.stats()["coalesced"] == 0:
+        time.sleep(0.01)
+
+    blocker.release()
+    first.join(5)
+    second.join(5)
+    assert results == ["done", "done"]
+    assert blocker.calls == 1
+    stats = pool.stats()
+    assert (stats["computed"], stats["coalesced"], stats["pending"]) == (1, 1, 0)
+
+    # Завершенный расчет не кэшируется: следующий запрос считает заново
+    assert pool.run("key", lambda: "again") == "again"
+
+
+def test_full_pool_rejects_new_keys():
+    pool = ComputePool(workers=1, max_queue=1, timeout=5, retry_after=7)
+    blockers, results = [Blocker(), Blocker()], []
+    threads = [run_in_thread(pool, key, blocker, results) for key, blocker in zip("ab", blockers)]
+    assert blockers[0].started.wait(5)
+    while pool.stats()["pending"] < 2:
+        time.sleep(0.01)
+
+    with pytest.raises(Saturated) as error:
+        pool.run("c", lambda: "never")
+    assert error.value.retry_after == 7
+    assert pool.stats()["rejected"] == 1
+
+    for blocker in blockers:
+        blocker.release()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["done", "done"]
+    assert pool.run("c", lambda: "now") == "now"
+
+
+def test_timeout_raises_saturated():
+    pool = ComputePool(workers=1, max_queue=0, timeout=0.05)
+    blocker = Blocker()
+    with pytest.raises(Saturated):
+        pool.run("slow", blocker)
+    assert pool.stats()["timed_out"] == 1
+    blocker.release()
+
+
+def test_errors_reach_the_caller():
+    pool = ComputePool(workers=1, max_queue=0, timeout=5)
+
+    def fail():
+        raise ValueError("плохая группа")
+
+    with pytest.raises(ValueError, match="плохая группа"):
+        pool.run("bad", fail)
+    # Ключ освобожден - повтор считается заново
+    assert pool.run("bad", lambda: "fixed") == "fixed"
+    assert 'fpv_compute_requests_total{outcome="computed"} 2' in pool.render_metrics()
+
+
+def test_saturated_route_returns_503_with_retry_after():
+    class BusyConfig(TestingConfig):
+        COMPUTE_WORKERS = 1
+        COMPUTE_QUEUE = 0
+        COMPUTE_RETRY_AFTER = 3
+
+    app = create_app(BusyConfig)
+    client, pool = app.test_client(), app.extensions["fpv"].compute_pool
+    blocker, results = Blocker(), []
+    thread = run_in_thread(pool, "busy", blocker, results)
+    assert blocker.started.wait(5)
+
+    response = client.post("/api/interference/analyze", json={"channels": GROUP})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert "error" in response.get_json()
+
+    blocker.release()
+    thread.join(5)
+    assert client.post("/api/interference/analyze", json={"channels": GROUP}).status_code == 200
+    assert 'fpv_compute_requests_total{outcome="rejected"} 1' in client.get("/metrics").get_data(as_text=True)
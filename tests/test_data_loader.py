@@ -0,0 +1,113 @@
+import os
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app import create_app
+from fpv_logic.catalog import CatalogError
+from fpv_logic.data_loader import DEFAULT_JSON_PATH, DataLoader
+
+from conftest import TestingConfig
+from test_data_payload import edit_catalog
+
+
+@pytest.fixture
+def fresh_loader(monkeypatch):
+    """Каталог DataLoader общий на процесс - тест загружает свой, а после него возвращается прежний."""
+    def reset():
+        monkeypatch.setattr(DataLoader, "_cached_catalog", None)
+        monkeypatch.setattr(DataLoader, "_cached_index", None)
+        monkeypatch.setattr(DataLoader, "_cached_stamp", None)
+    reset()
+    return reset
+
+
+@pytest.fixture
+def catalog_copy(tmp_path):
+    path = tmp_path / "channels.json"
+    shutil.copy(DEFAULT_JSON_PATH, path)
+    return path
+
+
+def snapshots(folder):
+    return sorted(path.name for path in folder.iterdir() if path.suffix == ".pickle")
+
+
+def app_for(path, eager=False):
+    class CatalogConfig(TestingConfig):
+        CATALOG_PATH = str(path)
+        EAGER_STARTUP = eager
+
+    return create_app(CatalogConfig)
+
+
+def test_default_catalog_is_resolved_from_package():
+    assert os.path.isabs(DEFAULT_JSON_PATH)
+    assert os.path.exists(DEFAULT_JSON_PATH)
+
+
+def test_snapshot_round_trip(fresh_loader, catalog_copy):
+    first = DataLoader(str(catalog_copy))
+    assert first.loaded_from == "json"
+    assert snapshots(catalog_copy.parent) == [os.path.basename(first.snapshot_path())]
+    data, index = first.get_data(), first.get_index()
+
+    fresh_loader()
+    second = DataLoader(str(catalog_copy))
+    assert second.loaded_from == "snapshot"
+    assert second.get_data() == data
+    assert [[record[key] for key in record.KEYS] for record in second.get_index().channels] == \
+        [[record[key] for key in record.KEYS] for record in index.channels]
+    assert second.get_index().get_frequency("analog", "5G8", "R", "1") == index.get_frequency("analog", "5G8", "R", "1")
+    assert not second.is_stale()
+
+
+def test_edited_catalog_replaces_snapshot(fresh_loader, catalog_copy):
+    loader = DataLoader(str(catalog_copy))
+    old_snapshot = os.path.basename(loader.snapshot_path())
+
+    edit_catalog(SimpleNamespace(catalog_path=catalog_copy),
+                 lambda data: data["analog"]["5G8"]["R"]["channels"].update({"1": 5659}))
+    assert loader.is_stale()
+
+    loader.reload()
+    assert loader.loaded_from == "json"
+    assert not loader.is_stale()
+    assert loader.get_index().get_frequency("analog", "5G8", "R", "1") == 5659
+    # Снимок прежней версии JSON удален
+    assert snapshots(catalog_copy.parent) == [os.path.basename(loader.snapshot_path())]
+    assert snapshots(catalog_copy.parent) != [old_snapshot]
+
+
+def test_broken_snapshot_falls_back_to_json(fresh_loader, catalog_copy):
+    loader = DataLoader(str(catalog_copy))
+    with open(loader.snapshot_path(), "wb") as file:
+        file.write(b"broken")
+
+    fresh_loader()
+    assert DataLoader(str(catalog_copy)).loaded_from == "json"
+
+
+def test_snapshot_can_be_disabled(fresh_loader, catalog_copy):
+    assert DataLoader(str(catalog_copy), use_snapshot=False).loaded_from == "json"
+    assert snapshots(catalog_copy.parent) == []
+
+
+@pytest.mark.parametrize("content", [None, "{not json", "[]", "{}"])
+def test_bad_catalog_fails_eager_startup(fresh_loader, tmp_path, content):
+    path = tmp_path / "channels.json"
+    if content is not None:
+        path.write_text(content, encoding="utf-8")
+
+    with pytest.raises(CatalogError):
+        app_for(path, eager=True)
+    assert DataLoader._cached_catalog is None
+
+
+def test_bad_catalog_fails_first_request_when_lazy(fresh_loader, tmp_path):
+    # Ленивое приложение создается, но первый запрос к каталогу - ошибка, а не пустой ответ
+    app = app_for(tmp_path / "missing.json")
+    assert app.test_client().get("/metrics").status_code == 200
+    with pytest.raises(CatalogError):
+        app.test_client().get("/api/data")
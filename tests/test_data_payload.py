@@ -0,0 +1,111 @@
+import gzip
+import json
+import os
+import shutil
+
+import pytest
+
+from backend.app import create_app
+from fpv_logic.data_loader import DataLoader
+
+from conftest import ROOT, TestingConfig
+
+
+@pytest.fixture
+def catalog_app(tmp_path, monkeypatch):
+    """
+    Приложение на копии каталога: файл можно менять, не трогая backend/data.
+    Каталог DataLoader общий на процесс - после теста возвращаем каталог остальных тестов.
+    """
+    path = tmp_path / "channels.json"
+    shutil.copy(os.path.join(ROOT, "backend", "data", "channels.json"), path)
+    monkeypatch.setattr(DataLoader, "_cached_catalog", None)
+    monkeypatch.setattr(DataLoader, "_cached_index", None)
+    monkeypatch.setattr(DataLoader, "_cached_stamp", None)
+
+    class CatalogConfig(TestingConfig):
+        CATALOG_PATH = str(path)
+
+    app = create_app(CatalogConfig)
+    app.catalog_path = path
+    return app
+
+
+def edit_catalog(app, edit):
+    data = json.loads(app.catalog_path.read_text(encoding="utf-8"))
+    edit(data)
+    app.catalog_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    # Время изменения сдвигаем явно: правки в пределах одного тика файловой системы неотличимы
+    stat = os.stat(app.catalog_path)
+    os.utime(app.catalog_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_etag_and_not_modified(client):
+    first = client.get("/api/data")
+    assert first.status_code == 200
+    assert first.headers["ETag"].startswith('W/"')
+    assert "must-revalidate" in first.headers["Cache-Control"]
+    assert first.headers["Vary"] == "Accept-Encoding"
+
+    again = client.get("/api/data", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == first.headers["ETag"]
+
+    other = client.get("/api/data", headers={"If-None-Match": 'W/"0000"'})
+    assert other.status_code == 200
+
+
+def test_compressed_variant_has_same_body(client):
+    plain = client.get("/api/data", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+
+    packed = client.get("/api/data", headers={"Accept-Encoding": "gzip"})
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert packed.headers["ETag"] == plain.headers["ETag"]
+    assert gzip.decompress(packed.data) == plain.data
+    assert json.loads(plain.data)["analog"]["5G8"]["R"]["channels"]["1"] == 5658
+
+
+def test_changed_catalog_rebuilds_payload_and_components(catalog_app):
+    client, services = catalog_app.test_client(), catalog_app.extensions["fpv"]
+    old_etag = client.get("/api/data").headers["ETag"]
+    old_analyzer = services.analyzer
+    assert old_analyzer.get_frequency("analog", "5G8", "R", "1") == 5658
+
+    edit_catalog(catalog_app, lambda data: data["analog"]["5G8"]["R"]["channels"].update({"1": 5660}))
+
+    response = client.get("/api/data", headers={"If-None-Match": old_etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != old_etag
+    assert json.loads(response.data)["analog"]["5G8"]["R"]["channels"]["1"] == 5660
+
+    # Компоненты по каталогу построены заново, старые снимки каталога удалены
+    assert services.analyzer is not old_analyzer
+    assert services.analyzer.get_frequency("analog", "5G8", "R", "1") == 5660
+    snapshots = [name for name in os.listdir(catalog_app.catalog_path.parent) if name.startswith("channels.catalog.")]
+    assert len(snapshots) == 1
+
+    assert client.get("/api/data", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_every_route_sees_changed_catalog(catalog_app):
+    client = catalog_app.test_client()
+    group = {"channels": [{"band": "R", "channel": "1", "range": "5G8"}, {"band": "R", "channel": "8", "range": "5G8"}]}
+    before = client.post("/api/interference/analyze", json=group).get_json()
+    assert before["channels"][0]["frequency"] == 5658
+
+    edit_catalog(catalog_app, lambda data: data["analog"]["5G8"]["R"]["channels"].update({"1": 5660}))
+    # /api/data никто не запрашивал
+    after = client.post("/api/interference/analyze", json=group).get_json()
+    assert after["channels"][0]["frequency"] == 5660
+    assert client.get("/api/frequency?band=R&channel=1&range=5G8").get_json()["frequency"] == 5660
+
+
+def test_broken_catalog_edit_keeps_previous_catalog(catalog_app):
+    client, services = catalog_app.test_client(), catalog_app.extensions["fpv"]
+    assert client.get("/api/frequency?band=R&channel=1&range=5G8").get_json()["frequency"] == 5658
+
+    edit_catalog(catalog_app, lambda data: data.clear())
+    assert client.get("/api/frequency?band=R&channel=1&range=5G8").get_json()["frequency"] == 5658
+    assert services.refresh_catalog() is False
@@ -0,0 +1,142 @@
+import json
+
+import pytest
+
+from fpv_logic import imd_engine
+from fpv_logic.group_session import GroupSession, SessionStore
+
+# Группа из разных диапазонов: в одном 5.8 ГГц уровни быстро упираются в 100% и сравнение ничего не проверяет
+CHANNELS = [
+    {"band": "R", "channel": "1", "range": "5G8"},
+    {"band": "R", "channel": "8", "range": "5G8"},
+    {"band": "LR", "channel": "4", "range": "1G3"},
+    {"band": "TBS", "channel": "2", "range": "2G4"},
+    {"band": "J", "channel": "5", "range": "4G9"},
+    {"band": "A", "channel": "3", "range": "3G3"},
+    {"band": "R", "channel": "4", "range": "5G8"}
+]
+
+
+def assert_matches_full_analysis(analyzer, session):
+    full = analyzer.analyze_group_interference(
+        [{"band": ch["band"], "channel": ch["channel"], "range": ch["range"]} for ch in session.channels]
+    )
+    # Суммы сессии точные (целые в RATIO_SCALE), у анализатора - во float: на границе округления
+    # до 2 знаков (например, 7.185) результаты расходятся на 0.01
+    assert [ch["total_interference"] for ch in session.channels] == \
+        pytest.approx([ch["total_interference"] for ch in full["channels"]], abs=0.0100001)
+    assert [ch["interference_level"] for ch in session.channels] == \
+        [ch["interference_level"] for ch in full["channels"]]
+    assert [[cell["interference"] for cell in row] for row in session.matrix] == \
+        [[cell["interference"] for cell in row] for row in full["interference_matrix"]]
+    assert sorted(session.products) == imd_engine.imd_products_array(session.frequencies).tolist()
+
+
+def test_deltas_match_full_analysis(analyzer):
+    session = GroupSession(analyzer)
+    for count, spec in enumerate(CHANNELS, start=1):
+        delta = session.add_channel(spec)
+        assert delta["version"] == count
+        assert len(delta["row"]) == count
+        if count >= 2:
+            assert_matches_full_analysis(analyzer, session)
+
+    for index in (2, 0, 1):
+        session.remove_channel(index)
+        assert_matches_full_analysis(analyzer, session)
+
+
+def test_delta_lists_only_changed_channels(analyzer):
+    session = GroupSession(analyzer)
+    before = []
+    for spec in CHANNELS[:4]:
+        before = [ch.get("total_interference") for ch in session.channels]
+        delta = session.add_channel(spec)
+    changed = {update["index"] for update in delta["updated"]}
+    after = [ch["total_interference"] for ch in session.channels]
+    assert changed == {i for i in range(len(after)) if i >= len(before) or after[i] != before[i]}
+
+
+def test_remove_and_add_unknown_channel(analyzer):
+    session = GroupSession(analyzer)
+    session.add_channel(CHANNELS[0])
+    with pytest.raises(IndexError):
+        session.remove_channel(5)
+    with pytest.raises(KeyError):
+        session.add_channel({"band": "R", "channel": "99", "range": "5G8"})
+
+
+def test_restore_rebuilds_missing_or_stale_session(analyzer):
+    store = SessionStore(analyzer)
+    session_id, session = store.create()
+    for spec in CHANNELS[:3]:
+        session.add_channel(spec)
+
+    # Другой воркер: сессии нет, она собирается из состояния клиента
+    other = SessionStore(analyzer)
+    restored = other.restore(session_id, session.state())
+    assert restored.state() == session.state()
+    assert [ch["total_interference"] for ch in restored.channels] == \
+        [ch["total_interference"] for ch in session.channels]
+    assert other.restore(session_id, session.state()) is restored
+
+    # Отставшая по версии сессия заменяется
+    session.add_channel(CHANNELS[3])
+    assert other.restore(session_id, session.state()).frequencies == session.frequencies
+
+    with pytest.raises(ValueError):
+        other.restore(session_id, {"channels": "R1"})
+
+
+def test_session_routes_restore_from_header(client):
+    created = client.post("/api/interference/sessions", json={"channels": CHANNELS[:2]}).get_json()
+    state = created["state"]
+
+    # Сессии нет в этом процессе, но состояние клиента есть
+    missing = "0" * 32
+    response = client.post(f"/api/interference/sessions/{missing}/channels", json=CHANNELS[2],
+                           headers={"X-Session-State": json.dumps(state)})
+    assert response.status_code == 200
+    assert response.get_json()["state"]["channels"] == state["channels"] + [CHANNELS[2]]
+
+    assert client.get(f"/api/interference/sessions/{missing}x").status_code == 404
+
+
+@pytest.mark.parametrize("format_", ["full", "compact"])
+def test_single_channel_group(client, format_):
+    response = client.post("/api/interference/analyze", json={"channels": CHANNELS[:1], "format": format_})
+    assert response.status_code == 200
+    analysis = response.get_json()["analysis"]
+    assert analysis["max_interference"] == 0
+    assert analysis["min_separation"] is None
+    assert analysis["safe_separation"] is True
+
+
+def test_channel_entries_must_be_objects(client, analyzer):
+    assert client.post("/api/interference/analyze", json={"channels": ["R1", "R2"]}).status_code == 400
+    compact = {"channels": ["R1", "R2"], "format": "compact"}
+    assert client.post("/api/interference/analyze", json=compact).status_code == 400
+    assert client.post("/api/interference/sessions", json={"channels": ["R1"]}).status_code == 400
+    assert client.post("/api/interference/sessions", json={"channels": "R1"}).status_code == 400
+
+    created = client.post("/api/interference/sessions", json={"channels": CHANNELS[:1]}).get_json()
+    response = client.post(f"/api/interference/sessions/{created['session_id']}/channels", json=["R2"])
+    assert response.status_code == 400
+
+    with pytest.raises(ValueError):
+        SessionStore(analyzer).restore("0" * 32, {"channels": ["R1"]})
+
+
+def test_incremental_sums_equal_rebuilt_session(analyzer):
+    session = GroupSession(analyzer)
+    for spec in CHANNELS:
+        session.add_channel(spec)
+    for index in (5, 1):
+        session.remove_channel(index)
+
+    rebuilt = GroupSession(analyzer)
+    for ch in session.channels:
+        rebuilt.add_channel(ch)
+    # Целые суммы в RATIO_SCALE: добавления и удаления не накапливают ошибку
+    assert session._direct == rebuilt._direct
+    assert session._imd == rebuilt._imd
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from fpv_logic.harmonic_index import HarmonicIndex
+
+# 2-я гармоника Standard 6 (2470 МГц) ложится точно на X1 (4940 МГц)
+SOURCE = {"band": "Standard", "channel": "6", "range": "2G4"}
+VICTIM = {"band": "X", "channel": "1", "range": "4G9"}
+
+
+@pytest.fixture
+def harmonics(services):
+    return services.harmonics
+
+
+def test_index_matches_brute_force(harmonics, services):
+    frequencies, bandwidths = services.catalog.frequency, services.catalog.bandwidth
+    count = len(frequencies)
+
+    expected = {}
+    for source in range(count):
+        for victim in range(count):
+            order = harmonics.harmonic_order(frequencies[source], bandwidths[source],
+                                             frequencies[victim], bandwidths[victim])
+            if order is not None:
+                expected[source, victim] = order
+
+    assert expected
+    found = {(source, victim): harmonics.order_of(source, victim)
+             for source in range(count) for victim in range(count)
+             if harmonics.order_of(source, victim) is not None}
+    assert found == expected
+
+
+def test_victims_of_lists_every_order(harmonics, services):
+    frequencies = services.catalog.frequency
+    for source in range(len(frequencies)):
+        hits = harmonics.victims_of(source)
+        assert {hit["id"] for hit in hits} == {victim for (s, victim) in harmonics._pairs if s == source}
+        for hit in hits:
+            assert hit["order"] >= harmonics.order_of(source, hit["id"])
+            assert hit["offset_mhz"] == pytest.approx(
+                hit["order"] * frequencies[source] - frequencies[hit["id"]], abs=0.01
+            )
+        assert all(hit["order"] == 2 for hit in harmonics.victims_of(source, max_order=2))
+
+
+def test_unavailable_channels_are_skipped():
+    index = HarmonicIndex([0.0, 2470.0, 4940.0], [20.0, 20.0, 20.0])
+    assert index.order_of(1, 2) == 2
+    assert index.victims_of(0) == []
+    assert all(hit["id"] != 0 for hit in index.victims_of(1))
+    assert index.harmonic_order(0.0, 20.0, 4940.0, 20.0) is None
+    assert len(index) == 1
+
+
+def test_max_order_below_two_is_rejected():
+    with pytest.raises(ValueError):
+        HarmonicIndex(np.array([5800.0]), np.array([20.0]), max_order=1)
+
+
+def test_harmonics_route(client):
+    response = client.post("/api/interference/harmonics", json={"channels": [SOURCE, VICTIM], "catalog": True})
+    assert response.status_code == 200
+    result = response.get_json()
+    conflict, = result["conflicts"]
+    assert (conflict["source"], conflict["victim"], conflict["order"]) == (0, 1, 2)
+    assert conflict["offset_mhz"] == 0 and conflict["cross_range"]
+    assert any(hit["band"] == "X" and hit["channel"] == "1" for hit in result["channels"][0]["catalog_victims"])
+
+    # Частоты вне каталога проверяются перебором
+    custom = [{"frequency": 2470, "bandwidth": 20}, {"frequency": 4945, "bandwidth": 20}]
+    conflict, = client.post("/api/interference/harmonics", json={"channels": custom}).get_json()["conflicts"]
+    assert conflict["order"] == 2
+
+    assert client.post("/api/interference/harmonics", json={}).status_code == 400
+    bad_order = {"channels": [SOURCE, VICTIM], "maxOrder": 1}
+    assert client.post("/api/interference/harmonics", json=bad_order).status_code == 400
@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+import pytest
+
+from fpv_logic.heat_planner import HeatPlanner, heat_raw_scores, process_pool
+
+PILOTS = [{"pilot": f"P{i}", "bands": ["R", "F"], "range": "5G8", "modulation": "analog"} for i in range(9)] + [
+    {"pilot": "Fixed", "channels": [{"band": "R", "channel": "1", "range": "5G8"},
+                                    {"band": "R", "channel": "8", "range": "5G8"}]},
+    {"pilot": "Low", "bands": ["LR"], "range": "1G3"}
+]
+
+
+@pytest.fixture(scope="module")
+def planner(services):
+    return services.planner
+
+
+def plan(planner, **options):
+    defaults = {"heat_size": 4, "seed": 3, "workers": 1, "chains": 2, "rounds": 2, "iterations": 200}
+    return planner.plan(PILOTS, **{**defaults, **options})
+
+
+def test_plan_respects_heat_and_channel_constraints(planner):
+    result = plan(planner)
+    allowed = {
+        name: {float(record["frequency"]) for record in records}
+        for name, records in zip([p["pilot"] for p in PILOTS], planner.resolve_pilots(PILOTS))
+    }
+
+    heats = result["heats"]
+    sizes = [len(heat["pilots"]) for heat in heats]
+    assert len(heats) == math.ceil(len(PILOTS) / 4)
+    assert max(sizes) <= 4 and max(sizes) - min(sizes) <= 1
+
+    placed = [entry["pilot"] for heat in heats for entry in heat["pilots"]]
+    assert sorted(placed) == sorted(p["pilot"] for p in PILOTS)
+
+    for heat in heats:
+        frequencies = [entry["frequency"] for entry in heat["pilots"]]
+        assert heat["shared_frequencies"] == []
+        assert len(set(frequencies)) == len(frequencies)
+        for entry in heat["pilots"]:
+            assert entry["frequency"] in allowed[entry["pilot"]]
+    assert result["worst_interference"] == max(heat["worst_interference"] for heat in heats)
+
+
+def test_plan_is_reproducible(planner):
+    first, second = plan(planner), plan(planner)
+    assert first["heats"] == second["heats"]
+    assert plan(planner, seed=4)["rounds"] == first["rounds"]
+
+
+def test_shared_pool_gives_same_plan(planner):
+    with process_pool(2) as pool:
+        # Не fork: процессы не наследуют блокировки других потоков воркера
+        assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+        pooled = plan(planner, workers=2, executor=pool)
+    assert pooled["heats"] == plan(planner)["heats"]
+    assert plan(planner, workers=2)["heats"] == pooled["heats"]
+
+
+def test_raw_scores_match_analyzer(analyzer):
+    frequencies = np.array([5658.0, 5732.0, 5806.0, 2375.0])
+    raw = heat_raw_scores(analyzer, frequencies)
+    for k, frequency in enumerate(frequencies.tolist()):
+        others = np.delete(frequencies, k).tolist()
+        expected = analyzer._calculate_total_interference(frequency, others)["total_percent"]
+        assert min(100.0, raw[k]) == pytest.approx(expected, abs=0.0100001)
+
+
+def test_placeholder_channels_are_rejected(planner):
+    with pytest.raises(ValueError):
+        planner.resolve_pilots([{"pilot": "CE", "channels": [{"band": "DJI_25_CE", "channel": "4", "range": "5G8"}]}])
+
+    resolved = planner.resolve_pilots([{"pilot": "CE", "bands": ["DJI_25_CE"], "range": "5G8"}])
+    assert all(record["frequency"] > 0 for record in resolved[0])
+
+
+@pytest.mark.parametrize("pilots, heat_size", [([], 4), (PILOTS, 1), ([{"pilot": "X", "bands": ["nope"]}], 4)])
+def test_invalid_input(planner, pilots, heat_size):
+    with pytest.raises(ValueError):
+        planner.plan(pilots, heat_size=heat_size, workers=1, rounds=1)
+
+
+def test_route_caps_budget_and_chains(client, app):
+    response = client.post("/api/plan-heats", json={"pilots": PILOTS[:6], "heatSize": 3, "rounds": 1,
+                                                    "chains": 1000, "timeBudget": 1000})
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result["chains"] == app.config["PLANNER_MAX_CHAINS"]
+    # Даже первый раунд из 32 цепочек останавливается по бюджету
+    assert result["elapsed_ms"] < (app.config["PLANNER_MAX_BUDGET"] + 2) * 1000
@@ -0,0 +1,40 @@
+import random
+
+import numpy as np
+import pytest
+
+from fpv_logic import imd_engine
+from fpv_logic.interference import InterferenceAnalyzer
+
+
+@pytest.fixture(scope="module")
+def reference():
+    # Эталон - исходный тройной цикл анализатора
+    return InterferenceAnalyzer({})
+
+
+@pytest.mark.parametrize("order", [3, 5])
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 4, 8])
+def test_imd_products_array_matches_loops(reference, order, size):
+    rng = random.Random(size * 10 + order)
+    frequencies = [rng.choice([5658, 5695, 5732, 5769, 5806, 5843, 5880, 5917, 5740.5, 5362.25])
+                   for _ in range(size)]
+
+    expected = reference.calculate_imd_products(frequencies, order)
+    assert imd_engine.imd_products_array(frequencies, order).tolist() == expected
+
+
+def test_imd_products_with_adds_only_products_of_new_channel():
+    group = [5658.0, 5732.0, 5806.0]
+    for new in (5695.0, 5880.0):
+        extra = set(imd_engine.imd_products_with([new], group)[0].tolist())
+        full = set(imd_engine.imd_products_array(group + [new]).tolist())
+        base = set(imd_engine.imd_products_array(group).tolist())
+        assert full == base | extra
+
+
+def test_power_ratios_match_scalar_formula(reference):
+    freqs = [5658.0, 5665.0, 5700.0, 5800.0]
+    ratios = imd_engine.power_ratios(5658.0, freqs, reference.POWER_DECAY, reference.CHANNEL_WIDTH)
+    expected = [reference.calculate_power_ratio(5658.0, f) for f in freqs]
+    np.testing.assert_allclose(ratios, expected)
@@ -0,0 +1,122 @@
+import io
+
+import numpy as np
+import pytest
+
+from fpv_logic.group_session import GroupSession
+from fpv_logic.spectrum_scan import NoiseFloor, ScanIngestor, ingest_csv
+
+from test_group_session import CHANNELS, assert_matches_full_analysis
+
+# Занятые частоты площадки: рядом с R8 (5917) и слабее - у R1 (5658)
+SWEEPS = "1,5917,-75\n1,5918,-76\n1,5658,-90\n"
+
+
+def write_sweeps(app, text=SWEEPS):
+    with open(app.scan_path, "a") as log:
+        log.write(text)
+
+
+def test_session_totals_include_noise(scan_app):
+    services = scan_app.extensions["fpv"]
+    ingestor = services.scan_ingestor
+    write_sweeps(scan_app)
+    assert ingestor.update() == 3
+    analyzer = services.analyzer
+
+    session = GroupSession(analyzer)
+    for count, spec in enumerate(CHANNELS, start=1):
+        session.add_channel(spec)
+        if count >= 2:
+            assert_matches_full_analysis(analyzer, session)
+    assert session.channels[1]["total_interference"] > 0
+
+
+def test_pair_cells_ignore_noise(scan_app, analyzer):
+    services = scan_app.extensions["fpv"]
+    write_sweeps(scan_app)
+    services.scan_ingestor.update()
+    noisy = services.analyzer
+    specs = CHANNELS[:3]
+
+    full = noisy.analyze_group_interference(specs)
+    quiet = analyzer.analyze_group_interference(specs)
+    cells = [[cell["interference"] for cell in row] for row in full["interference_matrix"]]
+    assert cells == [[cell["interference"] for cell in row] for row in quiet["interference_matrix"]]
+    assert cells == [list(row) for row in zip(*cells)]
+    assert full["channels"][1]["total_interference"] > quiet["channels"][1]["total_interference"]
+
+    # Частоты вне каталога считаются напрямую - тоже без фона
+    assert noisy.pair_interference(5917.5, 5658.0) == analyzer.pair_interference(5917.5, 5658.0)
+    compact = noisy.analyze_group_compact(specs)
+    assert compact["pairs"]["interference"] == analyzer.analyze_group_compact(specs)["pairs"]["interference"]
+
+
+def test_upload_is_appended_to_scan_log(scan_app):
+    client, services = scan_app.test_client(), scan_app.extensions["fpv"]
+    before = services.noise_floor.version
+
+    response = client.post("/api/noise-floor", data=b"freq,rssi\n5917000000,-70\n5918,-71\n100,-20\n")
+    assert response.status_code == 200
+    assert response.get_json()["added"] == 2
+    assert services.noise_floor.version > before
+
+    # Другой воркер с тем же логом видит загрузку
+    other = NoiseFloor.for_catalog(services.catalog.frequency, services.catalog.bandwidth)
+    assert ScanIngestor(str(scan_app.scan_path), other).update() == 2
+    np.testing.assert_allclose(other.ratios([5917.0], 20.0), services.noise_floor.ratios([5917.0], 20.0))
+
+    assert client.post("/api/noise-floor", data=b"1,100,-20\n").status_code == 400
+
+
+def test_upload_requires_flag_and_scan_log(client):
+    # Тестовое приложение без SCAN_PATH и с выключенной загрузкой
+    assert client.post("/api/noise-floor", data=b"1,5800,-40\n").status_code == 403
+
+
+def test_upload_without_scan_log(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "NOISE_UPLOAD_ENABLED", True)
+    assert client.post("/api/noise-floor", data=b"1,5800,-40\n").status_code == 409
+
+
+def test_mixed_frequency_units(services):
+    noise_floor = NoiseFloor.for_catalog(services.catalog.frequency, services.catalog.bandwidth)
+    added, _, _ = ingest_csv(io.BytesIO(b"1,5800000000,-40\n" + b"1,5801,-40\n" * 5), noise_floor)
+    assert added == 6
+    measured = noise_floor.to_dict()["frequencies"]
+    assert measured == [5800.0, 5801.0]
+
+
+def test_noise_raises_channel_interference(scan_app):
+    client = scan_app.test_client()
+    group = {"channels": CHANNELS[:2]}
+    quiet = client.post("/api/interference/analyze", json=group).get_json()
+    write_sweeps(scan_app)
+    noisy = client.post("/api/interference/analyze", json=group).get_json()
+    assert noisy["channels"][1]["total_interference"] > quiet["channels"][1]["total_interference"]
+    assert noisy["interference_matrix"] == quiet["interference_matrix"]
+
+
+@pytest.mark.parametrize("text", ["", "garbage\n"])
+def test_empty_upload(scan_app, text):
+    assert scan_app.test_client().post("/api/noise-floor", data=text.encode()).status_code == 400
+
+
+def test_ingestor_reads_incrementally_and_resets(tmp_path, services):
+    path = tmp_path / "scan.csv"
+    path.write_text("timestamp,frequency,rssi\n1,5800,-40\n1,5801")
+    noise_floor = NoiseFloor.for_catalog(services.catalog.frequency, services.catalog.bandwidth)
+    ingestor = ScanIngestor(str(path), noise_floor)
+
+    # Недописанная строка ждет следующего чтения
+    assert ingestor.update() == 1
+    with open(path, "a") as log:
+        log.write(",-41\n")
+    assert ingestor.update() == 1
+    assert ingestor.update() == 0
+
+    # Лог начат заново - старые измерения сбрасываются
+    path.write_text("timestamp,frequency,rssi\n")
+    assert ingestor.update() == 0
+    assert ingestor.samples == 0
+    assert noise_floor.to_dict()["frequencies"] == []
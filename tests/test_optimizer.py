@@ -0,0 +1,72 @@
+from itertools import combinations
+
+import pytest
+
+from fpv_logic.api_handlers import optimize_channel_set
+from fpv_logic.optimizer import ChannelOptimizer
+
+# Пул кандидатов: каналы R (5G8 analog) плюс пара соседей, чтобы были и близкие, и IMD-совпадения
+POOL = [5658.0, 5695.0, 5732.0, 5769.0, 5806.0, 5843.0, 5880.0, 5917.0, 5665.0, 5740.0]
+
+DJI_CE_PLACEHOLDER = {"band": "DJI_25_CE", "channel": "4", "range": "5G8", "modulation": "digital"}
+
+
+def raw_worst(analyzer, frequencies):
+    """Худший "сырой" уровень помех набора (без ограничения в 100%) - то, что минимизирует оптимизатор."""
+    worst = 0.0
+    for i, frequency in enumerate(frequencies):
+        result = analyzer._calculate_total_interference(frequency, frequencies[:i] + frequencies[i + 1:])
+        worst = max(worst, (result["direct_interference"] + result["imd_interference"]) * result["debug"]["multiplier"])
+    return worst
+
+
+@pytest.fixture(scope="module")
+def optimizer(analyzer):
+    return ChannelOptimizer(analyzer, POOL + [0.0])
+
+
+@pytest.mark.parametrize("count, pinned", [(2, []), (3, []), (4, []), (3, [5658.0]), (4, [5740.0, 5880.0])])
+def test_optimize_matches_brute_force(analyzer, optimizer, count, pinned):
+    result = optimizer.optimize(count, pinned=pinned, candidates=POOL, time_budget=10)
+    assert result["complete"]
+    assert len(result["frequencies"]) == count
+    assert set(pinned) <= set(result["frequencies"])
+
+    free = [f for f in POOL if f not in pinned]
+    best = min(raw_worst(analyzer, pinned + list(rest)) for rest in combinations(free, count - len(pinned)))
+    assert raw_worst(analyzer, result["frequencies"]) == pytest.approx(best, rel=1e-3, abs=1e-3)
+    assert result["worst_raw_interference"] == pytest.approx(best, rel=1e-3, abs=0.01)
+
+
+def test_zero_frequency_is_never_selected(optimizer):
+    assert 0.0 not in optimizer.frequencies.tolist()
+    result = optimizer.optimize(len(POOL), time_budget=1)
+    assert sorted(result["frequencies"]) == sorted(POOL)
+
+
+@pytest.mark.parametrize("count", [0, -1])
+def test_optimize_rejects_empty_set(optimizer, count):
+    with pytest.raises(ValueError):
+        optimizer.optimize(count)
+
+
+def test_optimize_rejects_count_above_pool(optimizer):
+    with pytest.raises(ValueError):
+        optimizer.optimize(len(POOL) + 1, candidates=POOL)
+
+
+def test_channel_set_rejects_pinned_placeholder(services):
+    with pytest.raises(ValueError):
+        optimize_channel_set(services.optimizer, services.catalog_index, [DJI_CE_PLACEHOLDER], 3)
+
+
+def test_channel_set_skips_placeholders_in_pool(services):
+    result = optimize_channel_set(services.optimizer, services.catalog_index, [], 3,
+                                  modulation="digital", range_name="5G8", time_budget=0.2)
+    assert all(channel["frequency"] > 0 for channel in result["channels"])
+
+
+@pytest.mark.parametrize("count", [0, -1, 999])
+def test_api_rejects_bad_count(client, count):
+    response = client.post("/api/optimize-channels", json={"count": count, "range": "5G8", "modulation": "analog"})
+    assert response.status_code == 400
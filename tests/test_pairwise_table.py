@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pytest
+
+from fpv_logic import imd_engine
+from fpv_logic.interference import InterferenceAnalyzer
+from fpv_logic.pairwise_table import PairwiseTable
+
+# Повтор частоты (как у каналов разных групп) - одинаковые строки таблицы
+FREQUENCIES = [5658.0, 5695.0, 5658.0, 5732.0, 5806.0, 5917.0, 2410.0, 1280.0]
+
+
+def bare_analyzer():
+    analyzer = InterferenceAnalyzer({})
+    analyzer.result_cache = None
+    return analyzer
+
+
+def test_build_matches_pair_calculation():
+    analyzer = bare_analyzer()
+    table = PairwiseTable.build(analyzer, FREQUENCIES)
+
+    for i, f1 in enumerate(FREQUENCIES):
+        for j, f2 in enumerate(FREQUENCIES):
+            pair = analyzer.pair_interference(f1, f2)
+            assert table.pair(f1, f2) == {
+                "separation": abs(f1 - f2),
+                "total_percent": pair["total_percent"],
+                "risk_level": pair["risk_level"],
+                "multiplier": pair["debug"]["multiplier"]
+            }
+            assert table.power_ratio(f1, f2) == analyzer.calculate_power_ratio(f1, f2)
+
+    assert table.pair(5658.0, 5659.0) is None
+    np.testing.assert_array_equal(
+        table.power_ratios(5658.0, FREQUENCIES),
+        imd_engine.power_ratios(5658.0, FREQUENCIES, analyzer.POWER_DECAY, analyzer.CHANNEL_WIDTH)
+    )
+    assert table.power_ratios(5658.0, [5659.0]) is None
+
+
+def test_load_or_build_reuses_file_and_removes_stale(tmp_path):
+    json_path = str(tmp_path / "channels.json")
+    stale = tmp_path / "channels.pairwise.000000000000.npy"
+    stale.write_bytes(b"old")
+    analyzer = bare_analyzer()
+
+    built = PairwiseTable.load_or_build(analyzer, FREQUENCIES, json_path)
+    path = PairwiseTable.artifact_path(analyzer, FREQUENCIES, json_path)
+    assert not stale.exists()
+    assert [p.name for p in tmp_path.iterdir()] == [os.path.basename(path)]
+
+    # Второй старт открывает тот же файл через mmap, а не считает заново
+    loaded = PairwiseTable.load_or_build(analyzer, FREQUENCIES, json_path)
+    assert isinstance(loaded.values, np.memmap)
+    np.testing.assert_array_equal(loaded.values, built.values)
+
+    # Другие коэффициенты модели - другой файл
+    analyzer.POWER_DECAY = 1.5
+    assert PairwiseTable.artifact_path(analyzer, FREQUENCIES, json_path) != path
+
+
+@pytest.mark.parametrize("group", [[5658.0, 5732.0], [5658.0, 5695.0, 5732.0, 5806.0], [5658.0, 5660.5, 5806.0]])
+def test_scores_with_table_match_direct_calculation(analyzer, group):
+    bare = bare_analyzer()
+    for i, target in enumerate(group):
+        others = group[:i] + group[i + 1:]
+        assert analyzer._calculate_total_interference(target, others) == \
+            bare._calculate_total_interference(target, others)
@@ -0,0 +1,90 @@
+import math
+
+import numpy as np
+import pytest
+
+from fpv_logic import power_model
+from fpv_logic.power_model import PowerModel, dbm_to_mw, mw_to_dbm
+
+FREQUENCIES = [5658.0, 5695.0, 5732.0, 5769.0]
+CHANNELS = [{"band": "R", "channel": str(i), "range": "5G8"} for i in (1, 2, 3, 4)]
+
+
+def transmitters(drones=None):
+    return [{"frequency": f, "power_mw": 25.0 * (i + 1), "pilot": [float(i), 0.0],
+             "drone": None if drones is None else drones[i]} for i, f in enumerate(FREQUENCIES)]
+
+
+def reference_sinr(model, items):
+    """SINR каждого приемника перебором пар и троек передатчиков."""
+    n = len(items)
+    received = np.empty((n, n))
+    for i in range(n):
+        for j in range(n):
+            distance = math.dist(items[i]["pilot"], items[j]["drone"])
+            received[i, j] = items[j]["power_mw"] * model.path_gain(distance, items[j]["frequency"])
+
+    iip3 = dbm_to_mw(model.iip3_dbm)
+    sinr = []
+    for i in range(n):
+        fi = items[i]["frequency"]
+        direct = sum(received[i, j] * model.selectivity(fi - items[j]["frequency"]) for j in range(n) if j != i)
+        imd = sum(received[i, j] ** 2 * received[i, k] / iip3 ** 2 *
+                  model.selectivity(fi - (2 * items[j]["frequency"] - items[k]["frequency"]))
+                  for j in range(n) for k in range(n) if j != k)
+        sinr.append(float(mw_to_dbm(received[i, i]) - mw_to_dbm(direct + imd + dbm_to_mw(model.noise_floor_dbm))))
+    return sinr
+
+
+def test_fixed_positions_match_brute_force(analyzer):
+    model = PowerModel(analyzer)
+    items = transmitters([[10.0, 5.0], [3.0, -8.0], [1.5, 0.5], [-20.0, 40.0]])
+    result = model.simulate(items, trials=3, seed=1)
+    for channel, expected in zip(result["channels"], reference_sinr(model, items)):
+        assert channel["sinr_db"]["p50"] == pytest.approx(expected, abs=0.01)
+
+
+def test_chunking_and_seed_do_not_change_result(analyzer, monkeypatch):
+    model = PowerModel(analyzer)
+    whole = model.simulate(transmitters(), trials=500, seed=7)
+    assert model.simulate(transmitters(), trials=500, seed=7) == whole
+
+    # Части по несколько испытаний дают тот же результат, что и один проход
+    monkeypatch.setattr(power_model, "CHUNK_ELEMENTS", 50)
+    assert model.simulate(transmitters(), trials=500, seed=7) == whole
+    assert model.simulate(transmitters(), trials=500, seed=8) != whole
+
+
+def test_close_channels_are_worse(analyzer):
+    model = PowerModel(analyzer)
+    far = model.simulate([{"frequency": 5658.0}, {"frequency": 5917.0}], trials=400, seed=2)
+    close = model.simulate([{"frequency": 5658.0}, {"frequency": 5665.0}], trials=400, seed=2)
+    assert close["any_unusable_probability"] > far["any_unusable_probability"]
+
+
+def test_invalid_transmitters(analyzer):
+    model = PowerModel(analyzer)
+    with pytest.raises(ValueError):
+        model.simulate([])
+    with pytest.raises(ValueError):
+        model.simulate([{"frequency": 0.0}, {"frequency": 5658.0}])
+    with pytest.raises(ValueError):
+        model.simulate([{"frequency": 5658.0, "power_mw": -1}])
+
+
+def test_route_scales_trials_with_group_size(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "POWER_MAX_WORK", 64 * 100)
+    result = client.post("/api/interference/power", json={"channels": CHANNELS, "trials": 5000}).get_json()
+    assert result["trials"] == 100
+
+    monkeypatch.setitem(app.config, "POWER_MAX_CHANNELS", 3)
+    assert client.post("/api/interference/power", json={"channels": CHANNELS}).status_code == 400
+
+
+@pytest.mark.parametrize("field, value", [("drone", [1, 2, 3]), ("drone", "10,20"), ("pilot", [0, None]),
+                                          ("drone", [[1, 2]]), ("power", "high")])
+def test_route_names_malformed_field(client, field, value):
+    channels = [dict(CHANNELS[0], **{field: value}), CHANNELS[1]]
+    response = client.post("/api/interference/power", json={"channels": channels, "trials": 10})
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith(f"channels[0].{field}")
@@ -0,0 +1,91 @@
+import re
+
+from fpv_logic import profiling
+from fpv_logic.profiling import Histogram, MetricsRegistry, RequestTimings, span
+
+GROUP = [{"band": "R", "channel": "1", "range": "5G8"}, {"band": "R", "channel": "8", "range": "5G8"},
+         {"band": "F", "channel": "4", "range": "5G8"}]
+
+
+def stage_durations(header):
+    return {name: float(duration) for name, duration in re.findall(r"(\w+);dur=([\d.]+)", header)}
+
+
+def test_span_outside_request_records_nothing():
+    assert profiling.finish_request() is None
+    with span("imd"):
+        pass
+    assert profiling.finish_request() is None
+
+
+def test_spans_add_up_per_stage():
+    timings = profiling.start_request()
+    for _ in range(2):
+        with span("imd"):
+            pass
+    profiling.record_imd_products(12)
+    assert profiling.finish_request() is timings
+
+    assert list(timings.stages) == ["imd"]
+    assert timings.imd_products == [12]
+    header = timings.server_timing(0.0125)
+    assert header == f"imd;dur={timings.stages['imd'] * 1000:.2f}, total;dur=12.50"
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((1, 10))
+    for value in (0, 1, 5, 50):
+        histogram.observe(value)
+
+    lines = histogram.render("fpv_test", "")
+    assert lines == [
+        'fpv_test_bucket{le="1"} 2',
+        'fpv_test_bucket{le="10"} 3',
+        'fpv_test_bucket{le="+Inf"} 4',
+        "fpv_test_sum 56.000000",
+        "fpv_test_count 4"
+    ]
+
+
+def test_registry_counts_requests_and_stages():
+    registry = MetricsRegistry()
+    timings = RequestTimings()
+    timings.add("scoring", 0.5)
+    timings.imd_products.append(20)
+    registry.observe_request("analyze_group", "POST", 200, 0.02, timings)
+    registry.observe_request("analyze_group", "POST", 404, 0.001)
+
+    text = registry.render()
+    assert 'fpv_http_requests_total{endpoint="analyze_group",method="POST",status="200"} 1' in text
+    assert 'fpv_http_requests_total{endpoint="analyze_group",method="POST",status="404"} 1' in text
+    assert 'fpv_http_request_duration_seconds_count{endpoint="analyze_group"} 2' in text
+    assert 'fpv_stage_seconds_total{endpoint="analyze_group",stage="scoring"} 0.500000' in text
+    assert 'fpv_stage_calls_total{endpoint="analyze_group",stage="scoring"} 1' in text
+    assert 'fpv_imd_products_bucket{le="50"} 1' in text
+
+
+def test_server_timing_header_lists_calculation_stages(client):
+    response = client.post("/api/interference/analyze", json={"channels": GROUP, "format": "compact"})
+    assert response.status_code == 200
+
+    stages = stage_durations(response.headers["Server-Timing"])
+    # Расчет идет в потоке пула расчетов, но его этапы попадают в замеры запроса
+    assert {"imd", "scoring", "matrix", "serialize", "total"} <= set(stages)
+    assert all(duration >= 0 for duration in stages.values())
+    assert stages["total"] >= stages["imd"]
+
+
+def test_metrics_endpoint_reports_requests(client):
+    client.post("/api/interference/analyze", json={"channels": GROUP, "format": "compact"})
+    client.post("/api/interference/analyze", json={})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert re.search(r'fpv_http_requests_total\{endpoint="api.analyze_group",method="POST",status="200"\} [1-9]', text)
+    assert re.search(r'fpv_http_requests_total\{endpoint="api.analyze_group",method="POST",status="400"\} [1-9]', text)
+    assert re.search(r'fpv_stage_calls_total\{endpoint="api.analyze_group",stage="imd"\} [1-9]', text)
+    assert "# TYPE fpv_imd_products histogram" in text
+    # Каждая строка - комментарий или "метрика значение"
+    assert all(line.startswith("#") or re.fullmatch(r"\S+(\{.*\})? \S+", line) for line in text.splitlines())
@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+import pytest
+
+from fpv_logic import result_cache
+from fpv_logic.interference import InterferenceAnalyzer
+from fpv_logic.result_cache import ResultCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_cache.time, "monotonic", clock)
+    return clock
+
+
+def fill(cache, *keys):
+    for key in keys:
+        cache.get_or_compute(key, lambda key=key: {"key": key})
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResultCache(max_size=2, ttl=None)
+    fill(cache, "a", "b")
+    # Чтение "a" делает его свежим - вытесняется "b"
+    assert cache.get_or_compute("a", lambda: pytest.fail("a должен быть в кэше")) == {"key": "a"}
+    fill(cache, "c")
+
+    calls = []
+    cache.get_or_compute("b", lambda: calls.append("b") or {"key": "b"})
+    assert calls == ["b"]
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 4, 2)
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResultCache(max_size=10, ttl=5.0)
+    fill(cache, "a")
+    clock.now += 4.9
+    assert cache.get_or_compute("a", lambda: {"key": "new"}) == {"key": "a"}
+
+    # Срок считается от записи, а не от последнего чтения
+    clock.now += 0.2
+    assert cache.get_or_compute("a", lambda: {"key": "new"}) == {"key": "new"}
+    assert cache.stats()["expirations"] == 1
+
+
+def test_configure_trims_and_disables():
+    cache = ResultCache(max_size=5, ttl=60)
+    fill(cache, *"abcde")
+    cache.configure(max_size=2, ttl=0)
+    stats = cache.stats()
+    assert (stats["size"], stats["evictions"], stats["ttl"]) == (2, 3, None)
+
+    cache.configure(max_size=0, ttl=None)
+    calls = []
+    for _ in range(2):
+        cache.get_or_compute("x", lambda: calls.append(1) or {})
+    assert calls == [1, 1]
+    assert cache.stats()["size"] == 0
+
+
+def test_invalidate_clears_everything():
+    cache = ResultCache()
+    fill(cache, "a", "b")
+    cache.invalidate()
+    stats = cache.stats()
+    assert (stats["size"], stats["invalidations"]) == (0, 1)
+    assert 'fpv_result_cache_events_total{event="invalidations"} 1' in cache.render_metrics()
+    assert "fpv_result_cache_entries 0" in cache.render_metrics()
+
+
+def test_key_ignores_order_but_not_model_or_noise_version():
+    analyzer = InterferenceAnalyzer({})
+    key = ResultCache.key(analyzer, 5658, [5917.0, 5695.0])
+    assert ResultCache.key(analyzer, 5658.0, [5695.0, 5917.0]) == key
+
+    analyzer.POWER_DECAY = 1.5
+    assert ResultCache.key(analyzer, 5658, [5917.0, 5695.0]) != key
+    analyzer.POWER_DECAY = 1.2
+    analyzer.noise_floor = SimpleNamespace(version=1)
+    with_noise = ResultCache.key(analyzer, 5658, [5917.0, 5695.0])
+    assert with_noise != key
+    # Новые измерения сканера - новый ключ, старый результат больше не используется
+    analyzer.noise_floor.version = 2
+    assert ResultCache.key(analyzer, 5658, [5917.0, 5695.0]) != with_noise
+
+
+def test_analyzer_reuses_results_for_same_group():
+    analyzer = InterferenceAnalyzer({})
+    analyzer.result_cache = cache = ResultCache()
+
+    first = analyzer.calculate_total_interference(5658.0, [5917.0, 5695.0])
+    second = analyzer.calculate_total_interference(5658.0, [5695.0, 5917.0])
+    assert second is first
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+    analyzer.result_cache = None
+    assert analyzer.calculate_total_interference(5658.0, [5917.0, 5695.0]) == first
+
+
+def test_catalog_reload_invalidates_shared_cache(services):
+    before = result_cache.RESULT_CACHE.stats()["invalidations"]
+    services.loader.reload()
+    assert result_cache.RESULT_CACHE.stats()["invalidations"] == before + 1
@@ -0,0 +1,60 @@
+import pytest
+
+from fpv_logic.api_handlers import calculate_interference
+
+CANDIDATES = [5645.0, 5658.0, 5665.0, 5700.0, 5732.0, 5740.0, 5806.0, 5917.0, 5945.0, 2375.0]
+
+
+@pytest.mark.parametrize("others", [[], [5658.0], [5658.0, 5806.0], [5658.0, 5732.0, 5806.0, 5880.0]])
+def test_score_candidates_matches_per_candidate(analyzer, others):
+    batch = analyzer.score_candidates(CANDIDATES, others)
+
+    for candidate, result in zip(CANDIDATES, batch):
+        expected = analyzer._calculate_total_interference(candidate, others)
+        assert result["total_percent"] == pytest.approx(expected["total_percent"], abs=0.0100001)
+        assert result["direct_interference"] == pytest.approx(expected["direct_interference"], abs=1e-4)
+        assert result["imd_interference"] == pytest.approx(expected["imd_interference"], abs=1e-4)
+        assert result["debug"] == expected["debug"]
+        assert result["imd_frequencies"] == expected["imd_frequencies"]
+
+
+def test_score_candidates_without_imd_lists(analyzer):
+    results = analyzer.score_candidates(CANDIDATES[:3], [5658.0, 5806.0], include_imd=False)
+    assert len(results) == 3
+    assert all("imd_frequencies" not in result for result in results)
+    assert analyzer.score_candidates([], [5658.0]) == []
+
+
+def test_bulk_route_matches_single_channel_scoring(client):
+    selected = [{"band": "R", "channel": "1", "range": "5G8"}, {"band": "R", "channel": "5", "range": "5G8"}]
+    candidates = [{"band": "R", "channel": str(i), "range": "5G8"} for i in (2, 3, 7, 8)]
+    response = client.post("/api/interference/bulk", json={"selected": selected, "candidates": candidates})
+    assert response.status_code == 200
+
+    for item in response.get_json():
+        single = calculate_interference([{"frequency": 5658}, {"frequency": 5806}], {"frequency": item["frequency"]})
+        assert item["level"] == single["level"]
+        assert item["details"]["totalInterference"] == pytest.approx(single["details"]["totalInterference"],
+                                                                     abs=0.0100001)
+
+
+def test_bulk_without_selected_is_valid_json(client):
+    response = client.post("/api/interference/bulk", json={"candidates": [{"frequency": 5658.0}]})
+    assert response.status_code == 200
+    assert b"Infinity" not in response.data
+    result, = response.get_json()
+    assert result["details"]["debug"]["min_separation"] is None
+    assert result["details"]["totalInterference"] == 0
+
+
+@pytest.mark.parametrize("payload", [{"selected": "abc"}, {"selected": ["R1"]}, {"selected": None},
+                                     {"selected": [], "candidates": "R1"}, {"candidates": [5658.0]}])
+def test_bulk_rejects_malformed_channel_lists(client, payload):
+    response = client.post("/api/interference/bulk", json=payload)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_lone_channel_has_no_min_separation(analyzer):
+    assert analyzer._calculate_total_interference(5658.0, [])["debug"]["min_separation"] is None
+    assert analyzer.score_candidates([5658.0], [])[0]["debug"]["min_separation"] is None
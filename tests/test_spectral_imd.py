@@ -0,0 +1,75 @@
+import math
+from collections import Counter
+from itertools import product
+
+import numpy as np
+import pytest
+
+from fpv_logic.spectral_imd import SpectralIMDEngine
+
+FREQUENCIES = [5700.0, 5740.0, 5800.0, 5820.0]
+
+
+def brute_force_density(engine, frequencies, order):
+    """
+    Перебор упорядоченных наборов: m+1 передатчиков со знаком "+" и m со знаком "-".
+    Наборы, где все "-" сокращаются с "+" (продукт совпадает с несущей), не считаются,
+    каждая комбинация делится на число перестановок слагаемых.
+    """
+    m = (order - 1) // 2
+    orderings = math.factorial(m + 1) * math.factorial(m)
+    density = np.zeros(engine.size)
+    indices = range(len(frequencies))
+    for positive in product(indices, repeat=m + 1):
+        for negative in product(indices, repeat=m):
+            if not Counter(negative) - Counter(positive):
+                continue
+            cell = int(sum(frequencies[i] for i in positive) - sum(frequencies[i] for i in negative)) - engine.f0
+            if 0 <= cell < engine.size:
+                density[cell] += 1 / orderings
+    return density
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return SpectralIMDEngine(5500, 6100)
+
+
+@pytest.mark.parametrize("order", [3, 5, 7])
+def test_density_matches_brute_force(engine, order):
+    # Узкая полоса - одна ячейка сетки: плотность в ячейке равна числу комбинаций
+    density = engine.density([(f, 0.5) for f in FREQUENCIES], max_order=7)
+    expected = brute_force_density(engine, FREQUENCIES, order)
+    np.testing.assert_allclose(density.by_order[order], expected, atol=1e-6)
+
+
+def test_wide_band_keeps_combination_count():
+    # Форма с единичной площадью: сумма плотности по сетке не зависит от ширины полосы
+    # (сетка с запасом, чтобы размытые продукты 5 порядка не выходили за край)
+    engine = SpectralIMDEngine(5300, 6400)
+    narrow = engine.density([(f, 0.5) for f in FREQUENCIES], max_order=5)
+    wide = engine.density([(f, 20.0) for f in FREQUENCIES], max_order=5)
+    for order in (3, 5):
+        assert wide.by_order[order].sum() == pytest.approx(narrow.by_order[order].sum(), rel=1e-6)
+
+
+def test_band_sum_and_weights(engine):
+    density = engine.density([(f, 0.5) for f in FREQUENCIES], max_order=5)
+    # 2 * 5740 - 5700 = 5780: продукт 3 порядка в полосе канала 5780
+    assert density.at(5780, bandwidth=2, order=3) > 0
+    assert density.at(5780, bandwidth=2) == pytest.approx(
+        density.at(5780, bandwidth=2, order=3) + 0.1 * density.at(5780, bandwidth=2, order=5)
+    )
+
+
+def test_frequency_outside_grid(engine):
+    with pytest.raises(ValueError):
+        engine.shape(2400.0, 20.0)
+
+
+@pytest.mark.parametrize("max_order", [2, 4])
+def test_route_rejects_even_order(client, max_order):
+    response = client.post("/api/interference/spectrum", json={
+        "channels": [{"band": "R", "channel": "1", "range": "5G8"}], "maxOrder": max_order
+    })
+    assert response.status_code == 400
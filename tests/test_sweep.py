@@ -0,0 +1,137 @@
+import json
+import math
+import random
+
+import pytest
+
+from fpv_logic import sweep
+from fpv_logic.sweep import TopK
+
+SELECTED = [{"band": "R", "channel": "1", "range": "5G8"}, {"band": "R", "channel": "8", "range": "5G8"}]
+
+
+def result(total, raw=None, name=""):
+    return {"total_interference": total, "raw_interference": total if raw is None else raw, "name": name}
+
+
+def read_events(response):
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_top_k_matches_sorting():
+    rng = random.Random(3)
+    results = [result(rng.choice([5.0, 12.5, 100.0]), rng.uniform(0, 300), str(i)) for i in range(200)]
+
+    best = TopK(7)
+    for item in results:
+        best.push(item)
+    # sorted устойчив: при равных ключах раньше идет более ранний результат
+    assert best.results() == sorted(results, key=sweep.sort_key)[:7]
+
+
+def test_top_k_keeps_earlier_of_equal_results():
+    best = TopK(2)
+    for name in "abc":
+        best.push(result(10.0, name=name))
+    assert [item["name"] for item in best.results()] == ["a", "b"]
+
+
+def test_stream_events(monkeypatch):
+    monkeypatch.setattr(sweep, "PROGRESS_EVERY", 2)
+    results = [result(float(i)) for i in (3, 1, 2, 0, 4)]
+
+    events = list(sweep.stream(results))
+    assert [event["type"] for event in events] == ["result", "result", "progress", "result", "result", "progress",
+                                                   "result", "done"]
+    assert events[-1]["processed"] == 5
+
+    events = list(sweep.stream(results, top=2))
+    assert [event["type"] for event in events] == ["progress", "progress", "result", "result", "done"]
+    assert [(event["rank"], event["total_interference"]) for event in events[2:4]] == [(1, 0.0), (2, 1.0)]
+
+    assert list(sweep.stream(results, limit=2))[-1] == {"type": "done", "processed": 2}
+
+
+def test_pooled_runs_chunks_lazily():
+    calls = []
+
+    def run(compute):
+        calls.append(1)
+        return compute()
+
+    events = sweep.pooled(iter(range(10)), run, chunk=4)
+    assert [next(events) for _ in range(5)] == [0, 1, 2, 3, 4]
+    # Пятый результат - из второй части; третья еще не считалась
+    assert len(calls) == 2
+    events.close()
+    assert len(calls) == 2
+
+    assert list(sweep.pooled(iter(range(10)), run, chunk=4)) == list(range(10))
+
+
+def test_channel_sweep_matches_total_interference(analyzer, services):
+    selected = [5658.0, 5917.0]
+    candidates = services.catalog_index.channels[:30]
+
+    swept = list(sweep.channel_sweep(analyzer, candidates, selected))
+    assert len(swept) == sum(1 for record in candidates if record["frequency"] > 0)
+    for item in swept:
+        expected = analyzer.calculate_total_interference(float(item["frequency"]), selected)
+        assert item["total_interference"] == expected["total_percent"]
+        assert item["interference_level"] == expected["risk_level"]
+        assert item["raw_interference"] >= item["total_interference"] or item["total_interference"] == 100
+
+
+def test_subset_sweep_scores_worst_channel(analyzer, services):
+    pool = [record for record in services.catalog_index.channels if record["band"] == "R" and record["range"] == "5G8"]
+    subsets = list(sweep.subset_sweep(analyzer, pool[:5], 2, [5905.0]))
+    assert len(subsets) == math.comb(5, 2)
+
+    for subset in subsets:
+        frequencies = [float(ch["frequency"]) for ch in subset["channels"]] + [5905.0]
+        worst = max(
+            analyzer.calculate_total_interference(f, frequencies[:i] + frequencies[i + 1:])["total_percent"]
+            for i, f in enumerate(frequencies)
+        )
+        assert subset["total_interference"] == worst
+
+
+def test_route_streams_channel_sweep(client):
+    events = read_events(client.post("/api/interference/sweep", json={"selected": SELECTED, "range": "5G8"}))
+
+    assert events[0]["type"] == "start"
+    results = [event for event in events if event["type"] == "result"]
+    assert len(results) == events[0]["total"] == events[-1]["processed"]
+    assert events[-1]["type"] == "done"
+    assert all(event["range"] == "5G8" for event in results)
+
+
+def test_route_top_and_limit(client):
+    everything = read_events(client.post("/api/interference/sweep", json={"selected": SELECTED, "range": "5G8"}))
+    ranked = sorted((event for event in everything if event["type"] == "result"), key=sweep.sort_key)
+
+    events = read_events(client.post("/api/interference/sweep",
+                                     json={"selected": SELECTED, "range": "5G8", "top": 3}))
+    top = [event for event in events if event["type"] == "result"]
+    assert [event["rank"] for event in top] == [1, 2, 3]
+    assert [sweep.sort_key(event) for event in top] == [sweep.sort_key(event) for event in ranked[:3]]
+
+    events = read_events(client.post("/api/interference/sweep",
+                                     json={"selected": SELECTED, "subsetSize": 2, "bands": ["R"], "limit": 5}))
+    assert events[0]["total"] == 5
+    assert sum(1 for event in events if event["type"] == "result") == 5
+    assert all(len(event["channels"]) == 2 for event in events if event["type"] == "result")
+
+
+@pytest.mark.parametrize("payload, status", [
+    ({"selected": [{"band": "Z", "channel": "9", "range": "5G8"}]}, 404),
+    ({"selected": SELECTED, "subsetSize": 0}, 400),
+    ({"selected": SELECTED, "top": 0}, 400),
+    ({"selected": SELECTED, "subsetSize": 4}, 400),
+])
+def test_route_rejects_bad_requests(client, payload, status):
+    response = client.post("/api/interference/sweep", json=payload)
+    assert response.status_code == status
+    assert "error" in response.get_json()